@@ -0,0 +1,120 @@
+import csv
+import os
+import random
+import re
+import time
+from clean_data import clean_brand_name, clean_brand_names
+
+def legacy_clean_brand_name(brand, strength, form):
+    """
+    The original pattern-by-pattern implementation, kept as the golden reference
+    """
+    clean = brand
+
+    if form:
+        clean = re.sub(r'\b' + re.escape(form) + r'\b', '', clean, flags=re.IGNORECASE)
+
+    if strength:
+        clean = re.sub(r'\b' + re.escape(strength) + r'\b', '', clean, flags=re.IGNORECASE)
+        alt_strength = strength.replace(' ', '') if ' ' in strength else strength.replace('mg', ' mg')
+        clean = re.sub(r'\b' + re.escape(alt_strength) + r'\b', '', clean, flags=re.IGNORECASE)
+
+    patterns = [
+        r'\d+\s*x\s*\d+\'?s?',
+        r'\d+\'?s',
+        r'\d+mg',
+        r'\d+\s+mg',
+        r'\d+ml',
+        r'\d+\s+ml',
+        r'\d+gm',
+        r'\d+\s+gm',
+        r'\bTablet\b', r'\bCapsule\b', r'\bSyrup\b', r'\bInjection\b',
+        r'\bSuspension\b', r'\bDrops\b', r'\bCream\b', r'\bOintment\b',
+        r'\bGel\b', r'\bSachet\b', r'\bSolution\b'
+    ]
+
+    for pattern in patterns:
+        clean = re.sub(pattern, '', clean, flags=re.IGNORECASE)
+
+    clean = re.sub(r'^\W+|\W+$', '', clean)
+    clean = re.sub(r'\s+', ' ', clean).strip()
+
+    return clean
+
+def load_rows(path='dawaai_medicines_final.csv'):
+    """
+    (brand, strength, form) triples prepared exactly as clean_data() does
+    """
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return [(row['brand_name'].strip(), row['strength'].strip().lower().replace(' ', ''),
+                     row['dosage_form'].strip().title()) for row in csv.DictReader(f)]
+    print(f"{path} not found - using 15,000 synthetic rows")
+    return synthetic_rows(15000)
+
+def synthetic_rows(count, seed=42):
+    rng = random.Random(seed)
+    names = ['Panadol', 'Brufen', 'Augmentin', 'Risek', 'Flagyl', 'Calpol', 'Zyrtec', 'Gaviscon', 'Arinac', 'Ponstan']
+    forms = ['Tablet', 'Capsule', 'Syrup', 'Injection', 'Suspension', 'Drops', 'Cream', 'Gel', 'Sachet', '']
+    rows = []
+    for _ in range(count):
+        strength = rng.choice([f"{rng.randint(1, 1000)}mg", f"{rng.randint(1, 500)}mg/5ml", f"{rng.randint(1, 5)}%", ''])
+        form = rng.choice(forms)
+        parts = [rng.choice(names), rng.choice(['', 'Extra', 'Forte', 'DS', 'Plus'])]
+        parts.append(rng.choice([strength, strength.replace('mg', ' mg'), f"{rng.randint(1, 900)} mg", '']))
+        parts.append(rng.choice([form, form.lower(), '']))
+        parts.append(rng.choice([f"{rng.randint(1, 30)} x {rng.randint(1, 20)}'s", f"{rng.randint(1, 100)}ml", f"{rng.randint(1, 30)}'s", '']))
+        rows.append((' '.join(p for p in parts if p), strength, form))
+    return rows
+
+def fuzz_rows(count, seed=7):
+    """
+    Random token soup aimed at the edge cases (matches exposed by earlier removals)
+    """
+    rng = random.Random(seed)
+    tokens = ['5', '10', ' ', "'s", 's', 'mg', 'ml', 'gm', 'x', ' x ', 'Tab', 'let', 'Tablet', 'GEL', 'Syrup',
+              '-', '(', ')', 'Drops', '500', 'mg ', '.', 'Forte', "'", "2x3'", "1 x 2'", 'a', 'Gel']
+    rows = []
+    for _ in range(count):
+        brand = ''.join(rng.choice(tokens) for _ in range(rng.randint(1, 12)))
+        rows.append((brand, rng.choice(['', '5mg', '10ml', '500mg', '5 mg']), rng.choice(['', 'Tablet', 'Gel', 'Syrup'])))
+    return rows
+
+def check_golden(rows, label):
+    mismatches = [(row, legacy_clean_brand_name(*row), clean_brand_name(*row))
+                  for row in rows if legacy_clean_brand_name(*row) != clean_brand_name(*row)]
+    print(f"Golden check ({label}): {len(rows) - len(mismatches)}/{len(rows)} identical")
+    for row, expected, actual in mismatches[:5]:
+        print(f"    {row!r}: expected {expected!r}, got {actual!r}")
+    return not mismatches
+
+def bench(rows):
+    brands, strengths, forms = zip(*rows)
+
+    start = time.perf_counter()
+    for row in rows:
+        legacy_clean_brand_name(*row)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for row in rows:
+        clean_brand_name(*row)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    clean_brand_names(brands, strengths, forms)
+    batch = time.perf_counter() - start
+
+    print(f"\n{len(rows)} rows:")
+    print(f"  legacy  {legacy * 1000:8.1f}ms | {len(rows) / legacy:9.0f} rows/s")
+    print(f"  single  {single * 1000:8.1f}ms | {len(rows) / single:9.0f} rows/s | {legacy / single:4.1f}x")
+    print(f"  batch   {batch * 1000:8.1f}ms | {len(rows) / batch:9.0f} rows/s | {legacy / batch:4.1f}x")
+
+if __name__ == '__main__':
+    import sys
+
+    rows = load_rows()
+    ok = check_golden(rows, 'dataset')
+    ok = check_golden(fuzz_rows(50000), 'fuzz') and ok
+    bench(rows)
+    sys.exit(0 if ok else 1)
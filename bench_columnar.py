@@ -0,0 +1,78 @@
+import csv
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+from bench_clean_brand import synthetic_rows
+from clean_data import clean_brand_names
+from columnar_clean import load_frame, clean_detail_frame, frequency_tables
+
+def write_synthetic_detailed(path, count, seed=1):
+    """
+    Write a dawaai_medicines_final.csv-shaped file with `count` rows
+    """
+    rng = random.Random(seed)
+    manufacturers = [f"Pharma {i}" for i in range(400)]
+    generics = [f"Generic {i}" for i in range(2000)]
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['brand_name', 'generic_name', 'manufacturer', 'strength', 'dosage_form', 'pack_size', 'url'])
+        for i, (brand, strength, form) in enumerate(synthetic_rows(count, seed=seed)):
+            writer.writerow([brand, rng.choice(generics), rng.choice(manufacturers), strength, form.lower(),
+                             rng.choice(["10's", '2 x 10\'s', '100ml', '']), f"https://dawaai.pk/medicine/m-{i}.html"])
+
+def row_pipeline(path):
+    """
+    What clean_data.py and analyze_data.py do today: DictReader rows and per-row string ops
+    """
+    forms, strengths, manufacturers = Counter(), Counter(), Counter()
+    with open(path, 'r', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        if row['dosage_form']:
+            forms[row['dosage_form'].lower().strip()] += 1
+        if row['strength']:
+            strengths[row['strength'].lower().strip()] += 1
+        if row['manufacturer']:
+            manufacturers[row['manufacturer'].strip()] += 1
+
+    form_col = [row['dosage_form'].strip().title() for row in rows]
+    strength_col = [row['strength'].strip().lower().replace(' ', '') for row in rows]
+    brands = [row['brand_name'].strip() for row in rows]
+    cleaned = clean_brand_names(brands, strength_col, form_col)
+    final = []
+    for brand, original, strength in zip(cleaned, brands, strength_col):
+        brand = brand or original
+        final.append(f"{brand} {strength}" if strength else brand)
+    return final, forms
+
+def columnar_pipeline(path):
+    df = load_frame(path)
+    tables = frequency_tables(df)
+    return clean_detail_frame(df)['brand_name'].tolist(), tables['forms']
+
+def bench(count):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'detailed.csv')
+        write_synthetic_detailed(path, count)
+
+        start = time.perf_counter()
+        row_names, row_forms = row_pipeline(path)
+        row_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        col_names, col_forms = columnar_pipeline(path)
+        col_time = time.perf_counter() - start
+
+    same = row_names == col_names and list(row_forms.most_common()) == list(col_forms.items())
+    print(f"{count:>9,} rows | row-by-row {row_time:7.2f}s | columnar {col_time:7.2f}s | "
+          f"{row_time / col_time:4.1f}x | output {'identical' if same else 'DIFFERS'}")
+    return same
+
+if __name__ == '__main__':
+    import sys
+
+    counts = [int(a) for a in sys.argv[1:]] or [15000, 1000000]
+    ok = all([bench(count) for count in counts])
+    sys.exit(0 if ok else 1)
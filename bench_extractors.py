@@ -0,0 +1,111 @@
+import csv
+import os
+import re
+import statistics
+import time
+from medicine_extractors import BACKENDS, FIELDNAMES
+
+PAGES_DIR = 'saved_pages'
+
+def save_pages(count, pages_dir=PAGES_DIR):
+    """
+    Download the first `count` medicine pages into the local corpus
+    """
+    from http_client import fetch
+
+    os.makedirs(pages_dir, exist_ok=True)
+    with open('dawaai_medicines_clean.csv', 'r', encoding='utf-8') as f:
+        medicines = list(csv.DictReader(f))[:count]
+
+    saved = 0
+    for med in medicines:
+        response = fetch(med['url'])
+        if response.status_code != 200:
+            continue
+        filename = re.sub(r'[^\w.-]', '_', med['url'].rsplit('/', 1)[-1])
+        with open(os.path.join(pages_dir, filename), 'wb') as f:
+            f.write(response.content)
+        saved += 1
+    print(f"✓ Saved {saved} pages to {pages_dir}/")
+
+def load_corpus(pages_dir=PAGES_DIR):
+    """
+    Return [(url, content)] from the saved corpus, or synthetic fixture pages if there is none
+    """
+    if os.path.isdir(pages_dir) and os.listdir(pages_dir):
+        corpus = []
+        for name in sorted(os.listdir(pages_dir)):
+            with open(os.path.join(pages_dir, name), 'rb') as f:
+                corpus.append((f"https://dawaai.pk/medicine/{name}", f.read()))
+        return corpus
+
+    from fixture_server import render_medicine_page
+    print(f"No saved pages in {pages_dir}/ - using synthetic fixture pages")
+    return [(f"https://dawaai.pk/medicine/Medicine{i}-{i}.html", render_medicine_page(i)) for i in range(1, 501)]
+
+def available_backends():
+    backends = []
+    for name in BACKENDS:
+        try:
+            BACKENDS[name]('<h1>x</h1>', 'probe')
+            backends.append(name)
+        except ImportError:
+            print(f"  (skipping {name}: not installed)")
+    return backends
+
+def bench_extractors(pages_dir=PAGES_DIR, repeat=3):
+    """
+    Check every backend against the BeautifulSoup reference and report per-page parse time
+    """
+    corpus = load_corpus(pages_dir)
+    backends = available_backends()
+    print(f"Corpus: {len(corpus)} pages | Backends: {', '.join(backends)}\n")
+
+    reference = None
+    if 'bs4' in backends:
+        reference = [BACKENDS['bs4'](content, url) for url, content in corpus]
+    else:
+        print("BeautifulSoup not installed - parity check skipped\n")
+
+    parity_ok = True
+    for name in backends:
+        extract = BACKENDS[name]
+        timings = []
+        mismatches = []
+        for i, (url, content) in enumerate(corpus):
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                details = extract(content, url)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings.append(best)
+            if reference is not None and details != reference[i]:
+                fields = [k for k in FIELDNAMES if details[k] != reference[i][k]]
+                mismatches.append((url, fields))
+
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1] if len(timings) >= 20 else timings[-1]
+        print(f"{name:5} | mean {statistics.mean(timings) * 1000:7.3f}ms | p95 {p95 * 1000:7.3f}ms | "
+              f"{len(corpus) / sum(timings):8.0f} pages/s"
+              + (f" | parity {len(corpus) - len(mismatches)}/{len(corpus)}" if reference is not None else ""))
+        for url, fields in mismatches[:5]:
+            print(f"    mismatch {url}: {', '.join(fields)}")
+
+        if mismatches:
+            parity_ok = False
+
+    return parity_ok
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Parity check and parse-time benchmark for the extractor backends")
+    parser.add_argument('--save', type=int, metavar='N', help="Download N pages into the corpus first")
+    parser.add_argument('--pages-dir', default=PAGES_DIR)
+    args = parser.parse_args()
+
+    if args.save:
+        save_pages(args.save, args.pages_dir)
+    sys.exit(0 if bench_extractors(args.pages_dir) else 1)
@@ -0,0 +1,37 @@
+import time
+from fetch_engine import fetch_all
+from fixture_server import start_fixture_server
+from scrape_detailed import scrape_medicine_details
+
+def bench_fetch_engine(count=200, latency=0.2):
+    """
+    Compare the old sequential loop with the fetch engine against the local fixture server
+    """
+    server, base_url = start_fixture_server(latency=latency)
+    urls = [f"{base_url}/medicine/Medicine{i}-{i}.html" for i in range(1, count + 1)]
+
+    try:
+        print(f"Benchmarking {count} pages with {latency * 1000:.0f}ms simulated latency\n")
+
+        # Sequential baseline (without the old time.sleep, which would only make it slower)
+        start = time.time()
+        ok = sum(1 for url in urls if scrape_medicine_details(url))
+        elapsed = time.time() - start
+        print(f"Sequential:           {elapsed:6.2f}s | {count / elapsed:6.1f} pages/s | ok={ok}")
+
+        for concurrency, rate in [(4, 20.0), (8, 40.0), (16, 80.0)]:
+            results = []
+            start = time.time()
+            fetch_all(urls, scrape_medicine_details, concurrency=concurrency, rate=rate, burst=concurrency,
+                      on_result=lambda url, details: results.append(details))
+            elapsed = time.time() - start
+            ok = sum(1 for r in results if r)
+            print(f"Engine c={concurrency:<2} r={rate:<5}: {elapsed:6.2f}s | {count / elapsed:6.1f} pages/s | ok={ok}")
+    finally:
+        server.shutdown()
+
+if __name__ == '__main__':
+    import sys
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    bench_fetch_engine(count=count)
@@ -0,0 +1,98 @@
+import csv
+import os
+import random
+import statistics
+import tempfile
+import time
+from medicine_index import MedicineIndex, build_index
+
+def synthetic_catalogue(count, seed=11):
+    """
+    Cleaned-CSV shaped rows with made-up but pronounceable brand and generic names
+    """
+    rng = random.Random(seed)
+    syllables = [c + v + e for c in 'bcdfgklmnprstvz' for v in 'aeiouy' for e in ['', 'n', 'l', 'x']]
+    generics = [''.join(rng.choice(syllables) for _ in range(rng.randint(3, 5))).title() for _ in range(1500)]
+    rows = []
+    for _ in range(count):
+        brand = ''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))).title()
+        strength = rng.choice(['250mg', '500mg', '5mg', '120mg/5ml', ''])
+        rows.append({
+            'brand_name': f"{brand} {strength}".strip(),
+            'generic_name': rng.choice(generics),
+            'manufacturer': f"Pharma {rng.randint(1, 400)}",
+            'strength': strength,
+            'dosage_form': rng.choice(['Tablet', 'Capsule', 'Syrup', 'Injection']),
+            'pack_size': rng.choice(["10's", "2 x 10's", '60ml']),
+        })
+    return rows
+
+def load_catalogue(path='dawaai_medicines_cleaned_final.csv'):
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+    print(f"{path} not found - using 15,000 synthetic rows")
+    return synthetic_catalogue(15000)
+
+def typo(word, rng):
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    return rng.choice([word[:i] + word[i + 1:], word[:i] + word[i] + word[i:], word[:i] + 'x' + word[i + 1:]])
+
+def make_queries(rows, count, seed=5):
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        row = rng.choice(rows)
+        brand = row['brand_name'].split()[0]
+        kind = rng.choice(['prefix', 'fuzzy', 'generic'])
+        if kind == 'prefix':
+            queries.append((kind, brand[:rng.randint(2, len(brand))]))
+        elif kind == 'fuzzy':
+            queries.append((kind, typo(brand, rng)))
+        else:
+            queries.append((kind, row['generic_name']))
+    return queries
+
+def bench(count=100000):
+    rows = load_catalogue()
+
+    start = time.perf_counter()
+    data = build_index(rows)
+    build_time = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'medicine_index.bin')
+        with open(path, 'wb') as f:
+            f.write(data)
+        start = time.perf_counter()
+        index = MedicineIndex.load(path)
+        load_time = time.perf_counter() - start
+
+        print(f"{len(index)} records | build {build_time:.2f}s | file {len(data) / 1024:.0f} KB | load {load_time * 1000:.2f}ms")
+
+        run = {'prefix': index.prefix, 'fuzzy': index.fuzzy, 'generic': index.brands_for_generic}
+        timings = {kind: [] for kind in run}
+        found = {kind: 0 for kind in run}
+        queries = make_queries(rows, count)
+
+        start = time.perf_counter()
+        for kind, query in queries:
+            t0 = time.perf_counter()
+            if run[kind](query):
+                found[kind] += 1
+            timings[kind].append((time.perf_counter() - t0) * 1000)
+        total = time.perf_counter() - start
+        del index
+
+    print(f"\n{count} queries in {total:.2f}s ({count / total:,.0f} queries/s)")
+    for kind, samples in timings.items():
+        cuts = statistics.quantiles(samples, n=100)
+        print(f"  {kind:8} {len(samples):>7} | p50 {statistics.median(samples):6.3f}ms | p99 {cuts[98]:6.3f}ms | "
+              f"hit rate {found[kind] / len(samples):6.1%}")
+
+if __name__ == '__main__':
+    import sys
+
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,136 @@
+import os
+import time
+from bench_rpc import impersonate, load_organizations, percentiles, sample_terms
+
+# Product search latency by organization size on a load_test_data.py database with migration v26:
+#   search_products (v18)         leading-wildcard ILIKE, pages by OFFSET
+#   search_products_keyset (v26)  prefix range + trigram index, pages by cursor
+# First page and a deep page for each, for organizations from the smallest to the largest.
+# Deep pages are timed only for terms with that many pages of results, on both sides.
+# The keyset columns should stay roughly flat as products grow; the ILIKE columns grow with them.
+# Also checks that walking keyset pages returns the same rows as one large call.
+
+PAGE_SIZE = 50
+
+LEGACY_SQL = "SELECT * FROM search_products(%(term)s, %(limit)s, %(offset)s)"
+KEYSET_SQL = "SELECT * FROM search_products_keyset(%(term)s, %(limit)s, %(rank)s, %(key)s, %(id)s)"
+
+def pick_organizations(orgs, count=5):
+    """
+    Up to `count` organizations spread from the largest to the smallest
+    """
+    if len(orgs) <= count:
+        return orgs
+    step = (len(orgs) - 1) / (count - 1)
+    return [orgs[round(i * step)] for i in range(count)]
+
+def keyset_page(conn, term, cursor=None, limit=PAGE_SIZE):
+    """
+    One page and the cursor for the next (None once exhausted)
+    """
+    rank, key, last_id = cursor or (None, None, None)
+    rows = conn.execute(KEYSET_SQL, {'term': term, 'limit': limit, 'rank': rank, 'key': key, 'id': last_id}).fetchall()
+    if len(rows) < limit:
+        return rows, None
+    return rows, (rows[-1][12], rows[-1][13], rows[-1][0])
+
+def check_pages(conn, terms, pages=4):
+    """
+    Keyset pages concatenated == a single call for the same rows, no duplicates
+    """
+    bad = []
+    for term in terms:
+        walked, cursor = [], None
+        for _ in range(pages):
+            rows, cursor = keyset_page(conn, term, cursor, 10)
+            walked.extend(row[0] for row in rows)
+            if cursor is None:
+                break
+        whole = [row[0] for row in keyset_page(conn, term, None, len(walked) or 1)[0]]
+        if walked != whole[:len(walked)] or len(set(walked)) != len(walked):
+            bad.append(term)
+    return bad
+
+def time_legacy(conn, term, page):
+    start = time.perf_counter()
+    conn.execute(LEGACY_SQL, {'term': term, 'limit': PAGE_SIZE, 'offset': page * PAGE_SIZE}).fetchall()
+    return (time.perf_counter() - start) * 1000
+
+def page_cursor(conn, term, page):
+    """
+    Cursor for page `page` (0-based), walking the earlier pages; None if the results end first
+    """
+    cursor = None
+    for _ in range(page):
+        _, cursor = keyset_page(conn, term, cursor)
+        if cursor is None:
+            return None
+    return cursor
+
+def time_keyset(conn, term, page):
+    """
+    Time fetching page `page` only; earlier pages are walked untimed to get its cursor.
+    None when the search has fewer pages.
+    """
+    cursor = page_cursor(conn, term, page)
+    if page and cursor is None:
+        return None
+    start = time.perf_counter()
+    keyset_page(conn, term, cursor)
+    return (time.perf_counter() - start) * 1000
+
+def bench(dsn, queries=200, deep_page=5, org_count=5):
+    import psycopg
+
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        orgs = pick_organizations(load_organizations(conn), org_count)
+        if not orgs:
+            print("✗ No load-test organizations found; run load_test_data.py first")
+            return False
+        terms = sample_terms(conn, orgs, per_org=queries)
+
+        ok = True
+        columns = [('ILIKE p1', time_legacy, 0), (f'ILIKE p{deep_page + 1}', time_legacy, deep_page),
+                   ('keyset p1', time_keyset, 0), (f'keyset p{deep_page + 1}', time_keyset, deep_page)]
+        print(f"{queries} searches per organization, {PAGE_SIZE} rows per page; p50 / p95 in ms\n")
+        print(f"  {'products':>9}  " + "  ".join(f"{label:>17}" for label, _, _ in columns))
+        for org_id, product_count in sorted(orgs, key=lambda o: o[1]):
+            impersonate(conn, org_id)
+            bad = check_pages(conn, terms[org_id][:20])
+            if bad:
+                ok = False
+                print(f"  ✗ keyset pages differ from a single call for {len(bad)} terms, e.g. {bad[0]!r}")
+
+            # Warm the cache so both sides are measured hot
+            for term in terms[org_id][:20]:
+                time_legacy(conn, term, 0)
+                time_keyset(conn, term, 0)
+
+            deep_terms = [term for term in terms[org_id] if page_cursor(conn, term, deep_page) is not None]
+            cells = []
+            for _, timer, page in columns:
+                samples = [timer(conn, term, page) for term in (deep_terms if page else terms[org_id])]
+                samples = [sample for sample in samples if sample is not None]
+                if samples:
+                    p50, p95, _ = percentiles(samples)
+                    cells.append(f"{p50:7.2f} / {p95:7.2f}")
+                else:
+                    cells.append(f"{'n/a':>17}")
+            print(f"  {product_count:9}  " + "  ".join(cells)
+                  + f"  ({len(deep_terms)}/{len(terms[org_id])} terms reach page {deep_page + 1})")
+    return ok
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Product search latency by organization size: ILIKE/OFFSET vs keyset")
+    parser.add_argument('--dsn', default=os.environ.get('LOADTEST_DATABASE_URL'),
+                        help="Load-test database from load_test_data.py (default: $LOADTEST_DATABASE_URL)")
+    parser.add_argument('--queries', type=int, default=200, help="Search terms per organization")
+    parser.add_argument('--deep-page', type=int, default=5, help="Also time this page (0-based) of each search")
+    parser.add_argument('--orgs', type=int, default=5, help="Organizations to sample, smallest to largest")
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("pass --dsn or set LOADTEST_DATABASE_URL")
+    sys.exit(0 if bench(args.dsn, args.queries, args.deep_page, args.orgs) else 1)
@@ -0,0 +1,285 @@
+import json
+import os
+import random
+import statistics
+import threading
+import time
+from load_test_data import LOADTEST_EMAIL_DOMAIN
+
+# Concurrent load driver for the hot RPCs, run against a database built by load_test_data.py.
+# Each worker thread holds one connection and loops: pick an organization (weighted by its
+# product count, so large orgs get most of the traffic), impersonate it the way PostgREST
+# does (request.jwt.claim.sub / request.jwt.claims), call one RPC from the mix, time it.
+#
+# Reports p50/p95/p99 and throughput per RPC. --plans captures EXPLAIN ANALYZE for each RPC
+# against the largest organization. The RPCs are plpgsql, so a plain EXPLAIN only shows a
+# Function Scan; auto_explain with log_nested_statements reports the plans of the queries
+# inside them instead, delivered to the client as NOTICEs.
+#
+#   python bench_rpc.py --dsn postgresql://... --concurrency 16 --duration 60 --plans
+#   python bench_rpc.py --rpcs search_products --requests 5000 --save results.json
+
+DEFAULT_PLANS_DIR = 'loadtest_plans'
+
+# name -> (SQL, needs a search term)
+RPCS = {
+    'search_products': ("SELECT * FROM search_products(%(term)s, 20, 0)", True),
+    'search_products_keyset': ("SELECT * FROM search_products_keyset(%(term)s, 20)", True),
+    'get_dashboard_stats': ("SELECT * FROM get_dashboard_stats(15)", False),
+    'get_near_expiry_products': ("SELECT * FROM get_near_expiry_products(15)", False),
+    'get_low_stock_products': ("SELECT * FROM get_low_stock_products()", False),
+    'get_sales_chart_data': ("SELECT * FROM get_sales_chart_data(7)", False),
+    'get_top_products': ("SELECT * FROM get_top_products(5, 30)", False),
+}
+
+# Roughly what the app sends: searching on every keystroke (SalesPage.js) dominates
+DEFAULT_MIX = {
+    'search_products_keyset': 6,
+    'get_dashboard_stats': 2,
+    'get_near_expiry_products': 1,
+    'get_low_stock_products': 1,
+}
+
+AUTO_EXPLAIN_SETTINGS = [
+    "SET auto_explain.log_min_duration = 0",
+    "SET auto_explain.log_analyze = on",
+    "SET auto_explain.log_buffers = on",
+    "SET auto_explain.log_nested_statements = on",
+    "SET auto_explain.log_level = notice",
+]
+
+def parse_mix(spec):
+    """
+    'search_products=6,get_dashboard_stats' -> {'search_products': 6, 'get_dashboard_stats': 1}
+    """
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.strip().partition('=')
+        if name not in RPCS:
+            raise ValueError(f"unknown RPC {name!r} (choose from {', '.join(RPCS)})")
+        mix[name] = int(weight) if weight else 1
+    return mix
+
+def load_organizations(conn):
+    """
+    [(org_id, product_count)] for the load-test organizations, largest first
+    """
+    return [(str(org_id), count) for org_id, count in conn.execute(
+        """SELECT u.id, COUNT(p.id)
+           FROM auth.users u
+           LEFT JOIN public.products p ON p.organization_id = u.id AND p.deleted_at IS NULL
+           WHERE u.email LIKE '%%@' || %s
+           GROUP BY u.id
+           ORDER BY COUNT(p.id) DESC""",
+        (LOADTEST_EMAIL_DOMAIN,)
+    )]
+
+def sample_terms(conn, orgs, per_org=200, seed=5):
+    """
+    Search terms per organization from its own products: name prefixes (the usual case),
+    name fragments and batch number prefixes
+    """
+    rng = random.Random(seed)
+    terms = {}
+    for org_id, _ in orgs:
+        rows = conn.execute(
+            "SELECT name, batch_number FROM public.products WHERE organization_id = %s ORDER BY random() LIMIT %s",
+            (org_id, per_org)
+        ).fetchall()
+        org_terms = []
+        for name, batch in rows:
+            roll = rng.random()
+            if roll < 0.1 and batch:
+                org_terms.append(batch[:rng.randint(3, 6)])
+            elif roll < 0.3 and name and len(name) > 4:
+                start = rng.randint(1, len(name) - 3)
+                org_terms.append(name[start:start + rng.randint(3, 5)])
+            elif name:
+                org_terms.append(name[:rng.randint(2, 6)])
+        terms[org_id] = org_terms or ['a']
+    return terms
+
+def impersonate(conn, org_id):
+    conn.execute("SELECT set_config('request.jwt.claim.sub', %s, false), "
+                 "set_config('request.jwt.claims', %s, false)",
+                 (org_id, json.dumps({'sub': org_id, 'role': 'authenticated'})))
+
+def percentiles(samples):
+    if len(samples) < 2:
+        return (samples[0],) * 3 if samples else (0.0,) * 3
+    cuts = statistics.quantiles(samples, n=100)
+    return cuts[49], cuts[94], cuts[98]
+
+class Worker(threading.Thread):
+    def __init__(self, dsn, mix, orgs, terms, deadline, budget, seed):
+        super().__init__(daemon=True)
+        self.dsn = dsn
+        self.mix = mix
+        self.orgs = orgs
+        self.terms = terms
+        self.deadline = deadline
+        self.budget = budget
+        self.rng = random.Random(seed)
+        self.samples = {name: [] for name in mix}
+        self.errors = {name: 0 for name in mix}
+
+    def run(self):
+        import psycopg
+
+        names, weights = list(self.mix), list(self.mix.values())
+        org_ids, org_weights = [o for o, _ in self.orgs], [max(1, n) for _, n in self.orgs]
+        with psycopg.connect(self.dsn, autocommit=True) as conn:
+            while time.time() < self.deadline and self.budget.take():
+                name = self.rng.choices(names, weights)[0]
+                org_id = self.rng.choices(org_ids, org_weights)[0]
+                sql, needs_term = RPCS[name]
+                params = {'term': self.rng.choice(self.terms[org_id])} if needs_term else None
+                try:
+                    impersonate(conn, org_id)
+                    start = time.perf_counter()
+                    conn.execute(sql, params).fetchall()
+                    self.samples[name].append((time.perf_counter() - start) * 1000)
+                except Exception:
+                    self.errors[name] += 1
+
+class RequestBudget:
+    """
+    Shared request counter for --requests; unlimited when total is None
+    """
+
+    def __init__(self, total=None):
+        self.remaining = total
+        self.lock = threading.Lock()
+
+    def take(self):
+        if self.remaining is None:
+            return True
+        with self.lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+def run_load(dsn, mix, orgs, terms, concurrency=8, duration=30, requests=None, seed=11):
+    """
+    Drive the mix on `concurrency` connections. Returns ({rpc: stats}, elapsed seconds).
+    """
+    deadline = time.time() + duration if requests is None else float('inf')
+    budget = RequestBudget(requests)
+    workers = [Worker(dsn, mix, orgs, terms, deadline, budget, seed + i) for i in range(concurrency)]
+    start = time.time()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.time() - start
+
+    results = {}
+    for name in mix:
+        samples = [s for worker in workers for s in worker.samples[name]]
+        errors = sum(worker.errors[name] for worker in workers)
+        p50, p95, p99 = percentiles(samples)
+        results[name] = {
+            'calls': len(samples),
+            'errors': errors,
+            'p50_ms': round(p50, 2),
+            'p95_ms': round(p95, 2),
+            'p99_ms': round(p99, 2),
+            'mean_ms': round(statistics.mean(samples), 2) if samples else 0.0,
+            'throughput': round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        }
+    return results, elapsed
+
+def capture_plans(dsn, mix, org_id, terms, plans_dir=DEFAULT_PLANS_DIR):
+    """
+    Write <plans_dir>/<rpc>.txt with the EXPLAIN ANALYZE of each RPC for one organization
+    """
+    import psycopg
+
+    os.makedirs(plans_dir, exist_ok=True)
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        try:
+            conn.execute("LOAD 'auto_explain'")
+            for statement in AUTO_EXPLAIN_SETTINGS:
+                conn.execute(statement)
+            nested = True
+        except Exception as e:
+            print(f"  Note: auto_explain unavailable ({str(e).strip().splitlines()[0]}); "
+                  f"plans show only the Function Scan")
+            nested = False
+
+        notices = []
+        conn.add_notice_handler(lambda diag: notices.append(diag.message_primary or ''))
+        impersonate(conn, org_id)
+        for name in mix:
+            sql, needs_term = RPCS[name]
+            params = {'term': terms[org_id][0]} if needs_term else None
+            del notices[:]
+            if nested:
+                conn.execute(sql, params).fetchall()
+                plan = '\n\n'.join(notices)
+            else:
+                plan = '\n'.join(row[0] for row in conn.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", params))
+            path = os.path.join(plans_dir, f"{name}.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(f"-- {sql}\n-- organization {org_id}" + (f", term {params['term']!r}" if params else '') + "\n\n")
+                f.write(plan + '\n')
+            print(f"  ✓ {path}")
+
+def print_results(results, elapsed, concurrency):
+    total = sum(r['calls'] for r in results.values())
+    print(f"\n{total} calls in {elapsed:.1f}s on {concurrency} connections ({total / elapsed:,.1f} calls/s)\n")
+    print(f"  {'RPC':26} {'calls':>7} {'err':>5} {'p50':>9} {'p95':>9} {'p99':>9} {'calls/s':>9}")
+    for name, r in results.items():
+        print(f"  {name:26} {r['calls']:7} {r['errors']:5} {r['p50_ms']:7.2f}ms {r['p95_ms']:7.2f}ms "
+              f"{r['p99_ms']:7.2f}ms {r['throughput']:9.1f}")
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Concurrent latency/throughput benchmark for the hot RPCs")
+    parser.add_argument('--dsn', default=os.environ.get('LOADTEST_DATABASE_URL'),
+                        help="Load-test database from load_test_data.py (default: $LOADTEST_DATABASE_URL)")
+    parser.add_argument('--rpcs', type=parse_mix, default=DEFAULT_MIX,
+                        help="Weighted mix, e.g. 'search_products=6,get_dashboard_stats=2' "
+                             f"(default: {','.join(f'{k}={v}' for k, v in DEFAULT_MIX.items())})")
+    parser.add_argument('--concurrency', type=int, default=8, help="Connections / worker threads (default: 8)")
+    parser.add_argument('--duration', type=float, default=30, help="Seconds to run (default: 30)")
+    parser.add_argument('--requests', type=int, default=None, help="Stop after this many calls instead of --duration")
+    parser.add_argument('--org', action='append', default=None,
+                        help="Only call as this organization_id (repeatable; default: all load-test orgs)")
+    parser.add_argument('--plans', action='store_true', help="Capture EXPLAIN ANALYZE plans before the run")
+    parser.add_argument('--plans-dir', default=DEFAULT_PLANS_DIR, help=f"Where to write plans (default: {DEFAULT_PLANS_DIR})")
+    parser.add_argument('--save', default=None, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    if not args.dsn:
+        parser.error("pass --dsn or set LOADTEST_DATABASE_URL")
+
+    import psycopg
+
+    with psycopg.connect(args.dsn, autocommit=True) as conn:
+        orgs = load_organizations(conn)
+        if args.org:
+            counts = dict(orgs)
+            orgs = [(org_id, counts.get(org_id, 1)) for org_id in args.org]
+        if not orgs:
+            print("✗ No load-test organizations found; run load_test_data.py first")
+            sys.exit(1)
+        terms = sample_terms(conn, orgs)
+    print(f"{len(orgs)} organizations, largest {orgs[0][1]} products")
+
+    if args.plans:
+        print(f"\nCapturing plans for organization {orgs[0][0]}:")
+        capture_plans(args.dsn, args.rpcs, orgs[0][0], terms, args.plans_dir)
+
+    results, elapsed = run_load(args.dsn, args.rpcs, orgs, terms, args.concurrency, args.duration, args.requests)
+    print_results(results, elapsed, args.concurrency)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'concurrency': args.concurrency, 'elapsed': round(elapsed, 2), 'organizations': len(orgs),
+                       'largest_org_products': orgs[0][1], 'rpcs': results}, f, indent=2)
+        print(f"\n✓ Results saved to {args.save}")
+    sys.exit(1 if any(r['errors'] for r in results.values()) else 0)
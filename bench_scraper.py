@@ -0,0 +1,218 @@
+import contextlib
+import csv
+import io
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from fixture_server import start_fixture_server, synthetic_paths
+
+# Offline benchmark suite for the scraping pipeline. Everything runs against the local
+# fixture server (recorded corpus from saved_pages/ if present, synthetic pages otherwise)
+# inside a scratch directory, so no network access is needed and no real ledger or cache
+# is touched. Each case reports throughput and peak Python memory (tracemalloc) at
+# several scales; --save / --baseline turn it into a regression check.
+#
+#   python bench_scraper.py --save bench_baseline.json
+#   python bench_scraper.py --baseline bench_baseline.json   # exit 1 on a >20% slowdown
+
+DEFAULT_PAGE_SCALES = [100, 500]
+DEFAULT_ROW_SCALES = [1000, 10000, 100000]
+DEFAULT_TOLERANCE = 0.2
+
+def synthetic_detail_rows(count):
+    """
+    Detail-CSV shaped rows built from bench_clean_brand's synthetic brands
+    """
+    from bench_clean_brand import synthetic_rows
+
+    return [{
+        'brand_name': brand,
+        'generic_name': f"Generic{i % 500}",
+        'manufacturer': f"Pharma {i % 50}",
+        'strength': strength,
+        'dosage_form': form,
+        'pack_size': "2 x 10's",
+    } for i, (brand, strength, form) in enumerate(synthetic_rows(count))]
+
+def scrape_details_case(urls):
+    from scrape_detailed import scrape_medicine_details
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        ok = sum(1 for url in urls if scrape_medicine_details(url))
+    return ok
+
+def full_loop_case(base_url, count, concurrency, rate):
+    """
+    Sitemap -> unique names -> detail scrape (fetch engine + ledger + page cache) -> clean -> SQL
+    """
+    from clean_data import clean_rows
+    from generate_sql_import import write_sql
+    from scrape_detailed import scrape_all_medicines
+    from scrape_medicines import extract_medicines, iter_sitemap_entries
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        medicines = list(extract_medicines(iter_sitemap_entries(f"{base_url}/sitemap.xml")))[:count]
+        with open('bench_medicines.csv', 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=['name', 'url', 'lastmod'])
+            writer.writeheader()
+            writer.writerows(medicines)
+        results, _ = scrape_all_medicines(concurrency=concurrency, rate=rate, input_file='bench_medicines.csv',
+                                          output_file='bench_detailed.csv')
+        write_sql(clean_rows(results), 'bench_import.sql')
+    return len(results)
+
+def clean_brand_case(rows):
+    from clean_data import clean_brand_name
+
+    for row in rows:
+        clean_brand_name(row['brand_name'], row['strength'].lower().replace(' ', ''), row['dosage_form'].title())
+    return len(rows)
+
+def sql_case(rows):
+    from clean_data import clean_rows
+    from generate_sql_import import write_sql
+
+    return write_sql(clean_rows(rows), 'bench_import.sql')
+
+def measure(fn, memory=True):
+    """
+    Time one run of fn(); with memory=True a second, traced run records peak allocations
+    (kept separate so tracing overhead does not skew the throughput)
+    """
+    start = time.perf_counter()
+    items = fn()
+    elapsed = time.perf_counter() - start
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return items, elapsed, peak
+
+def run_benchmarks(page_scales=DEFAULT_PAGE_SCALES, row_scales=DEFAULT_ROW_SCALES, latency=0.0,
+                   error_rate=0.0, throttle_rate=0.0, concurrency=8, rate=1000.0, corpus_dir=None,
+                   memory=True):
+    """
+    Run every case at every scale. Returns a list of result dicts.
+    """
+    server, base_url = start_fixture_server(latency=latency, sitemap_size=max(page_scales),
+                                            error_rate=error_rate, throttle_rate=throttle_rate,
+                                            retry_after=0, corpus_dir=corpus_dir, seed=1)
+    print(f"Fixture server at {base_url} | latency {latency * 1000:.0f}ms | "
+          f"errors {error_rate:.0%} | 429s {throttle_rate:.0%}")
+
+    names = sorted(os.listdir(corpus_dir)) if corpus_dir else synthetic_paths(max(page_scales))
+    urls = [f"{base_url}/medicine/{name}" for name in names]
+
+    cases = []
+    for count in page_scales:
+        cases.append(('scrape_medicine_details', count, lambda n=count: scrape_details_case(urls[:n])))
+        cases.append(('full_scrape_loop', count, lambda n=count: full_loop_case(base_url, n, concurrency, rate)))
+    for count in row_scales:
+        rows = synthetic_detail_rows(count)
+        cases.append(('clean_brand_name', count, lambda rows=rows: clean_brand_case(rows)))
+        cases.append(('sql_generation', count, lambda rows=rows: sql_case(rows)))
+
+    results = []
+    print(f"\n{'case':24} {'scale':>7} | {'time':>8} | {'items/s':>10} | {'peak mem':>9} | ok")
+    try:
+        for name, scale, fn in cases:
+            items, elapsed, peak = measure(fn, memory=memory)
+            result = {
+                'case': name,
+                'scale': scale,
+                'seconds': round(elapsed, 4),
+                'items_per_s': round(items / elapsed, 1) if elapsed > 0 else 0,
+                'peak_kb': round(peak / 1024) if peak is not None else None,
+                'ok': items,
+            }
+            results.append(result)
+            peak_text = f"{result['peak_kb']:,} KB" if peak is not None else '-'
+            print(f"{name:24} {scale:>7} | {elapsed:7.2f}s | {result['items_per_s']:>10,.0f} | {peak_text:>9} | {items}")
+    finally:
+        server.shutdown()
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"\nMax RSS: {max_rss / 1024:.0f} MB | responses served: {dict(sorted(server.stats.statuses.items()))}")
+    return results
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Print cases whose throughput fell more than `tolerance` below the baseline; returns True if none did
+    """
+    previous = {(r['case'], r['scale']): r for r in baseline}
+    regressions = 0
+    print(f"\nAgainst baseline (tolerance {tolerance:.0%}):")
+    for result in results:
+        before = previous.get((result['case'], result['scale']))
+        if not before or not before['items_per_s']:
+            continue
+        change = result['items_per_s'] / before['items_per_s'] - 1
+        flag = ''
+        if change < -tolerance:
+            flag = '  <-- regression'
+            regressions += 1
+        print(f"  {result['case']:24} {result['scale']:>7} | {change:+7.1%}{flag}")
+    if regressions:
+        print(f"✗ {regressions} regression(s)")
+    else:
+        print("✓ No regressions")
+    return not regressions
+
+def parse_scales(text):
+    return [int(value) for value in text.split(',') if value]
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Offline scraper benchmarks against the local fixture server")
+    parser.add_argument('--pages', type=parse_scales, default=DEFAULT_PAGE_SCALES,
+                        help="Page counts for the fetch cases (default: 100,500)")
+    parser.add_argument('--rows', type=parse_scales, default=DEFAULT_ROW_SCALES,
+                        help="Row counts for the cleaning/SQL cases (default: 1000,10000,100000)")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of pages answered 503")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="Fraction of pages answered 429")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=1000.0, help="Rate limit for the full loop (req/s)")
+    parser.add_argument('--corpus', metavar='DIR', default='saved_pages' if os.path.isdir('saved_pages') else None,
+                        help="Saved pages to serve (default: saved_pages/ if present)")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the traced memory runs")
+    parser.add_argument('--save', metavar='FILE', help="Write results as JSON")
+    parser.add_argument('--baseline', metavar='FILE', help="Compare with results saved earlier")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    corpus_dir = os.path.abspath(args.corpus) if args.corpus else None
+    save_path = os.path.abspath(args.save) if args.save else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    # The scraping cases write the ledger, validator store, page cache and CSVs to the
+    # working directory, so they run inside a scratch directory
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            results = run_benchmarks(args.pages, args.rows, latency=args.latency, error_rate=args.error_rate,
+                                     throttle_rate=args.throttle_rate, concurrency=args.concurrency,
+                                     rate=args.rate, corpus_dir=corpus_dir, memory=not args.no_memory)
+        finally:
+            os.chdir(cwd)
+
+    if save_path:
+        with open(save_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Results saved to {save_path}")
+
+    if baseline_path:
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            ok = compare(results, json.load(f), args.tolerance)
+        sys.exit(0 if ok else 1)
@@ -0,0 +1,107 @@
+import os
+import random
+import statistics
+import time
+from search_keys import search_key
+
+# Search latency on a local Postgres with medicine_reference loaded and migration v23 applied:
+#   the old four-column ILIKE query (as MedicineReferencePage.js issued it, plus its exact count)
+#   vs the search_medicine_reference RPC over the trigram-indexed search_key.
+# Also checks that search_keys.py and medicine_search_key() agree.
+
+LEGACY_SQL = """
+SELECT * FROM medicine_reference
+WHERE generic_name ILIKE %(p)s OR brand_name ILIKE %(p)s OR formula ILIKE %(p)s OR manufacturer ILIKE %(p)s
+ORDER BY brand_name
+LIMIT 20
+"""
+
+LEGACY_COUNT_SQL = """
+SELECT COUNT(*) FROM medicine_reference
+WHERE generic_name ILIKE %(p)s OR brand_name ILIKE %(p)s OR formula ILIKE %(p)s OR manufacturer ILIKE %(p)s
+"""
+
+RPC_SQL = "SELECT * FROM search_medicine_reference(%(t)s, NULL, NULL, 20, 0)"
+
+def check_keys(conn, sample=2000):
+    rows = conn.execute(
+        """SELECT brand_name, generic_name, formula, manufacturer,
+                  medicine_search_key(brand_name, generic_name, formula, manufacturer)
+           FROM medicine_reference ORDER BY random() LIMIT %s""", (sample,)
+    ).fetchall()
+    mismatches = [row for row in rows if search_key(*row[:4]) != row[4]]
+    print(f"Key parity: {len(rows) - len(mismatches)}/{len(rows)} identical")
+    for row in mismatches[:5]:
+        print(f"    {row[:4]!r}: python {search_key(*row[:4])!r}, sql {row[4]!r}")
+    return not mismatches
+
+def sample_terms(conn, count, seed=3):
+    """
+    What people type: 3-6 character fragments of brand and generic names, some with variant spellings
+    """
+    rng = random.Random(seed)
+    names = [name for (name,) in conn.execute(
+        "SELECT brand_name FROM medicine_reference UNION ALL SELECT generic_name FROM medicine_reference"
+    ) if name and len(name) >= 3]
+    terms = []
+    for _ in range(count):
+        name = rng.choice(names)
+        start = rng.randint(0, max(0, len(name) - 3)) if rng.random() < 0.3 else 0
+        term = name[start:start + rng.randint(3, 6)]
+        if rng.random() < 0.1:
+            term = term.replace('f', 'ph').replace('i', 'y')
+        terms.append(term)
+    return terms
+
+def percentiles(samples):
+    cuts = statistics.quantiles(samples, n=100)
+    return statistics.median(samples), cuts[94]
+
+def time_queries(conn, terms, run):
+    samples = []
+    for term in terms:
+        start = time.perf_counter()
+        run(conn, term)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def run_legacy(conn, term):
+    params = {'p': f"%{term}%"}
+    conn.execute(LEGACY_SQL, params).fetchall()
+    conn.execute(LEGACY_COUNT_SQL, params).fetchone()
+
+def run_rpc(conn, term):
+    conn.execute(RPC_SQL, {'t': term}).fetchall()
+
+def bench(dsn, queries=500):
+    import psycopg
+
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        total = conn.execute("SELECT COUNT(*) FROM medicine_reference").fetchone()[0]
+        print(f"medicine_reference: {total} rows")
+        ok = check_keys(conn)
+
+        terms = sample_terms(conn, queries)
+        # Warm the cache so both sides are measured hot
+        time_queries(conn, terms[:20], run_legacy)
+        time_queries(conn, terms[:20], run_rpc)
+
+        print(f"\n{queries} queries:")
+        for label, run in [('ILIKE x4 + count', run_legacy), ('trigram RPC', run_rpc)]:
+            samples = time_queries(conn, terms, run)
+            p50, p95 = percentiles(samples)
+            print(f"  {label:18} p50 {p50:7.2f}ms | p95 {p95:7.2f}ms | mean {statistics.mean(samples):7.2f}ms")
+    return ok
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Medicine search latency: ILIKE vs trigram RPC")
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'),
+                        help="PostgreSQL connection string (default: $DATABASE_URL)")
+    parser.add_argument('--queries', type=int, default=500, help="Number of search terms to time")
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("pass --dsn or set DATABASE_URL")
+    sys.exit(0 if bench(args.dsn, args.queries) else 1)
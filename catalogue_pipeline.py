@@ -0,0 +1,206 @@
+import csv
+import os
+import time
+from clean_data import CLEANED_FIELDS, iter_clean_rows
+from clean_medicines import is_valid_medicine_name
+from generate_sql_import import write_sql
+from medicine_extractors import FIELDNAMES
+from metrics import metrics, add_metrics_arguments, start_reporter
+
+# One entry point for the catalogue build:
+#   sitemap -> names -> detail -> clean -> sql
+# Stages are chained as generators so records flow end to end without the
+# intermediate CSVs. --from/--to pick a slice: a run that starts mid-way reads
+# the previous stage's usual CSV, and a run that stops early writes its own.
+
+STAGES = ['sitemap', 'names', 'detail', 'clean', 'sql']
+
+# The file each stage has traditionally written (and the next one read)
+STAGE_FILES = {
+    'sitemap': ('dawaai_medicines.csv', ['name', 'url', 'lastmod']),
+    'names': ('dawaai_medicines_clean.csv', ['name', 'url', 'lastmod']),
+    'detail': ('dawaai_medicines_final.csv', FIELDNAMES),
+    'clean': ('dawaai_medicines_cleaned_final.csv', CLEANED_FIELDS),
+    'sql': ('migration_v19_import_scraped_medicines.sql', None),
+}
+
+class StageStats:
+    """
+    Row count and wall time for each stage. Each stage is timed inclusively
+    (its own work plus waiting on upstream); report() subtracts the upstream time.
+    """
+
+    def __init__(self):
+        self.order = []
+        self.rows = {}
+        self.inclusive = {}
+
+    def track(self, name, rows):
+        # Register now so the report follows pipeline order, not first-pull order
+        self.order.append(name)
+        self.rows[name] = 0
+        self.inclusive[name] = 0.0
+        return self._timed(name, iter(rows))
+
+    def _timed(self, name, iterator):
+        while True:
+            start = time.perf_counter()
+            try:
+                row = next(iterator)
+            except StopIteration:
+                self.inclusive[name] += time.perf_counter() - start
+                return
+            self.inclusive[name] += time.perf_counter() - start
+            self.rows[name] += 1
+            metrics.inc('stage_rows_total', stage=name)
+            yield row
+
+    def report(self, total_time):
+        print("\nStage summary:")
+        upstream = 0.0
+        for name in self.order:
+            own = max(0.0, self.inclusive[name] - upstream)
+            upstream = self.inclusive[name]
+            rate = self.rows[name] / own if own > 0 else 0
+            metrics.set('stage_seconds', round(own, 3), stage=name)
+            metrics.set('stage_rows_per_second', round(rate, 1), stage=name)
+            print(f"  {name:8} {self.rows[name]:>8} rows | {own:8.2f}s | {rate:10.0f} rows/s")
+        print(f"  {'total':8} {'':>8}      | {total_time:8.2f}s")
+
+def read_csv_rows(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from csv.DictReader(f)
+
+def write_csv_rows(rows, path, fieldnames):
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+def sitemap_stage(_rows):
+    from scrape_medicines import iter_sitemap_entries, extract_medicines
+    return extract_medicines(iter_sitemap_entries())
+
+def names_stage(rows):
+    return (row for row in rows if is_valid_medicine_name(row['name']))
+
+def detail_stage(rows, workers=None, failed=None):
+    from parse_pipeline import fetch_pages, parse_pages
+    from page_cache import PageCache
+
+    # Drain upstream before the fetch engine starts: the sitemap stages do blocking
+    # streaming HTTP and would otherwise run inside its event loop, stalling the rate limiter
+    urls = [row['url'] for row in rows]
+    cache = PageCache()
+    try:
+        pages = fetch_pages(urls, failed=failed, cache=cache)
+        for url, details in parse_pages(pages, workers=workers):
+            if details:
+                yield details
+            elif failed is not None:
+                failed.append(url)
+    finally:
+        cache.save()
+
+def clean_stage(rows):
+    return iter_clean_rows(rows)
+
+def dedupe_stage(rows):
+    # Needs every row to form its blocks, so this stage drains its input first
+    from dedupe_medicines import DEFAULT_REPORT, REPORT_FIELDS, dedupe_rows, write_csv
+
+    canonical, report = dedupe_rows(rows)
+    write_csv(report, DEFAULT_REPORT, REPORT_FIELDS)
+    print(f"  Merged {len(report)} near-duplicates (report: {DEFAULT_REPORT})")
+    yield from canonical
+
+STAGE_FUNCS = {
+    'sitemap': sitemap_stage,
+    'names': names_stage,
+    'detail': detail_stage,
+    'clean': clean_stage,
+}
+
+def run_pipeline(start='sitemap', stop='sql', workers=None, dedupe=False):
+    """
+    Run stages start..stop (inclusive) as one chain of generators.
+    With dedupe=True, near-duplicates are merged right after the clean stage.
+    """
+    selected = STAGES[STAGES.index(start):STAGES.index(stop) + 1]
+    stats = StageStats()
+    failed = []
+    start_time = time.time()
+
+    rows = None
+    if start != 'sitemap':
+        source_file = STAGE_FILES[STAGES[STAGES.index(start) - 1]][0]
+        print(f"Reading input from {source_file}")
+        rows = stats.track('read', read_csv_rows(source_file))
+
+    for name in selected:
+        if name == 'sql':
+            break
+        if name == 'detail':
+            stage_rows = detail_stage(rows, workers=workers, failed=failed)
+        else:
+            stage_rows = STAGE_FUNCS[name](rows)
+        rows = stats.track(name, stage_rows)
+        if name == 'clean' and dedupe:
+            rows = stats.track('dedupe', dedupe_stage(rows))
+
+    output_file, fieldnames = STAGE_FILES[stop]
+    print(f"Running stages: {' -> '.join(selected)}")
+    # Written beside the output and moved into place at the end, so a run that fails
+    # part-way (e.g. the sitemap cannot be downloaded) leaves the previous file intact
+    partial_file = output_file + '.partial'
+    try:
+        if stop == 'sql':
+            rows = stats.track('sql', rows)
+            total = write_sql(rows, partial_file)
+        else:
+            total = write_csv_rows(rows, partial_file, fieldnames)
+    except BaseException:
+        if os.path.exists(partial_file):
+            os.remove(partial_file)
+        raise
+    os.replace(partial_file, output_file)
+
+    elapsed = time.time() - start_time
+    print(f"\n✓ Pipeline complete: {total} records written to {output_file}")
+    if failed:
+        print(f"  Failed detail pages: {len(failed)}")
+    stats.report(elapsed)
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+    from scrape_medicines import SitemapDownloadError
+
+    parser = argparse.ArgumentParser(description="Streaming catalogue build: sitemap -> names -> detail -> clean -> sql")
+    parser.add_argument('--from', dest='start', choices=STAGES, default='sitemap',
+                        help="First stage to run (earlier output is read from its CSV)")
+    parser.add_argument('--to', dest='stop', choices=STAGES, default='sql',
+                        help="Last stage to run (its output is written to its usual file)")
+    parser.add_argument('--workers', type=int, default=None, help="Parser processes for the detail stage")
+    parser.add_argument('--dedupe', action='store_true', help="Merge near-duplicate medicines after cleaning")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    if STAGES.index(args.start) > STAGES.index(args.stop):
+        parser.error("--from must not come after --to")
+
+    reporter = start_reporter(args)
+    try:
+        run_pipeline(args.start, args.stop, workers=args.workers, dedupe=args.dedupe)
+    except KeyboardInterrupt:
+        print("\n\nPipeline interrupted by user.")
+    except SitemapDownloadError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    finally:
+        if reporter:
+            reporter.stop()
@@ -1,5 +1,49 @@
 import csv
 import re
+import time
+from functools import lru_cache
+from metrics import metrics, add_metrics_arguments, start_reporter
+
+# Common patterns, applied in this order by the reference (sequential) cleaner
+STATIC_PATTERNS = [
+    r'\d+\s*x\s*\d+\'?s?',   # 20x10's
+    r'\d+\'?s',              # 10's
+    r'\d+mg',                # 500mg
+    r'\d+\s+mg',             # 500 mg
+    r'\d+ml',                # 100ml
+    r'\d+\s+ml',             # 100 ml
+    r'\d+gm',                # 1gm
+    r'\d+\s+gm',             # 1 gm
+    r'\bTablet\b', r'\bCapsule\b', r'\bSyrup\b', r'\bInjection\b', 
+    r'\bSuspension\b', r'\bDrops\b', r'\bCream\b', r'\bOintment\b',
+    r'\bGel\b', r'\bSachet\b', r'\bSolution\b'
+]
+
+STATIC_REGEXES = [re.compile(p, re.IGNORECASE) for p in STATIC_PATTERNS]
+
+# All static patterns as one alternation, used only to detect whether any of them applies.
+# Substituting with it in one pass is not equivalent to the sequential passes: a removal can
+# create a match for a later pattern, or take away the \b a later pattern needs
+# ("a2x3'Gel" -> "aGel" sequentially, "a" in one pass).
+STATIC_RE = re.compile('|'.join(f'(?:{p})' for p in STATIC_PATTERNS), re.IGNORECASE)
+
+EDGE_RE = re.compile(r'^\W+|\W+$')
+SPACE_RE = re.compile(r'\s+')
+
+@lru_cache(maxsize=4096)
+def _word_pattern(token):
+    return re.compile(r'\b' + re.escape(token) + r'\b', re.IGNORECASE)
+
+@lru_cache(maxsize=4096)
+def _strength_patterns(strength):
+    # Remove strength with/without space variation
+    alt_strength = strength.replace(' ', '') if ' ' in strength else strength.replace('mg', ' mg')
+    return _word_pattern(strength), _word_pattern(alt_strength)
+
+def _remove_static_sequential(clean):
+    for regex in STATIC_REGEXES:
+        clean = regex.sub('', clean)
+    return clean
 
 def clean_brand_name(brand, strength, form):
     """
@@ -9,89 +53,107 @@ def clean_brand_name(brand, strength, form):
     
     # Remove form (case insensitive)
     if form:
-        clean = re.sub(r'\b' + re.escape(form) + r'\b', '', clean, flags=re.IGNORECASE)
+        clean = _word_pattern(form).sub('', clean)
     
     # Remove strength (case insensitive)
     if strength:
-        # Remove exact strength match
-        clean = re.sub(r'\b' + re.escape(strength) + r'\b', '', clean, flags=re.IGNORECASE)
-        # Remove strength with/without space variation
-        alt_strength = strength.replace(' ', '') if ' ' in strength else strength.replace('mg', ' mg')
-        clean = re.sub(r'\b' + re.escape(alt_strength) + r'\b', '', clean, flags=re.IGNORECASE)
-        
-    # Remove common patterns
-    patterns = [
-        r'\d+\s*x\s*\d+\'?s?',   # 20x10's
-        r'\d+\'?s',              # 10's
-        r'\d+mg',                # 500mg
-        r'\d+\s+mg',             # 500 mg
-        r'\d+ml',                # 100ml
-        r'\d+\s+ml',             # 100 ml
-        r'\d+gm',                # 1gm
-        r'\d+\s+gm',             # 1 gm
-        r'\bTablet\b', r'\bCapsule\b', r'\bSyrup\b', r'\bInjection\b', 
-        r'\bSuspension\b', r'\bDrops\b', r'\bCream\b', r'\bOintment\b',
-        r'\bGel\b', r'\bSachet\b', r'\bSolution\b'
-    ]
+        exact, alt = _strength_patterns(strength)
+        clean = exact.sub('', clean)
+        clean = alt.sub('', clean)
     
-    for pattern in patterns:
-        clean = re.sub(pattern, '', clean, flags=re.IGNORECASE)
+    # Remove common patterns, in order; names with none of them skip the passes
+    if STATIC_RE.search(clean):
+        clean = _remove_static_sequential(clean)
         
     # Remove trailing/leading special chars and spaces
-    clean = re.sub(r'^\W+|\W+$', '', clean)
-    clean = re.sub(r'\s+', ' ', clean).strip()
+    clean = EDGE_RE.sub('', clean)
+    clean = SPACE_RE.sub(' ', clean).strip()
     
     return clean
 
-def clean_data():
-    print("Cleaning data...")
+def clean_brand_names(brands, strengths, forms):
+    """
+    Batch version of clean_brand_name for a whole column.
+    Repeated (brand, strength, form) combinations are only cleaned once.
+    """
+    cache = {}
+    cleaned = []
+    for key in zip(brands, strengths, forms):
+        result = cache.get(key)
+        if result is None:
+            result = cache[key] = clean_brand_name(*key)
+        cleaned.append(result)
+    return cleaned
+
+CLEANED_FIELDS = ['brand_name', 'generic_name', 'manufacturer', 'strength', 'dosage_form', 'pack_size', 'original_brand_name']
+
+def clean_rows(rows):
+    """
+    Standardize a batch of detailed rows and clean their brand names
+    """
+    # 1. Standardize Form (Title Case)
+    forms = [row['dosage_form'].strip().title() for row in rows]
+    
+    # 2. Standardize Strength (remove space)
+    strengths = [row['strength'].strip().lower().replace(' ', '') for row in rows]
+    
+    # 3. Clean Brand Names (whole column at once)
+    original_brands = [row['brand_name'].strip() for row in rows]
+    clean_brands = clean_brand_names(original_brands, strengths, forms)
     
     cleaned_rows = []
+    for row, form, strength, original_brand, clean_brand in zip(rows, forms, strengths, original_brands, clean_brands):
+        # If cleaning resulted in empty string (rare), keep original
+        if not clean_brand:
+            clean_brand = original_brand
+            
+        # MERGE: Append strength to brand name for clarity
+        # But only if strength is present
+        final_brand_name = clean_brand
+        if strength:
+            final_brand_name = f"{clean_brand} {strength}"
+        
+        # 4. Standardize Manufacturer (Title Case)
+        manufacturer = row['manufacturer'].strip()
+        
+        cleaned_rows.append({
+            'brand_name': final_brand_name,
+            'generic_name': row['generic_name'].strip(),
+            'manufacturer': manufacturer,
+            'strength': strength,
+            'dosage_form': form,
+            'pack_size': row['pack_size'].strip(),
+            'original_brand_name': original_brand # Keep original for reference
+        })
+    return cleaned_rows
+
+def iter_clean_rows(rows, batch_size=1000):
+    """
+    Streaming version of clean_rows: cleans `batch_size` rows at a time
+    """
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield from clean_rows(batch)
+            batch = []
+    if batch:
+        yield from clean_rows(batch)
+
+def clean_data():
+    print("Cleaning data...")
+    start_time = time.time()
     
     with open('dawaai_medicines_final.csv', 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        
-        for row in reader:
-            # 1. Standardize Form (Title Case)
-            form = row['dosage_form'].strip().title()
-            
-            # 2. Standardize Strength (remove space)
-            strength = row['strength'].strip().lower().replace(' ', '')
-            
-            # 3. Clean Brand Name
-            original_brand = row['brand_name'].strip()
-            clean_brand = clean_brand_name(original_brand, strength, form)
-            
-            # If cleaning resulted in empty string (rare), keep original
-            if not clean_brand:
-                clean_brand = original_brand
-                
-            # MERGE: Append strength to brand name for clarity
-            # But only if strength is present
-            final_brand_name = clean_brand
-            if strength:
-                final_brand_name = f"{clean_brand} {strength}"
-            
-            # 4. Standardize Manufacturer (Title Case)
-            manufacturer = row['manufacturer'].strip()
-            
-            cleaned_rows.append({
-                'brand_name': final_brand_name,
-                'generic_name': row['generic_name'].strip(),
-                'manufacturer': manufacturer,
-                'strength': strength,
-                'dosage_form': form,
-                'pack_size': row['pack_size'].strip(),
-                'original_brand_name': original_brand # Keep original for reference
-            })
+        cleaned_rows = clean_rows(list(csv.DictReader(f)))
             
     # Save cleaned data
     output_file = 'dawaai_medicines_cleaned_final.csv'
     with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        fieldnames = ['brand_name', 'generic_name', 'manufacturer', 'strength', 'dosage_form', 'pack_size', 'original_brand_name']
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer = csv.DictWriter(f, fieldnames=CLEANED_FIELDS)
         writer.writeheader()
         writer.writerows(cleaned_rows)
+    metrics.stage('clean', len(cleaned_rows), time.time() - start_time)
         
     print(f"✓ Successfully cleaned {len(cleaned_rows)} medicines")
     print(f"  Saved to: {output_file}")
@@ -106,4 +168,15 @@ def clean_data():
         print("-" * 30)
 
 if __name__ == '__main__':
-    clean_data()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Clean dawaai_medicines_final.csv into dawaai_medicines_cleaned_final.csv")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    reporter = start_reporter(args)
+    try:
+        clean_data()
+    finally:
+        if reporter:
+            reporter.stop()
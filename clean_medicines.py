@@ -1,5 +1,12 @@
 import csv
 
+def is_valid_medicine_name(name):
+    """
+    Entries that are just numbers (sitemap IDs) or single characters are not medicines
+    """
+    name = name.strip()
+    return not name.isdigit() and len(name) > 1
+
 def clean_medicine_list():
     """
     Filter out invalid entries (numeric IDs) and keep only valid medicine names
@@ -11,9 +18,8 @@ def clean_medicine_list():
     with open('dawaai_medicines.csv', 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         for row in reader:
-            name = row['name'].strip()
             # Filter out entries that are just numbers
-            if not name.isdigit() and len(name) > 1:
+            if is_valid_medicine_name(row['name']):
                 valid_medicines.append(row)
             else:
                 invalid_count += 1
@@ -24,7 +30,7 @@ def clean_medicine_list():
     # Save cleaned list
     output_file = 'dawaai_medicines_clean.csv'
     with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        fieldnames = ['name', 'url']
+        fieldnames = ['name', 'url', 'lastmod']
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         writer.writeheader()
         for med in sorted(valid_medicines, key=lambda x: x['name'].lower()):
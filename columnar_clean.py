@@ -0,0 +1,156 @@
+import time
+import pandas as pd
+from clean_data import CLEANED_FIELDS, STATIC_RE, STATIC_REGEXES, EDGE_RE, SPACE_RE, _strength_patterns, _word_pattern
+from metrics import metrics, add_metrics_arguments, start_reporter
+
+# Columnar versions of clean_medicines.py, clean_data.py and analyze_data.py.
+# Each CSV is loaded once into a DataFrame and the string operations run over whole
+# columns; the stages can be chained in memory and only the final result is written.
+
+STAGES = ['medicines', 'analyze', 'clean']
+
+def load_frame(path):
+    """
+    Read a CSV with every column as text and empty cells as '' (like csv.DictReader)
+    """
+    return pd.read_csv(path, dtype=str, keep_default_na=False, encoding='utf-8')
+
+def clean_medicine_frame(df):
+    """
+    clean_medicines.py: drop numeric/one-character names and sort by name
+    """
+    name = df['name'].str.strip()
+    valid = df[~name.str.isdigit() & (name.str.len() > 1)]
+    return valid.iloc[valid['name'].str.lower().argsort(kind='stable')].reset_index(drop=True)
+
+def _remove_per_value(clean, values, patterns):
+    """
+    Remove each row's own patterns in place: one Series.str.replace per distinct value, over
+    the rows that share it (compiled patterns come from clean_data's LRU cache)
+    """
+    values = pd.Series(values.to_numpy(dtype=object))
+    present = values[values != '']
+    for value, positions in present.groupby(present, sort=False).indices.items():
+        rows = present.index.to_numpy()[positions]
+        group = pd.Series(clean[rows], dtype=object)
+        for regex in patterns(value):
+            group = group.str.replace(regex, '', regex=True)
+        clean[rows] = group.to_numpy()
+
+def clean_brand_column(brands, strengths, forms):
+    """
+    Column-wide clean_brand_name with identical output
+    """
+    clean = brands.to_numpy(dtype=object, copy=True)
+    _remove_per_value(clean, forms, lambda form: [_word_pattern(form)])
+    _remove_per_value(clean, strengths, _strength_patterns)
+    clean = pd.Series(clean, index=brands.index, dtype=object)
+
+    # The static patterns one after another, as a removal can expose or break a later match;
+    # names with none of them skip the passes
+    static = clean.str.contains(STATIC_RE, regex=True)
+    if static.any():
+        matched = clean[static]
+        for regex in STATIC_REGEXES:
+            matched = matched.str.replace(regex, '', regex=True)
+        clean[static] = matched
+
+    clean = clean.str.replace(EDGE_RE, '', regex=True)
+    return clean.str.replace(SPACE_RE, ' ', regex=True).str.strip()
+
+def clean_detail_frame(df):
+    """
+    clean_data.py: standardize form/strength, clean brand names and append the strength
+    """
+    form = df['dosage_form'].str.strip().str.title()
+    strength = df['strength'].str.strip().str.lower().str.replace(' ', '', regex=False)
+    original_brand = df['brand_name'].str.strip()
+
+    clean_brand = clean_brand_column(original_brand, strength, form)
+    # If cleaning resulted in empty string (rare), keep original
+    clean_brand = clean_brand.where(clean_brand != '', original_brand)
+    # Append strength to brand name when present
+    brand_name = clean_brand.where(strength == '', clean_brand + ' ' + strength)
+
+    return pd.DataFrame({
+        'brand_name': brand_name,
+        'generic_name': df['generic_name'].str.strip(),
+        'manufacturer': df['manufacturer'].str.strip(),
+        'strength': strength,
+        'dosage_form': form,
+        'pack_size': df['pack_size'].str.strip(),
+        'original_brand_name': original_brand,
+    }, columns=CLEANED_FIELDS)
+
+def _frequency(values, normalize):
+    # Same counts and tie order as Counter.most_common (first-seen order within equal counts)
+    keys = normalize(values)
+    counts = keys.groupby(keys, sort=False).size()
+    return counts.sort_values(ascending=False, kind='stable')
+
+def frequency_tables(df):
+    """
+    analyze_data.py: dosage form, strength and manufacturer frequencies as group-by counts
+    """
+    lower_strip = lambda s: s.str.lower().str.strip()
+    return {
+        'forms': _frequency(df.loc[df['dosage_form'] != '', 'dosage_form'], lower_strip),
+        'strengths': _frequency(df.loc[df['strength'] != '', 'strength'], lower_strip),
+        'manufacturers': _frequency(df.loc[df['manufacturer'] != '', 'manufacturer'], lambda s: s.str.strip()),
+    }
+
+def print_frequency_tables(tables, top=20):
+    for title, key in [('Dosage Forms', 'forms'), ('Strengths', 'strengths'), ('Manufacturers', 'manufacturers')]:
+        print(f"\nTop {top} {title}:")
+        for value, count in tables[key].head(top).items():
+            print(f"  {value}: {count}")
+
+def run_columnar(stages, medicines_file='dawaai_medicines.csv', detailed_file='dawaai_medicines_final.csv'):
+    """
+    Run the selected stages ('medicines', 'analyze', 'clean') in memory.
+    The detail CSV is read once and shared by the analyze and clean stages.
+    """
+    if 'medicines' in stages:
+        start_time = time.time()
+        medicines = clean_medicine_frame(load_frame(medicines_file))
+        medicines.to_csv('dawaai_medicines_clean.csv', index=False, encoding='utf-8')
+        metrics.stage('medicines', len(medicines), time.time() - start_time)
+        print(f"✓ Saved {len(medicines)} clean medicine names to dawaai_medicines_clean.csv")
+
+    if 'analyze' in stages or 'clean' in stages:
+        detailed = load_frame(detailed_file)
+
+        if 'analyze' in stages:
+            start_time = time.time()
+            tables = frequency_tables(detailed)
+            metrics.stage('analyze', len(detailed), time.time() - start_time)
+            print_frequency_tables(tables)
+
+        if 'clean' in stages:
+            start_time = time.time()
+            cleaned = clean_detail_frame(detailed)
+            cleaned.to_csv('dawaai_medicines_cleaned_final.csv', index=False, encoding='utf-8')
+            metrics.stage('clean', len(cleaned), time.time() - start_time)
+            print(f"✓ Successfully cleaned {len(cleaned)} medicines")
+            print("  Saved to: dawaai_medicines_cleaned_final.csv")
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Columnar (pandas) cleaning and analysis stages")
+    parser.add_argument('stages', nargs='*', metavar='stage',
+                        help="Stages to run: medicines, analyze, clean (default: all)")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    
+    stages = set(args.stages or STAGES)
+    unknown = stages - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+
+    reporter = start_reporter(args)
+    try:
+        run_columnar(stages)
+    finally:
+        if reporter:
+            reporter.stop()
@@ -0,0 +1,165 @@
+import csv
+import hashlib
+from collections import defaultdict
+from clean_data import CLEANED_FIELDS
+from medicine_extractors import DOSAGE_FORMS
+from medicine_index import brand_key, generic_key, trigrams
+from strength_parser import strength_key
+
+# Near-duplicate detection for the cleaned catalogue. Rows such as "Panadol 500mg",
+# "Panadol 500 mg Tablet" and "Panadol 0.5g" are the same product but survive the
+# exact-name and (brand_name, strength) dedup.
+#
+# Rows are blocked by (generic name, normalized strength from strength_parser.py);
+# within a block they are sorted by base brand name and each row is compared with
+# the next few only (sorted neighbourhood), so the work grows with n * window rather than n^2.
+# Matches are merged with union-find and every cluster gets a stable canonical ID.
+
+DEFAULT_INPUT = 'dawaai_medicines_cleaned_final.csv'
+DEFAULT_OUTPUT = 'dawaai_medicines_deduped.csv'
+DEFAULT_REPORT = 'dedupe_report.csv'
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_WINDOW = 5
+
+DEDUPED_FIELDS = CLEANED_FIELDS + ['canonical_id', 'duplicates']
+REPORT_FIELDS = ['canonical_id', 'canonical_brand', 'duplicate_brand', 'duplicate_strength', 'similarity']
+
+FORM_WORDS = set(DOSAGE_FORMS) | {form + 's' for form in DOSAGE_FORMS} | {'tab', 'tabs', 'cap', 'caps', 'inj', 'syp'}
+
+def base_name(brand_name):
+    """
+    Brand key without strength, pack or dosage-form words
+    """
+    return ' '.join(word for word in brand_key(brand_name).split() if word not in FORM_WORDS)
+
+def similarity(a, b):
+    if a == b:
+        return 1.0
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    shared = len(grams_a & grams_b)
+    return shared / (len(grams_a) + len(grams_b) - shared)
+
+def completeness(row):
+    return sum(1 for field in CLEANED_FIELDS if row.get(field))
+
+def canonical_id(row):
+    key = '|'.join([generic_key(row.get('generic_name', '')), strength_key(row.get('strength', '')),
+                    base_name(row['brand_name']), (row.get('dosage_form') or '').lower()])
+    return 'MED-' + hashlib.md5(key.encode('utf-8')).hexdigest()[:12]
+
+def find_clusters(rows, threshold=DEFAULT_THRESHOLD, window=DEFAULT_WINDOW):
+    """
+    Group near-duplicate rows. Returns (clusters, pairs): clusters is a list of row-index
+    lists, pairs maps a merged index to the (index, similarity) it was matched with.
+    """
+    parent = list(range(len(rows)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    bases, forms = [], []
+    blocks = defaultdict(list)
+    for i, row in enumerate(rows):
+        base = base_name(row['brand_name'])
+        bases.append(base)
+        forms.append((row.get('dosage_form') or '').lower())
+        generic = generic_key(row.get('generic_name', ''))
+        strength = strength_key(row.get('strength', ''))
+        # Without a generic name, fall back to the first letters of the brand
+        blocks[(generic, strength) if generic else ('', strength, base[:3])].append(i)
+
+    cluster_forms = list(forms)
+    pairs = {}
+    for members in blocks.values():
+        members.sort(key=lambda i: (bases[i], i))
+        for pos, i in enumerate(members):
+            for j in members[pos + 1:pos + 1 + window]:
+                root_i, root_j = find(i), find(j)
+                if root_i == root_j:
+                    continue
+                # Different forms (tablet vs injection) are different products. A blank form
+                # matches anything, but only once: the cluster then takes the other's form.
+                form_i, form_j = cluster_forms[root_i], cluster_forms[root_j]
+                if form_i and form_j and form_i != form_j:
+                    continue
+                score = similarity(bases[i], bases[j])
+                if score >= threshold:
+                    parent[root_j] = root_i
+                    cluster_forms[root_i] = form_i or form_j
+                    pairs.setdefault(j, (i, score))
+
+    clusters = defaultdict(list)
+    for i in range(len(rows)):
+        clusters[find(i)].append(i)
+    return list(clusters.values()), pairs
+
+def dedupe_rows(rows, threshold=DEFAULT_THRESHOLD, window=DEFAULT_WINDOW):
+    """
+    Returns (canonical rows with canonical_id/duplicates, merge report rows)
+    """
+    rows = list(rows)
+    clusters, pairs = find_clusters(rows, threshold, window)
+
+    canonical, report = [], []
+    for members in clusters:
+        # Most complete row wins, then the shortest name, then the earliest
+        keep = min(members, key=lambda i: (-completeness(rows[i]), len(rows[i]['brand_name']), i))
+        record = dict(rows[keep])
+        record['canonical_id'] = canonical_id(record)
+        record['duplicates'] = len(members) - 1
+        canonical.append((keep, record))
+        for i in members:
+            if i != keep:
+                report.append({
+                    'canonical_id': record['canonical_id'],
+                    'canonical_brand': record['brand_name'],
+                    'duplicate_brand': rows[i]['brand_name'],
+                    'duplicate_strength': rows[i].get('strength', ''),
+                    'similarity': round(pairs[i][1], 3) if i in pairs else 1.0,
+                })
+
+    canonical.sort(key=lambda item: item[0])
+    return [record for _, record in canonical], report
+
+def write_csv(rows, path, fieldnames):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+
+def dedupe_medicines(input_file=DEFAULT_INPUT, output_file=DEFAULT_OUTPUT, report_file=DEFAULT_REPORT,
+                     threshold=DEFAULT_THRESHOLD, window=DEFAULT_WINDOW):
+    print("Finding near-duplicate medicines...")
+    with open(input_file, 'r', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+
+    canonical, report = dedupe_rows(rows, threshold, window)
+    write_csv(canonical, output_file, DEDUPED_FIELDS)
+    write_csv(report, report_file, REPORT_FIELDS)
+
+    print(f"✓ {len(rows)} rows -> {len(canonical)} canonical medicines ({len(report)} merged)")
+    print(f"  Saved to: {output_file}")
+    print(f"  Merge report: {report_file}")
+    return canonical, report
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Cluster near-duplicate medicines and assign canonical IDs")
+    parser.add_argument('--input', default=DEFAULT_INPUT, help=f"Cleaned CSV (default: {DEFAULT_INPUT})")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help=f"Deduplicated CSV (default: {DEFAULT_OUTPUT})")
+    parser.add_argument('--report', default=DEFAULT_REPORT, help=f"Merge report CSV (default: {DEFAULT_REPORT})")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="Trigram similarity to merge")
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW, help="Neighbours compared within a block")
+    args = parser.parse_args()
+
+    start = time.time()
+    dedupe_medicines(args.input, args.output, args.report, args.threshold, args.window)
+    print(f"  Time: {time.time() - start:.2f}s")
@@ -0,0 +1,126 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from http_client import retry_gate
+from metrics import metrics
+
+# Defaults shared by scrape_detailed.py and resume_scrape.py.
+# 3 req/s against one host is still polite, but with 8 requests in flight the
+# per-page latency no longer caps throughput the way time.sleep() did.
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RATE = 3.0
+DEFAULT_BURST = 3
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` tokens per second, holding at most `burst` tokens
+    """
+
+    def __init__(self, rate, burst=1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class HostRateLimiter:
+    """
+    One TokenBucket per host, so the budget holds no matter how many workers run
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+
+    async def acquire(self, url):
+        host = urlparse(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+        await bucket.acquire()
+
+
+async def run_fetches(urls, fetch_fn, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+                      burst=DEFAULT_BURST, on_result=None):
+    """
+    Call fetch_fn(url) for every url using a bounded pool of workers.
+    fetch_fn is a blocking function (e.g. scrape_medicine_details) and runs in a
+    thread pool; on_result(url, result) is called on the event loop as each one finishes.
+    Exceptions from fetch_fn are reported as a None result.
+    Retries inside http_client.fetch wait for the same per-host rate limit (retry_gate).
+    """
+    loop = asyncio.get_running_loop()
+    limiter = HostRateLimiter(rate, burst)
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    def wait_for_token(url):
+        # Runs on a worker thread: block it until the event loop hands out a token
+        wait_start = time.perf_counter()
+        asyncio.run_coroutine_threadsafe(limiter.acquire(url), loop).result()
+        metrics.observe('rate_limit_wait_seconds', time.perf_counter() - wait_start)
+
+    def call(url):
+        token = retry_gate.set(wait_for_token)
+        try:
+            return fetch_fn(url)
+        finally:
+            retry_gate.reset(token)
+
+    async def producer():
+        for url in urls:
+            await queue.put(url)
+            metrics.set('fetch_queue_depth', queue.qsize())
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def worker():
+        while True:
+            url = await queue.get()
+            if url is None:
+                return
+            metrics.set('fetch_queue_depth', queue.qsize())
+            wait_start = time.perf_counter()
+            await limiter.acquire(url)
+            metrics.observe('rate_limit_wait_seconds', time.perf_counter() - wait_start)
+            metrics.add('fetch_in_flight', 1)
+            try:
+                result = await loop.run_in_executor(executor, call, url)
+            except Exception:
+                result = None
+                metrics.inc('fetch_failures_total')
+            finally:
+                metrics.add('fetch_in_flight', -1)
+            if on_result:
+                on_result(url, result)
+
+    try:
+        await asyncio.gather(producer(), *[worker() for _ in range(concurrency)])
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_all(urls, fetch_fn, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+              burst=DEFAULT_BURST, on_result=None):
+    """
+    Synchronous entry point for the scraping scripts
+    """
+    asyncio.run(run_fetches(urls, fetch_fn, concurrency=concurrency, rate=rate,
+                            burst=burst, on_result=on_result))
@@ -0,0 +1,206 @@
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for dawaai.pk so the scrapers can be benchmarked without network access.
+# Serves a recorded corpus of medicine pages (bench_extractors.py --save writes one to
+# saved_pages/) or synthetic pages, plus a sitemap listing them. Latency, 5xx errors and
+# 429 throttling can be injected to exercise the retry and rate-limit paths.
+
+FORMS = ['Tablet', 'Capsule', 'Syrup', 'Injection', 'Cream']
+PACK_SIZES = ["2 x 10's", "10's", "30's", '60ml', '20g']
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><title>{name} - Dawaai.pk</title></head>
+<body>
+<div class="product-detail">
+  <h1>{name} {strength} {form}</h1>
+  <p>Manufactured by <a href="/brands/{company_slug}">{company}</a></p>
+  <p>Generic: <a href="/generic/{generic_slug}">{generic} ({strength})</a></p>
+  <ul>
+    <li>Pack Size: {pack_size}</li>
+  </ul>
+</div>
+</body>
+</html>
+"""
+
+
+def render_medicine_page(medicine_id):
+    """
+    Build a synthetic product page shaped like a dawaai.pk medicine page
+    """
+    return PAGE_TEMPLATE.format(
+        name=f"Medicine{medicine_id}",
+        strength=f"{(medicine_id % 20 + 1) * 25}mg",
+        company=f"Pharma {medicine_id % 50}",
+        company_slug=f"pharma-{medicine_id % 50}",
+        generic=f"Generic{medicine_id % 500}",
+        generic_slug=f"generic{medicine_id % 500}",
+        form=FORMS[medicine_id % len(FORMS)],
+        pack_size=PACK_SIZES[medicine_id % len(PACK_SIZES)],
+    ).encode('utf-8')
+
+
+def synthetic_paths(count):
+    return [f"Medicine{i}-{i}.html" for i in range(1, count + 1)]
+
+
+def load_corpus(corpus_dir):
+    """
+    {file name: page bytes} for a directory of saved medicine pages
+    """
+    corpus = {}
+    for name in sorted(os.listdir(corpus_dir)):
+        with open(os.path.join(corpus_dir, name), 'rb') as f:
+            corpus[name] = f.read()
+    return corpus
+
+
+def render_sitemap(base_url, names):
+    urls = "".join(
+        f"<url><loc>{base_url}/medicine/{name}</loc></url>"
+        for name in names
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        f"{urls}</urlset>"
+    ).encode('utf-8')
+
+
+class FixtureStats:
+    """
+    Responses served, by status (shared by the handler threads)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.statuses = {}
+
+    def count(self, status):
+        with self._lock:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    @property
+    def total(self):
+        return sum(self.statuses.values())
+
+
+def make_handler(latency, sitemap_size, error_rate=0.0, throttle_rate=0.0, retry_after=1,
+                 corpus=None, stats=None, seed=None):
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+    names = list(corpus) if corpus else synthetic_paths(sitemap_size)
+
+    def roll():
+        with rng_lock:
+            return rng.random()
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def send_status(self, status, headers=()):
+            if stats is not None:
+                stats.count(status)
+            self.send_response(status)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+
+            if self.path.startswith('/medicine/'):
+                # Faults only hit detail pages, so a run always gets its sitemap
+                draw = roll()
+                if draw < throttle_rate:
+                    self.send_status(429, [('Retry-After', str(retry_after))])
+                    return
+                if draw < throttle_rate + error_rate:
+                    self.send_status(503)
+                    return
+
+            if self.path == '/sitemap.xml':
+                body = render_sitemap(f"http://{self.headers['Host']}", names)
+                content_type = 'application/xml'
+            elif self.path.startswith('/medicine/'):
+                name = self.path[len('/medicine/'):]
+                if corpus:
+                    body = corpus.get(name)
+                    if body is None:
+                        self.send_status(404)
+                        return
+                else:
+                    try:
+                        medicine_id = int(name.rsplit('-', 1)[1].split('.')[0])
+                    except (IndexError, ValueError):
+                        medicine_id = 0
+                    body = render_medicine_page(medicine_id)
+                content_type = 'text/html; charset=utf-8'
+            else:
+                self.send_status(404)
+                return
+
+            if stats is not None:
+                stats.count(200)
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FixtureHandler
+
+
+def start_fixture_server(latency=0.0, sitemap_size=100, port=0, error_rate=0.0, throttle_rate=0.0,
+                         retry_after=1, corpus_dir=None, seed=None):
+    """
+    Start the fixture server on a background thread.
+    error_rate / throttle_rate: fraction of detail-page requests answered with 503 / 429.
+    corpus_dir: serve these saved pages (and list them in the sitemap) instead of synthetic ones.
+    Returns (server, base_url); call server.shutdown() when done. server.stats counts responses.
+    """
+    corpus = load_corpus(corpus_dir) if corpus_dir else None
+    stats = FixtureStats()
+    handler = make_handler(latency, sitemap_size, error_rate=error_rate, throttle_rate=throttle_rate,
+                           retry_after=retry_after, corpus=corpus, stats=stats, seed=seed)
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    server.stats = stats
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for dawaai.pk")
+    parser.add_argument('--port', type=int, default=0, help="Port to listen on (default: any free port)")
+    parser.add_argument('--latency', type=float, default=0.2, help="Seconds added to every response")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of page requests answered 503")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="Fraction of page requests answered 429")
+    parser.add_argument('--sitemap-size', type=int, default=100, help="Synthetic pages listed in the sitemap")
+    parser.add_argument('--corpus', metavar='DIR', help="Serve saved pages from DIR instead of synthetic ones")
+    args = parser.parse_args()
+
+    server, base_url = start_fixture_server(latency=args.latency, sitemap_size=args.sitemap_size, port=args.port,
+                                            error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+                                            corpus_dir=args.corpus)
+    print(f"Fixture server running at {base_url} (Ctrl+C to stop)")
+    print(f"  Sitemap: {base_url}/sitemap.xml")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,110 @@
+import os
+import time
+from sales_rollup import run_partitions
+
+# Maintenance tool for customer_frequent_items (migration_v27_frequent_items_delta.sql).
+# Sale lines are queued in customer_frequent_items_delta by a statement-level trigger; this
+# tool drains the queue and can recompute the table from sales history.
+#
+#   merge    fold pending delta lines into customer_frequent_items (loop with --every when
+#            pg_cron is not available to schedule merge_customer_frequent_items())
+#   rebuild  recompute from history, customers split into hash shards rebuilt in parallel,
+#            each by rebuild_customer_frequent_items() on its own connection
+#   status   size and age of the pending delta
+#
+#   python frequent_items.py merge --every 60
+#   python frequent_items.py rebuild --shards 16 --jobs 4
+
+DEFAULT_BATCH_SIZE = 100000
+DEFAULT_SHARDS = 16
+DEFAULT_JOBS = 4
+
+def merge(dsn, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Merge batches until the delta is empty. Returns the rows written.
+    """
+    import psycopg
+
+    total = 0
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        while True:
+            rows = conn.execute("SELECT merge_customer_frequent_items(%s)", (batch_size,)).fetchone()[0]
+            if not rows:
+                return total
+            total += rows
+
+def rebuild_shard(dsn, shard, shards):
+    """
+    Rebuild one shard in its own transaction. Returns the rows it now holds.
+    """
+    import psycopg
+
+    with psycopg.connect(dsn) as conn:
+        return conn.execute("SELECT rebuild_customer_frequent_items(%s, %s)", (shard, shards)).fetchone()[0]
+
+def rebuild(dsn, shards=DEFAULT_SHARDS, jobs=DEFAULT_JOBS):
+    """
+    Recompute customer_frequent_items from sales history. Returns the shards that failed.
+    """
+    print(f"Rebuilding customer_frequent_items: {shards} shards, {jobs} jobs")
+    failed, total_rows = [], 0
+    start_time = time.time()
+    for (shard, _), rows, error in run_partitions(dsn, [(shard, shards) for shard in range(shards)], rebuild_shard, jobs):
+        if error:
+            failed.append(shard)
+            print(f"  ✗ shard {shard}/{shards}: {error}")
+        else:
+            total_rows += rows
+            print(f"  ✓ shard {shard}/{shards}: {rows} rows")
+
+    elapsed = time.time() - start_time
+    print(f"\n✓ Rebuilt {shards - len(failed)}/{shards} shards ({total_rows} rows) in {elapsed:.1f}s")
+    if failed:
+        print(f"  Failed shards: {', '.join(map(str, sorted(failed)))} (re-run with --shard to retry one)")
+    return failed
+
+def status(dsn):
+    import psycopg
+
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        pending, oldest = conn.execute(
+            "SELECT COUNT(*), MIN(purchased_at) FROM public.customer_frequent_items_delta"
+        ).fetchone()
+    print(f"Pending delta lines: {pending}" + (f" (oldest {oldest})" if oldest else ""))
+    return pending
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Merge, rebuild or inspect customer_frequent_items")
+    parser.add_argument('command', choices=['merge', 'rebuild', 'status'])
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'),
+                        help="PostgreSQL connection string (default: $DATABASE_URL)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Delta lines per merge transaction (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument('--every', type=float, default=None, help="merge: repeat every N seconds until interrupted")
+    parser.add_argument('--shards', type=int, default=DEFAULT_SHARDS, help=f"rebuild: customer shards (default: {DEFAULT_SHARDS})")
+    parser.add_argument('--shard', type=int, default=None, help="rebuild: only this shard (0-based)")
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS, help=f"rebuild: parallel connections (default: {DEFAULT_JOBS})")
+    args = parser.parse_args()
+
+    if not args.dsn:
+        parser.error("pass --dsn or set DATABASE_URL")
+
+    if args.command == 'status':
+        status(args.dsn)
+    elif args.command == 'merge':
+        while True:
+            start_time = time.time()
+            rows = merge(args.dsn, args.batch_size)
+            print(f"✓ Merged into {rows} customer_frequent_items rows in {time.time() - start_time:.2f}s")
+            if args.every is None:
+                break
+            time.sleep(max(0.0, args.every - (time.time() - start_time)))
+    elif args.shard is not None:
+        if not 0 <= args.shard < args.shards:
+            parser.error("--shard must be between 0 and --shards - 1")
+        print(f"✓ Shard {args.shard}/{args.shards}: {rebuild_shard(args.dsn, args.shard, args.shards)} rows")
+    else:
+        sys.exit(1 if rebuild(args.dsn, args.shards, args.jobs) else 0)
@@ -148,15 +148,29 @@ export default function MedicineReferencePage() {
     async function fetchMedicines() {
         setLoading(true);
         try {
+            const from = page * rowsPerPage;
+
+            if (searchTerm) {
+                // Ranked trigram search over the normalized search_key (migration v23)
+                const { data, error } = await supabase.rpc('search_medicine_reference', {
+                    search_term: searchTerm,
+                    p_category: categoryFilter || null,
+                    p_dosage_form: dosageFormFilter || null,
+                    p_limit: rowsPerPage,
+                    p_offset: from,
+                });
+
+                if (error) throw error;
+                setMedicines(data || []);
+                setTotalCount(data && data.length ? Number(data[0].total_count) : 0);
+                return;
+            }
+
             let query = supabase
                 .from('medicine_reference')
                 .select('*', { count: 'exact' })
                 .order('brand_name', { ascending: true });
 
-            if (searchTerm) {
-                query = query.or(`generic_name.ilike.%${searchTerm}%,brand_name.ilike.%${searchTerm}%,formula.ilike.%${searchTerm}%,manufacturer.ilike.%${searchTerm}%`);
-            }
-
             if (categoryFilter) {
                 query = query.eq('category', categoryFilter);
             }
@@ -165,7 +179,6 @@ export default function MedicineReferencePage() {
                 query = query.eq('dosage_form', dosageFormFilter);
             }
 
-            const from = page * rowsPerPage;
             const to = from + rowsPerPage - 1;
 
             const { data, count, error } = await query.range(from, to);
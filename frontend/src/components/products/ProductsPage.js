@@ -707,7 +707,7 @@ export default function ProductsPage() {
                                                     form: medicine.dosage_form || '',
                                                     strength: medicine.strength || '',
                                                     drug_type: medicine.dosage_form ? medicine.dosage_form.charAt(0).toUpperCase() + medicine.dosage_form.slice(1) : '',
-                                                    items_per_box: extractItemsPerBox(medicine.standard_packaging) || prev.items_per_box,
+                                                    items_per_box: medicine.units_per_pack || extractItemsPerBox(medicine.standard_packaging) || prev.items_per_box,
                                                 }));
                                                 toast.success(`Auto-filled from ${medicine.brand_name}`);
                                             }}
@@ -102,7 +102,8 @@ export default function CreateEditPODialog({ open, onClose, purchaseOrder, suppl
                 isReference: true,
                 name: ref.brand_name,
                 // Map reference fields to product fields
-                items_per_box: ref.standard_packaging ? extractItemsPerBox(ref.standard_packaging) : 1
+                // Prefer the units_per_pack parsed on import (migration v24)
+                items_per_box: ref.units_per_pack || (ref.standard_packaging ? extractItemsPerBox(ref.standard_packaging) : 1)
             })) || [];
 
             setSearchResults([...localMatches, ...newRefItems]);
@@ -163,7 +163,7 @@ export default function SalesPage() {
         setLoading(true);
         try {
             const { data, error } = await supabase
-                .rpc('search_products', {
+                .rpc('search_products_keyset', {
                     search_term: query,
                     p_limit: 50
                 });
@@ -1,9 +1,8 @@
 import csv
+import time
+from metrics import metrics, add_metrics_arguments, start_reporter
 
-def generate_sql():
-    print("Generating SQL migration...")
-    
-    sql_header = """-- Migration: Import Scraped Dawaai.pk Medicines
+SQL_HEADER = """-- Migration: Import Scraped Dawaai.pk Medicines
 -- Date: 2025-12-03
 -- Description: Import 15,000+ medicines into medicine_reference table
 
@@ -14,44 +13,72 @@ ALTER TABLE medicine_reference DROP CONSTRAINT IF EXISTS medicine_reference_dosa
 INSERT INTO medicine_reference (brand_name, generic_name, manufacturer, strength, dosage_form, standard_packaging)
 VALUES
 """
-    
-    values = []
-    
-    with open('dawaai_medicines_cleaned_final.csv', 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            # Escape single quotes in text
-            brand = row['brand_name'].replace("'", "''")
-            generic = row['generic_name'].replace("'", "''")
-            mfg = row['manufacturer'].replace("'", "''")
-            strength = row['strength'].replace("'", "''")
-            form = row['dosage_form'].lower().replace("'", "''") # Lowercase for consistency
-            pack = row['pack_size'].replace("'", "''")
-            
-            # Handle empty fields
-            strength_val = f"'{strength}'" if strength else "NULL"
-            form_val = f"'{form}'" if form else "NULL"
-            pack_val = f"'{pack}'" if pack else "NULL"
-            
-            # (brand, generic, mfg, strength, form, pack)
-            value = f"('{brand}', '{generic}', '{mfg}', {strength_val}, {form_val}, {pack_val})"
-            values.append(value)
-            
-    # Join all values with commas
-    sql_values = ",\n".join(values)
-    
-    # Handle duplicates (ON CONFLICT DO NOTHING)
-    # We have a unique constraint on (brand_name, strength)
-    sql_footer = "\nON CONFLICT (brand_name, strength) DO NOTHING;"
-    
-    full_sql = sql_header + sql_values + sql_footer
+
+# Handle duplicates (ON CONFLICT DO NOTHING)
+# We have a unique constraint on (brand_name, strength)
+SQL_FOOTER = "\nON CONFLICT (brand_name, strength) DO NOTHING;"
+
+IMPORT_COLUMNS = ['brand_name', 'generic_name', 'manufacturer', 'strength', 'dosage_form', 'standard_packaging']
+
+def import_values(row):
+    """
+    Column values for one cleaned row in IMPORT_COLUMNS order (None for NULL)
+    """
+    # Handle empty fields
+    strength = row['strength'] or None
+    form = row['dosage_form'].lower() or None # Lowercase for consistency
+    pack = row['pack_size'] or None
+    return (row['brand_name'], row['generic_name'], row['manufacturer'], strength, form, pack)
+
+def sql_literal(value):
+    # Escape single quotes in text
+    return "NULL" if value is None else "'" + value.replace("'", "''") + "'"
+
+def sql_value(row):
+    """
+    Render one cleaned row as a VALUES tuple
+    """
+    # (brand, generic, mfg, strength, form, pack)
+    return "(" + ", ".join(sql_literal(value) for value in import_values(row)) + ")"
+
+def write_sql(rows, output_file):
+    """
+    Stream rows into a single INSERT migration without building it in memory.
+    Returns the number of records written.
+    """
+    count = 0
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(SQL_HEADER)
+        for row in rows:
+            if count:
+                f.write(",\n")
+            f.write(sql_value(row))
+            count += 1
+        f.write(SQL_FOOTER)
+    return count
+
+def generate_sql():
+    print("Generating SQL migration...")
+    start_time = time.time()
     
     output_file = 'migration_v19_import_scraped_medicines.sql'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(full_sql)
+    with open('dawaai_medicines_cleaned_final.csv', 'r', encoding='utf-8') as f:
+        total = write_sql(csv.DictReader(f), output_file)
+    metrics.stage('sql', total, time.time() - start_time)
         
     print(f"✓ Generated {output_file}")
-    print(f"  Total records: {len(values)}")
+    print(f"  Total records: {total}")
 
 if __name__ == '__main__':
-    generate_sql()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate the medicine_reference import migration from the cleaned CSV")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    reporter = start_reporter(args)
+    try:
+        generate_sql()
+    finally:
+        if reporter:
+            reporter.stop()
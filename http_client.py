@@ -0,0 +1,158 @@
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from metrics import metrics
+
+# Shared HTTP layer for the scraping scripts: one pooled keep-alive session,
+# jittered exponential backoff on 429/5xx and conditional GETs via ETag/Last-Modified.
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_TIMEOUT = 10
+DEFAULT_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+POOL_SIZE = 32
+USER_AGENT = 'MedixFlow-Catalogue-Sync/1.0'
+
+_session = None
+_session_lock = threading.Lock()
+
+# Called with the URL before every retry. fetch_engine sets it for the calls it runs, so
+# retries take a token from the same per-host rate limiter as first attempts.
+retry_gate = contextvars.ContextVar('retry_gate', default=None)
+
+
+def get_session():
+    """
+    Return the process-wide session (created on first use)
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers['User-Agent'] = USER_AGENT
+            _session = session
+        return _session
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """
+    Full-jitter exponential backoff: uniform in [0, min(cap, base * 2^attempt)]
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def retry_after_delay(response):
+    """
+    Seconds requested by a Retry-After header, or None
+    """
+    value = response.headers.get('Retry-After')
+    if value and value.strip().isdigit():
+        return min(BACKOFF_CAP, float(value))
+    return None
+
+
+class ValidatorStore:
+    """
+    ETag / Last-Modified per URL together with the record parsed from that version,
+    so a 304 can hand back the previous result without downloading or parsing the page
+    """
+
+    def __init__(self, path='http_validators.json'):
+        self.path = path
+        self._entries = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+
+    def headers_for(self, url):
+        with self._lock:
+            entry = self._entries.get(url)
+        headers = {}
+        # Only revalidate when we still have the record to return on a 304
+        if entry and entry.get('record') is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def record(self, url):
+        with self._lock:
+            entry = self._entries.get(url)
+        return entry.get('record') if entry else None
+
+    def remember(self, url, response, record):
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            self._entries[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'record': record,
+            }
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self._entries)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+
+def fetch(url, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, validators=None, stream=False):
+    """
+    GET a URL through the shared session.
+    Retries connection errors and 429/5xx responses with jittered exponential backoff
+    (honouring Retry-After), then waits for retry_gate when one is set.
+    When a ValidatorStore is given, sends If-None-Match /
+    If-Modified-Since so unchanged pages come back as 304.
+    Raises requests.RequestException once retries are exhausted on connection errors.
+    """
+    session = get_session()
+    headers = validators.headers_for(url) if validators else {}
+
+    for attempt in range(retries + 1):
+        gate = retry_gate.get()
+        if attempt and gate is not None:
+            gate(url)
+        start = time.perf_counter()
+        try:
+            response = session.get(url, timeout=timeout, headers=headers, stream=stream)
+        except requests.RequestException as e:
+            metrics.observe('fetch_seconds', time.perf_counter() - start, status='error')
+            metrics.inc('http_errors_total', error=type(e).__name__)
+            if attempt == retries:
+                raise
+            metrics.inc('http_retries_total', reason='error')
+            time.sleep(backoff_delay(attempt))
+            continue
+
+        # Without stream the body is already read, so this is the full download time
+        metrics.observe('fetch_seconds', time.perf_counter() - start, status=response.status_code)
+        metrics.inc('http_responses_total', status=response.status_code)
+        if not stream:
+            metrics.inc('http_bytes_total', len(response.content))
+        elif response.headers.get('Content-Length', '').isdigit():
+            metrics.inc('http_bytes_total', int(response.headers['Content-Length']))
+
+        if response.status_code in RETRY_STATUSES and attempt < retries:
+            metrics.inc('http_retries_total', reason=response.status_code)
+            delay = retry_after_delay(response)
+            response.close()
+            time.sleep(delay if delay is not None else backoff_delay(attempt))
+            continue
+
+        return response
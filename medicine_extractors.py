@@ -0,0 +1,276 @@
+import re
+from html import unescape
+
+# Extraction rules for dawaai.pk medicine pages, shared by every backend.
+# Patterns are compiled once here instead of on every page.
+
+DOSAGE_FORMS = ['tablet', 'capsule', 'syrup', 'injection', 'cream', 'ointment', 'drops', 'suspension',
+                'powder', 'solution', 'gel', 'sachet']
+
+# Pattern: "20 x 10's" or "100ml" etc
+PACK_PATTERNS = [re.compile(p, re.I) for p in [
+    r'(\d+\s*x\s*\d+\'?s?)',  # 20 x 10's
+    r'(\d+\s*ml)',             # 100ml
+    r'(\d+\s*mg)',             # 500mg (if not already in strength)
+    r'(\d+\s*tablets?)',       # 10 tablets
+    r'(\d+\s*capsules?)',      # 20 capsules
+    r'(\d+\s*gm)',             # 1gm
+]]
+
+BRANDS_HREF_RE = re.compile(r'/brands/')
+GENERIC_HREF_RE = re.compile(r'/generic/')
+STRENGTH_RE = re.compile(r'\(([^)]+)\)')
+STRENGTH_STRIP_RE = re.compile(r'\s*\([^)]+\)')
+PACK_SIZE_RE = re.compile(r'Pack Size[:\s]+([^\n]+)', re.I)
+
+FIELDNAMES = ['brand_name', 'generic_name', 'manufacturer', 'strength', 'dosage_form', 'pack_size', 'url']
+
+def empty_details(url):
+    return {
+        'brand_name': '',
+        'generic_name': '',
+        'manufacturer': '',
+        'strength': '',
+        'dosage_form': '',
+        'pack_size': '',
+        'url': url
+    }
+
+def _apply_h1(details, h1_text):
+    details['brand_name'] = h1_text
+
+    # Try to extract dosage form from h1 (e.g., "tablet", "syrup", "injection")
+    h1_lower = h1_text.lower()
+    for form in DOSAGE_FORMS:
+        if form in h1_lower:
+            details['dosage_form'] = form
+            break
+
+def _apply_generic(details, generic_text):
+    details['generic_name'] = generic_text
+
+    # Try to extract strength from generic text (e.g., "Paracetamol (500 mg)")
+    strength_match = STRENGTH_RE.search(generic_text)
+    if strength_match:
+        details['strength'] = strength_match.group(1)
+        # Remove strength from generic name
+        details['generic_name'] = STRENGTH_STRIP_RE.sub('', generic_text).strip()
+
+def _apply_pack_fallback(details, h1_text):
+    # If pack size not found, try to extract from h1
+    if details['pack_size'] or h1_text is None:
+        return
+    for pattern in PACK_PATTERNS:
+        match = pattern.search(h1_text)
+        if match:
+            details['pack_size'] = match.group(1)
+            break
+
+# ---------------------------------------------------------------------------
+# Reference backend: BeautifulSoup with html.parser (the original implementation)
+# ---------------------------------------------------------------------------
+
+def extract_with_bs4(content, url):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, 'html.parser')
+    details = empty_details(url)
+
+    # Extract brand name from h1
+    h1 = soup.find('h1')
+    h1_text = h1.get_text(strip=True) if h1 else None
+    if h1_text is not None:
+        _apply_h1(details, h1_text)
+
+    # Extract manufacturer from a[href*="/brands/"]
+    brand_link = soup.find('a', href=BRANDS_HREF_RE)
+    if brand_link:
+        details['manufacturer'] = brand_link.get_text(strip=True)
+
+    # Extract generic name and strength from a[href*="/generic/"]
+    generic_link = soup.find('a', href=GENERIC_HREF_RE)
+    if generic_link:
+        _apply_generic(details, generic_link.get_text(strip=True))
+
+    # Extract pack size - look for text containing "Pack Size:" or similar
+    pack_match = PACK_SIZE_RE.search(soup.get_text())
+    if pack_match:
+        details['pack_size'] = pack_match.group(1).strip()
+
+    _apply_pack_fallback(details, h1_text)
+    return details
+
+# ---------------------------------------------------------------------------
+# lxml backend (optional dependency)
+# ---------------------------------------------------------------------------
+
+def _lxml_text_strip(element):
+    return ''.join(t.strip() for t in element.itertext() if t.strip())
+
+def extract_with_lxml(content, url):
+    import lxml.html
+
+    # Decoded here like the fast backend: given bytes without a charset, lxml assumes Latin-1
+    doc = lxml.html.fromstring(_decode(content))
+    details = empty_details(url)
+
+    h1 = doc.xpath('(//h1)[1]')
+    h1_text = _lxml_text_strip(h1[0]) if h1 else None
+    if h1_text is not None:
+        _apply_h1(details, h1_text)
+
+    brand_link = doc.xpath("(//a[contains(@href, '/brands/')])[1]")
+    if brand_link:
+        details['manufacturer'] = _lxml_text_strip(brand_link[0])
+
+    generic_link = doc.xpath("(//a[contains(@href, '/generic/')])[1]")
+    if generic_link:
+        _apply_generic(details, _lxml_text_strip(generic_link[0]))
+
+    page_text = ''.join(doc.xpath('//text()[not(ancestor::script) and not(ancestor::style)]'))
+    pack_match = PACK_SIZE_RE.search(page_text)
+    if pack_match:
+        details['pack_size'] = pack_match.group(1).strip()
+
+    _apply_pack_fallback(details, h1_text)
+    return details
+
+# ---------------------------------------------------------------------------
+# Fast backend: targeted scan of the raw markup, no tree is built.
+# Each field is located directly and the scan stops at its first hit.
+# ---------------------------------------------------------------------------
+
+# Tag contents: a quoted attribute value may contain '>'
+_ATTRS = r'''(?:[^>"']|"[^"]*"|'[^']*')*'''
+_TOKEN_RE = re.compile(r'<!--.*?-->|<' + _ATTRS + r'>|[^<]+', re.S)
+_H1_RE = re.compile(r'<h1(?:\s' + _ATTRS + r')?>(.*?)</h1\s*>', re.S | re.I)
+_A_RE = re.compile(
+    r'<a\s' + _ATTRS + r'?(?<![\w-])href\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))'
+    + _ATTRS + r'>(.*?)</a\s*>',
+    re.S | re.I
+)
+_PACK_SIZE_RAW_RE = re.compile(r'Pack Size', re.I)
+_ASCII_LOWER = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+_RAW_TEXT_BLOCKS = (('<script', '</script'), ('<style', '</style'), ('<!--', '-->'))
+
+def _decode(content):
+    if isinstance(content, str):
+        return content
+    try:
+        return content.decode('utf-8')
+    except UnicodeDecodeError:
+        return content.decode('windows-1252', errors='replace')
+
+def _in_raw_text(lower_html, pos):
+    """
+    True if pos falls inside a <script>, <style> or comment (not part of the page text)
+    """
+    for open_tag, close_tag in _RAW_TEXT_BLOCKS:
+        if lower_html.rfind(open_tag, 0, pos) > lower_html.rfind(close_tag, 0, pos):
+            return True
+    return False
+
+def _text_strip(fragment):
+    """
+    Equivalent of get_text(strip=True) on a markup fragment
+    """
+    parts = []
+    for match in _TOKEN_RE.finditer(fragment):
+        token = match.group(0)
+        if token[0] != '<':
+            text = unescape(token).strip()
+            if text:
+                parts.append(text)
+    return ''.join(parts)
+
+def _pack_size_from(html, lower_html, pos):
+    """
+    Rebuild the page text starting at a "Pack Size" occurrence until the line ends
+    """
+    chunks = []
+    length = len(html)
+    while pos < length:
+        match = _TOKEN_RE.match(html, pos)
+        if match is None:
+            # Stray '<' that does not start a tag is text
+            chunks.append('<')
+            pos += 1
+            continue
+        token = match.group(0)
+        pos = match.end()
+        if token[0] == '<':
+            tag = lower_html[match.start():match.start() + 7]
+            if tag.startswith('<script') or tag.startswith('<style'):
+                close = lower_html.find('</script' if tag.startswith('<script') else '</style', pos)
+                pos = length if close == -1 else close
+            continue
+        chunks.append(unescape(token))
+        text = ''.join(chunks)
+        pack_match = PACK_SIZE_RE.match(text)
+        # Done once the captured line is terminated by a newline
+        if pack_match and pack_match.end(1) < len(text):
+            return pack_match.group(1).strip()
+    pack_match = PACK_SIZE_RE.match(''.join(chunks))
+    return pack_match.group(1).strip() if pack_match else None
+
+def extract_fast(content, url):
+    html = _decode(content)
+    lower_html = html.translate(_ASCII_LOWER)
+    details = empty_details(url)
+
+    h1_text = None
+    for match in _H1_RE.finditer(html):
+        if not _in_raw_text(lower_html, match.start()):
+            h1_text = _text_strip(match.group(1))
+            _apply_h1(details, h1_text)
+            break
+
+    manufacturer = generic = None
+    for match in _A_RE.finditer(html):
+        href = match.group(1) or match.group(2) or match.group(3) or ''
+        is_brand = manufacturer is None and '/brands/' in href
+        is_generic = generic is None and '/generic/' in href
+        if not (is_brand or is_generic) or _in_raw_text(lower_html, match.start()):
+            continue
+        text = _text_strip(match.group(4))
+        if is_brand:
+            manufacturer = text
+        if is_generic:
+            generic = text
+        if manufacturer is not None and generic is not None:
+            break
+
+    if manufacturer is not None:
+        details['manufacturer'] = manufacturer
+    if generic is not None:
+        _apply_generic(details, generic)
+
+    for match in _PACK_SIZE_RAW_RE.finditer(html):
+        pos = match.start()
+        # Skip occurrences inside a tag (attribute values) or non-text blocks
+        if lower_html.rfind('<', 0, pos) > lower_html.rfind('>', 0, pos):
+            continue
+        if _in_raw_text(lower_html, pos):
+            continue
+        pack_size = _pack_size_from(html, lower_html, pos)
+        if pack_size is not None:
+            details['pack_size'] = pack_size
+            break
+
+    _apply_pack_fallback(details, h1_text)
+    return details
+
+BACKENDS = {
+    'fast': extract_fast,
+    'lxml': extract_with_lxml,
+    'bs4': extract_with_bs4,
+}
+
+DEFAULT_BACKEND = 'fast'
+
+def extract_details(content, url, backend=DEFAULT_BACKEND):
+    """
+    Extract brand_name, generic_name, manufacturer, strength, dosage_form, pack_size
+    from a medicine page using the chosen backend ('fast', 'lxml' or 'bs4')
+    """
+    return BACKENDS[backend](content, url)
@@ -0,0 +1,267 @@
+import bisect
+import csv
+import json
+import math
+import mmap
+import struct
+from array import array
+from collections import Counter
+from search_keys import fold_variants, normalize_text, strip_strength
+
+# Offline medicine lookup for counter staff and supplier-invoice matching, built from
+# dawaai_medicines_cleaned_final.csv with no database round trip:
+#   prefix()  - sorted array of brand keys, binary searched
+#   fuzzy()   - trigram inverted index scored by Jaccard similarity
+#   brands_for_generic() - generic name -> records
+#
+# Everything lives in one flat buffer (string tables and uint32 arrays), so a saved
+# index is mmapped and used in place instead of being parsed on load. Keys use the
+# same normalization and spelling folds as search_keys.py.
+
+DEFAULT_INPUT = 'dawaai_medicines_cleaned_final.csv'
+DEFAULT_INDEX_FILE = 'medicine_index.bin'
+
+MAGIC = b'MEDIDX01'
+RECORD_FIELDS = ['brand_name', 'generic_name', 'manufacturer', 'strength', 'dosage_form', 'pack_size']
+FIELD_SEP = '\x1f'
+
+def brand_key(brand_name):
+    return fold_variants(strip_strength(normalize_text(brand_name)))
+
+def generic_key(generic_name):
+    return fold_variants(normalize_text(generic_name))
+
+def trigrams(key):
+    """
+    Trigrams of each word padded like pg_trgm ('  word ')
+    """
+    grams = set()
+    for word in key.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def _uint32(values):
+    return array('I', values).tobytes()
+
+def _string_table(strings):
+    blob = bytearray()
+    offsets = array('I', [0])
+    for s in strings:
+        blob += s.encode('utf-8')
+        offsets.append(len(blob))
+    return offsets.tobytes(), bytes(blob)
+
+def _postings(keys_to_ids):
+    keys = sorted(keys_to_ids)
+    offsets, postings = [0], []
+    for key in keys:
+        postings.extend(sorted(keys_to_ids[key]))
+        offsets.append(len(postings))
+    return keys, _uint32(offsets), _uint32(postings)
+
+def build_index(rows):
+    """
+    Serialize cleaned rows into the index buffer (bytes)
+    """
+    records, brand_entries, gram_counts = [], [], []
+    grams_to_ids, generics_to_ids = {}, {}
+
+    for record_id, row in enumerate(rows):
+        records.append(FIELD_SEP.join(row.get(field, '') or '' for field in RECORD_FIELDS))
+        key = brand_key(row['brand_name'])
+        brand_entries.append((key, record_id))
+        grams = trigrams(key)
+        gram_counts.append(len(grams))
+        for gram in grams:
+            grams_to_ids.setdefault(gram, []).append(record_id)
+        generic = generic_key(row.get('generic_name', ''))
+        if generic:
+            generics_to_ids.setdefault(generic, []).append(record_id)
+
+    brand_entries.sort()
+    gram_keys, gram_offsets, gram_postings = _postings(grams_to_ids)
+    generic_keys, generic_offsets, generic_postings = _postings(generics_to_ids)
+
+    record_offsets, record_blob = _string_table(records)
+    brand_offsets, brand_blob = _string_table(key for key, _ in brand_entries)
+    gram_key_offsets, gram_key_blob = _string_table(gram_keys)
+    generic_key_offsets, generic_key_blob = _string_table(generic_keys)
+
+    sections = [
+        ('record_offsets', record_offsets), ('record_blob', record_blob),
+        ('brand_offsets', brand_offsets), ('brand_blob', brand_blob),
+        ('brand_ids', _uint32(record_id for _, record_id in brand_entries)),
+        ('gram_counts', _uint32(gram_counts)),
+        ('gram_key_offsets', gram_key_offsets), ('gram_key_blob', gram_key_blob),
+        ('gram_offsets', gram_offsets), ('gram_postings', gram_postings),
+        ('generic_key_offsets', generic_key_offsets), ('generic_key_blob', generic_key_blob),
+        ('generic_offsets', generic_offsets), ('generic_postings', generic_postings),
+    ]
+
+    # Header: magic, JSON length, JSON table of (offset, length) per section; sections 4-byte aligned
+    layout, body, position = {}, bytearray(), 0
+    for name, data in sections:
+        layout[name] = [position, len(data)]
+        body += data
+        padding = -len(data) % 4
+        body += b'\0' * padding
+        position += len(data) + padding
+    header = json.dumps({'records': len(records), 'sections': layout}).encode('utf-8')
+    header += b' ' * (-(len(MAGIC) + 4 + len(header)) % 4)
+    return MAGIC + struct.pack('<I', len(header)) + header + bytes(body)
+
+class _StringTable:
+    """
+    Read-only sequence view over an offsets array and a UTF-8 blob (bisect-able)
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+
+class MedicineIndex:
+    """
+    Lookup index over a serialized buffer (bytes, or an mmap from load())
+    """
+
+    def __init__(self, buffer):
+        view = memoryview(buffer)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError("not a medicine index file")
+        header_len = struct.unpack_from('<I', view, len(MAGIC))[0]
+        start = len(MAGIC) + 4
+        header = json.loads(bytes(view[start:start + header_len]))
+        base = start + header_len
+
+        def section(name, fmt=None):
+            offset, length = header['sections'][name]
+            data = view[base + offset:base + offset + length]
+            return data.cast(fmt) if fmt else data
+
+        self._buffer = buffer
+        self.size = header['records']
+        self._records = _StringTable(section('record_offsets', 'I'), section('record_blob'))
+        self._brand_keys = _StringTable(section('brand_offsets', 'I'), section('brand_blob'))
+        self._brand_ids = section('brand_ids', 'I')
+        self._gram_counts = section('gram_counts', 'I')
+        self._gram_keys = _StringTable(section('gram_key_offsets', 'I'), section('gram_key_blob'))
+        self._gram_offsets = section('gram_offsets', 'I')
+        self._gram_postings = section('gram_postings', 'I')
+        self._generic_keys = _StringTable(section('generic_key_offsets', 'I'), section('generic_key_blob'))
+        self._generic_offsets = section('generic_offsets', 'I')
+        self._generic_postings = section('generic_postings', 'I')
+
+    @classmethod
+    def from_rows(cls, rows):
+        return cls(build_index(rows))
+
+    @classmethod
+    def from_csv(cls, path=DEFAULT_INPUT):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_rows(csv.DictReader(f))
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_FILE):
+        with open(path, 'rb') as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self):
+        return self.size
+
+    def record(self, record_id):
+        return dict(zip(RECORD_FIELDS, self._records[record_id].split(FIELD_SEP)))
+
+    def _postings_for(self, keys, offsets, postings, key):
+        i = bisect.bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            return postings[offsets[i]:offsets[i + 1]]
+        return postings[0:0]
+
+    def prefix(self, query, limit=10):
+        """
+        Records whose brand (without strength) starts with the query, in key order
+        """
+        key = brand_key(query)
+        if not key:
+            return []
+        results = []
+        i = bisect.bisect_left(self._brand_keys, key)
+        while i < len(self._brand_keys) and len(results) < limit and self._brand_keys[i].startswith(key):
+            results.append(self.record(self._brand_ids[i]))
+            i += 1
+        return results
+
+    def fuzzy(self, query, limit=10, threshold=0.3):
+        """
+        (score, record) pairs for brands sharing enough trigrams with the query, best first
+        """
+        grams = trigrams(brand_key(query))
+        if not grams:
+            return []
+        hits = Counter()
+        for gram in grams:
+            hits.update(self._postings_for(self._gram_keys, self._gram_offsets, self._gram_postings, gram).tolist())
+
+        # score >= threshold needs at least threshold * len(grams) shared trigrams,
+        # which discards most candidates before any division
+        needed = max(1, math.ceil(threshold * len(grams)))
+        query_size, counts = len(grams), self._gram_counts
+        scored = [(score, record_id) for record_id, shared in hits.items() if shared >= needed
+                  for score in (shared / (query_size + counts[record_id] - shared),) if score >= threshold]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [(round(score, 3), self.record(record_id)) for score, record_id in scored[:limit]]
+
+    def brands_for_generic(self, generic_name):
+        postings = self._postings_for(self._generic_keys, self._generic_offsets, self._generic_postings,
+                                      generic_key(generic_name))
+        return [self.record(record_id) for record_id in postings]
+
+    def search(self, query, limit=10):
+        """
+        Prefix matches first, topped up with fuzzy matches
+        """
+        results = self.prefix(query, limit)
+        if len(results) < limit:
+            seen = {(r['brand_name'], r['strength']) for r in results}
+            for _, record in self.fuzzy(query, limit):
+                if (record['brand_name'], record['strength']) not in seen:
+                    results.append(record)
+                    if len(results) == limit:
+                        break
+        return results
+
+def save_index(input_file=DEFAULT_INPUT, output_file=DEFAULT_INDEX_FILE):
+    with open(input_file, 'r', encoding='utf-8') as f:
+        data = build_index(csv.DictReader(f))
+    with open(output_file, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or query the offline medicine lookup index")
+    parser.add_argument('query', nargs='*', help="Look up these terms (builds the index if no query is given)")
+    parser.add_argument('--input', default=DEFAULT_INPUT, help=f"Cleaned CSV (default: {DEFAULT_INPUT})")
+    parser.add_argument('--index', default=DEFAULT_INDEX_FILE, help=f"Index file (default: {DEFAULT_INDEX_FILE})")
+    parser.add_argument('--generic', action='store_true', help="Treat the query as a generic name")
+    args = parser.parse_args()
+
+    if not args.query:
+        size = save_index(args.input, args.index)
+        print(f"✓ Saved {args.index} ({size / 1024:.0f} KB)")
+    else:
+        index = MedicineIndex.load(args.index)
+        term = ' '.join(args.query)
+        matches = index.brands_for_generic(term) if args.generic else index.search(term)
+        for record in matches:
+            print(f"  {record['brand_name']} | {record['generic_name']} | {record['manufacturer']} | {record['dosage_form']}")
+        if not matches:
+            print("  No matches")
@@ -0,0 +1,240 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Process-wide metrics for the scraping and cleaning scripts: counters, gauges and
+# fixed-bucket histograms, optionally labelled. A reporter thread writes periodic
+# snapshots as JSON lines and/or a Prometheus text file (node_exporter textfile format),
+# which is enough to tell whether a run is network-, parse- or rate-limit-bound.
+#
+#   from metrics import metrics
+#   metrics.inc('http_responses_total', status=200)
+#   with metrics.time('parse_seconds', backend='fast'): ...
+
+PREFIX = 'scraper_'
+
+# Seconds; covers a cached parse (~1ms) up to a slow fetch with retries
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with an estimated quantile() for reports
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """
+        Linear interpolation inside the bucket holding the q-th observation
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen, lower = 0, 0.0
+        for bound, n in zip(self.buckets + (float('inf'),), self.counts):
+            if n and seen + n >= rank:
+                if bound == float('inf'):
+                    return lower
+                return lower + (bound - lower) * (rank - seen) / n
+            seen += n
+            lower = bound if bound != float('inf') else lower
+        return lower
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'buckets': dict(zip([str(b) for b in self.buckets] + ['+Inf'], self.counts)),
+        }
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _label_text(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}'
+
+def _display_name(name, labels):
+    return name + _label_text(labels)
+
+class MetricsRegistry:
+    """
+    Thread-safe store of counters, gauges and histograms keyed by (name, labels)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self.started = time.time()
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def add(self, name, delta, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._gauges[key] = self._gauges.get(key, 0) + delta
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def time(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def stage(self, name, rows, seconds):
+        """
+        Totals for a batch stage that has finished: rows, wall time and throughput
+        """
+        self.inc('stage_rows_total', rows, stage=name)
+        self.set('stage_seconds', round(seconds, 3), stage=name)
+        self.set('stage_rows_per_second', round(rows / seconds, 1) if seconds > 0 else 0, stage=name)
+
+    def histogram(self, name, **labels):
+        with self._lock:
+            return self._histograms.get(_key(name, labels))
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+            self.started = time.time()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'ts': round(time.time(), 3),
+                'uptime': round(time.time() - self.started, 3),
+                'counters': {_display_name(*k): v for k, v in self._counters.items()},
+                'gauges': {_display_name(*k): v for k, v in self._gauges.items()},
+                'histograms': {_display_name(*k): h.to_dict() for k, h in self._histograms.items()},
+            }
+
+    def write_jsonl(self, path):
+        """
+        Append one snapshot line
+        """
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(self.snapshot()) + '\n')
+
+    def prometheus_text(self):
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+
+        typed = set()
+        def type_line(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+        for (name, labels), value in counters:
+            type_line(name, 'counter')
+            lines.append(f"{PREFIX}{name}{_label_text(labels)} {value}")
+        for (name, labels), value in gauges:
+            type_line(name, 'gauge')
+            lines.append(f"{PREFIX}{name}{_label_text(labels)} {value}")
+        for (name, labels), histogram in histograms:
+            type_line(name, 'histogram')
+            cumulative = 0
+            for bound, n in zip([str(b) for b in histogram.buckets] + ['+Inf'], histogram.counts):
+                cumulative += n
+                lines.append(f"{PREFIX}{name}_bucket{_label_text(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{PREFIX}{name}_sum{_label_text(labels)} {histogram.sum}")
+            lines.append(f"{PREFIX}{name}_count{_label_text(labels)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """
+        Rewrite the text file atomically so a scraper never sees half a file
+        """
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+metrics = MetricsRegistry()
+
+class MetricsReporter:
+    """
+    Background thread writing a snapshot every `interval` seconds, plus one on stop()
+    """
+
+    def __init__(self, jsonl_path=None, prometheus_path=None, interval=10.0, registry=metrics):
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self.interval = interval
+        self.registry = registry
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def write(self):
+        if self.jsonl_path:
+            self.registry.write_jsonl(self.jsonl_path)
+        if self.prometheus_path:
+            self.registry.write_prometheus(self.prometheus_path)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.write()
+
+def add_metrics_arguments(parser):
+    parser.add_argument('--metrics', metavar='FILE', help="Append metric snapshots to FILE as JSON lines")
+    parser.add_argument('--prometheus', metavar='FILE', help="Keep a Prometheus text-format metrics file at FILE")
+    parser.add_argument('--metrics-interval', type=float, default=10.0, help="Seconds between snapshots (default: 10)")
+
+def start_reporter(args):
+    """
+    Start a reporter from add_metrics_arguments() options, or return None if none were given
+    """
+    if not args.metrics and not args.prometheus:
+        return None
+    return MetricsReporter(args.metrics, args.prometheus, args.metrics_interval).start()
@@ -0,0 +1,14 @@
+-- Migration v22: Content hash for medicine_reference sync
+-- Date: 2026-10-17
+-- Description: Store a hash of each scraped row so re-imports only rewrite rows whose data changed
+
+-- 1. Hash of (brand_name, generic_name, manufacturer, strength, dosage_form, standard_packaging)
+--    as computed by bulk_load.py. NULL for rows that did not come from the catalogue import.
+ALTER TABLE medicine_reference ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+-- 2. Used by the sync to find previously imported rows that have disappeared from the catalogue
+CREATE INDEX IF NOT EXISTS idx_medicine_reference_imported
+    ON medicine_reference(brand_name, strength)
+    WHERE content_hash IS NOT NULL;
+
+COMMENT ON COLUMN medicine_reference.content_hash IS 'MD5 of the imported row (bulk_load.py --sync); unchanged rows are skipped on re-import';
@@ -0,0 +1,167 @@
+-- Migration v23: Trigram search key for medicine_reference
+-- Date: 2026-10-17
+-- Description: Replace the four-column leading-wildcard ILIKE search with a normalized,
+--              pg_trgm-indexed search key and a ranked search RPC
+
+-- 1. Trigram support
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- 2. Normalization helpers (mirrored in search_keys.py - keep the two in sync)
+-- Lowercase, anything outside [a-z0-9] becomes a single space
+CREATE OR REPLACE FUNCTION medicine_search_normalize(t TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  SELECT btrim(regexp_replace(lower(coalesce(t, '')), '[^a-z0-9]+', ' ', 'g'));
+$$;
+
+-- Drop strength and pack tokens (500mg, 5 ml, 10's ...) from normalized text
+CREATE OR REPLACE FUNCTION medicine_search_strip_strength(t TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  SELECT coalesce(string_agg(w, ' ' ORDER BY n), '')
+  FROM regexp_split_to_table(t, ' ') WITH ORDINALITY AS x(w, n)
+  WHERE w <> ''
+    AND w !~ '[0-9]'
+    AND w NOT IN ('mg', 'mcg', 'g', 'gm', 'kg', 'ml', 'l', 'iu', 'mmol', 's');
+$$;
+
+-- Canonical spelling: sulphate/sulfate, amoxycillin/amoxicillin, cephalexin/cefalexin, doubled letters
+CREATE OR REPLACE FUNCTION medicine_search_fold(t TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  SELECT regexp_replace(
+    replace(replace(replace(replace(replace(t, 'ph', 'f'), 'ae', 'e'), 'oe', 'e'), 'ck', 'k'), 'y', 'i'),
+    '([a-z])\1+', '\1', 'g');
+$$;
+
+-- Normalized text followed by its folded form when that differs
+CREATE OR REPLACE FUNCTION medicine_search_key(p_brand TEXT, p_generic TEXT, p_formula TEXT, p_manufacturer TEXT)
+RETURNS TEXT
+LANGUAGE plpgsql
+IMMUTABLE
+AS $$
+DECLARE
+  v_key TEXT;
+  v_folded TEXT;
+BEGIN
+  v_key := array_to_string(array_remove(ARRAY[
+    medicine_search_strip_strength(medicine_search_normalize(p_brand)),
+    medicine_search_normalize(p_generic),
+    medicine_search_normalize(p_formula),
+    medicine_search_normalize(p_manufacturer)
+  ], ''), ' ');
+  v_folded := medicine_search_fold(v_key);
+  IF v_folded = v_key THEN
+    RETURN v_key;
+  END IF;
+  RETURN v_key || ' ' || v_folded;
+END;
+$$;
+
+-- 3. Search key column (precomputed by bulk_load.py on import) and backfill
+ALTER TABLE medicine_reference ADD COLUMN IF NOT EXISTS search_key TEXT;
+
+UPDATE medicine_reference
+SET search_key = medicine_search_key(brand_name, generic_name, formula, manufacturer)
+WHERE search_key IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_medicine_reference_search_key_trgm
+    ON medicine_reference USING gin (search_key gin_trgm_ops);
+
+COMMENT ON COLUMN medicine_reference.search_key IS 'Normalized brand/generic/formula/manufacturer text for trigram search (see search_keys.py)';
+
+-- 4. Keep the key current for rows added or edited in the app.
+--    A key supplied by the importer is kept; otherwise it is computed here.
+CREATE OR REPLACE FUNCTION update_medicine_reference_search_key()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        IF NEW.search_key IS NULL THEN
+            NEW.search_key := medicine_search_key(NEW.brand_name, NEW.generic_name, NEW.formula, NEW.manufacturer);
+        END IF;
+    ELSIF NEW.search_key IS NOT DISTINCT FROM OLD.search_key
+          AND (NEW.brand_name, NEW.generic_name, NEW.formula, NEW.manufacturer)
+              IS DISTINCT FROM (OLD.brand_name, OLD.generic_name, OLD.formula, OLD.manufacturer) THEN
+        NEW.search_key := medicine_search_key(NEW.brand_name, NEW.generic_name, NEW.formula, NEW.manufacturer);
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_medicine_reference_search_key ON medicine_reference;
+
+CREATE TRIGGER trigger_medicine_reference_search_key
+    BEFORE INSERT OR UPDATE ON medicine_reference
+    FOR EACH ROW
+    EXECUTE FUNCTION update_medicine_reference_search_key();
+
+-- 5. Ranked search RPC used by MedicineReferencePage.js
+--    Prefix matches first, then trigram word similarity, then brand name.
+CREATE OR REPLACE FUNCTION search_medicine_reference(
+  search_term TEXT,
+  p_category TEXT DEFAULT NULL,
+  p_dosage_form TEXT DEFAULT NULL,
+  p_limit INTEGER DEFAULT 20,
+  p_offset INTEGER DEFAULT 0
+)
+RETURNS TABLE (
+  id UUID,
+  generic_name TEXT,
+  brand_name TEXT,
+  formula TEXT,
+  manufacturer TEXT,
+  category TEXT,
+  dosage_form TEXT,
+  standard_packaging TEXT,
+  strength TEXT,
+  prescription_required BOOLEAN,
+  controlled_substance BOOLEAN,
+  rank REAL,
+  total_count BIGINT
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+  -- Strength tokens are stripped from the brand in the key, so strip them from the term too
+  -- ("Panadol 500mg" -> "panadol"); a term that is nothing but strength is kept as typed
+  v_term TEXT := coalesce(nullif(medicine_search_strip_strength(medicine_search_normalize(search_term)), ''),
+                          medicine_search_normalize(search_term));
+  v_folded TEXT := medicine_search_fold(v_term);
+BEGIN
+  RETURN QUERY
+  SELECT
+    m.id,
+    m.generic_name,
+    m.brand_name,
+    m.formula,
+    m.manufacturer,
+    m.category,
+    m.dosage_form,
+    m.standard_packaging,
+    m.strength,
+    m.prescription_required,
+    m.controlled_substance,
+    (CASE WHEN m.search_key LIKE v_term || '%' OR m.search_key LIKE v_folded || '%' THEN 1 ELSE 0 END
+      + word_similarity(v_folded, m.search_key))::REAL AS rank,
+    COUNT(*) OVER () AS total_count
+  FROM medicine_reference m
+  WHERE
+    (
+      v_term = '' OR
+      m.search_key LIKE '%' || v_term || '%' OR
+      m.search_key LIKE '%' || v_folded || '%'
+    )
+    AND (p_category IS NULL OR m.category = p_category)
+    AND (p_dosage_form IS NULL OR m.dosage_form = p_dosage_form)
+  ORDER BY 12 DESC, m.brand_name
+  LIMIT p_limit
+  OFFSET p_offset;
+END;
+$$;
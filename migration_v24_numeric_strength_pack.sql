@@ -0,0 +1,28 @@
+-- Migration v24: Numeric strength and pack size for medicine_reference
+-- Date: 2026-10-17
+-- Description: Parsed numeric columns filled on import by bulk_load.py (strength_parser.py),
+--              so box/unit maths and strength filters no longer re-parse free text at query time
+
+-- 1. Columns
+--    strength_value / strength_unit: normalized to mg and ml; per-volume strengths are
+--    concentrations (250mg/5ml -> 50, 'mg/ml'); combination products have unit 'combination'
+--    units_per_pack: items in one pack ("2 x 10's" -> 20)
+ALTER TABLE medicine_reference ADD COLUMN IF NOT EXISTS strength_value NUMERIC;
+ALTER TABLE medicine_reference ADD COLUMN IF NOT EXISTS strength_unit TEXT;
+ALTER TABLE medicine_reference ADD COLUMN IF NOT EXISTS units_per_pack INTEGER CHECK (units_per_pack > 0);
+
+-- 2. Indexes for strength filters and pack lookups
+CREATE INDEX IF NOT EXISTS idx_medicine_reference_strength_numeric
+    ON medicine_reference(strength_unit, strength_value)
+    WHERE strength_value IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_medicine_reference_units_per_pack
+    ON medicine_reference(units_per_pack)
+    WHERE units_per_pack IS NOT NULL;
+
+COMMENT ON COLUMN medicine_reference.strength_value IS 'Parsed strength in strength_unit (see strength_parser.py)';
+COMMENT ON COLUMN medicine_reference.strength_unit IS 'mg, ml, iu, %, mmol, mg/ml, ... or combination';
+COMMENT ON COLUMN medicine_reference.units_per_pack IS 'Items per pack parsed from the pack size; default for products.items_per_box';
+
+-- Existing rows are filled by the next `python bulk_load.py --sync` (the content hash
+-- covers the parsed columns, so every row is rewritten once).
@@ -0,0 +1,337 @@
+-- Migration v25: Daily sales rollup for the dashboard and reports
+-- Date: 2026-10-17
+-- Description: One row per (organization, day, product) kept in step with `sales` by
+--              statement-level triggers. get_dashboard_stats, get_sales_chart_data,
+--              get_top_products, get_sales_summary and get_profit_summary read the rollup,
+--              so their cost follows the number of days/products in range, not the number
+--              of sales rows in history.
+--              Backfill (and repair) with: python sales_rollup.py --dsn ...
+
+-- 1. Rollup table
+--    Only live sales (deleted_at IS NULL) with a sale_date are counted, matching the filters
+--    the report functions always applied. Cost is not stored: reports price quantities at
+--    the product's current cost_price, exactly as before.
+CREATE TABLE IF NOT EXISTS public.sales_daily_rollup (
+    organization_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    sale_date DATE NOT NULL,
+    product_id UUID NOT NULL REFERENCES public.products(id) ON DELETE CASCADE,
+    sales_count BIGINT NOT NULL DEFAULT 0,
+    quantity BIGINT NOT NULL DEFAULT 0,
+    revenue NUMERIC NOT NULL DEFAULT 0,
+    PRIMARY KEY (organization_id, sale_date, product_id)
+);
+
+ALTER TABLE public.sales_daily_rollup ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view their own sales rollup" ON public.sales_daily_rollup;
+CREATE POLICY "Users can view their own sales rollup"
+ON public.sales_daily_rollup FOR SELECT
+USING (auth.uid() = organization_id);
+
+-- Written only by the trigger and refresh functions below (SECURITY DEFINER)
+
+CREATE INDEX IF NOT EXISTS idx_sales_daily_rollup_product
+    ON public.sales_daily_rollup(product_id);
+
+-- Range scans used by the backfill and by refresh_sales_daily_rollup()
+CREATE INDEX IF NOT EXISTS idx_sales_org_sale_date
+    ON public.sales(organization_id, sale_date)
+    WHERE deleted_at IS NULL;
+
+-- 2. Incremental maintenance
+--    Statement-level triggers with transition tables: a bulk insert of N sales becomes one
+--    grouped upsert instead of N single-row ones. Updates subtract the old rows and add the
+--    new ones, which also covers soft deletes (deleted_at set) and restores.
+CREATE OR REPLACE FUNCTION sales_daily_rollup_sync()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO public.sales_daily_rollup AS r
+            (organization_id, sale_date, product_id, sales_count, quantity, revenue)
+        SELECT n.organization_id, n.sale_date, n.product_id,
+               COUNT(*), SUM(n.quantity), SUM(n.quantity * n.price_at_sale)
+        FROM new_sales n
+        WHERE n.deleted_at IS NULL AND n.sale_date IS NOT NULL
+        GROUP BY n.organization_id, n.sale_date, n.product_id
+        ON CONFLICT (organization_id, sale_date, product_id) DO UPDATE SET
+            sales_count = r.sales_count + EXCLUDED.sales_count,
+            quantity = r.quantity + EXCLUDED.quantity,
+            revenue = r.revenue + EXCLUDED.revenue;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'DELETE' THEN
+        -- Sales removed by a product or organization delete cascade: the rollup rows went
+        -- with the product/organization, and there is nothing left to subtract from
+        INSERT INTO public.sales_daily_rollup AS r
+            (organization_id, sale_date, product_id, sales_count, quantity, revenue)
+        SELECT o.organization_id, o.sale_date, o.product_id,
+               -COUNT(*), -SUM(o.quantity), -SUM(o.quantity * o.price_at_sale)
+        FROM old_sales o
+        WHERE o.deleted_at IS NULL AND o.sale_date IS NOT NULL
+          AND EXISTS (SELECT 1 FROM public.products p WHERE p.id = o.product_id)
+          AND EXISTS (SELECT 1 FROM auth.users u WHERE u.id = o.organization_id)
+        GROUP BY o.organization_id, o.sale_date, o.product_id
+        ON CONFLICT (organization_id, sale_date, product_id) DO UPDATE SET
+            sales_count = r.sales_count + EXCLUDED.sales_count,
+            quantity = r.quantity + EXCLUDED.quantity,
+            revenue = r.revenue + EXCLUDED.revenue;
+    ELSE
+        INSERT INTO public.sales_daily_rollup AS r
+            (organization_id, sale_date, product_id, sales_count, quantity, revenue)
+        SELECT d.organization_id, d.sale_date, d.product_id,
+               SUM(d.sales_count), SUM(d.quantity), SUM(d.revenue)
+        FROM (
+            SELECT n.organization_id, n.sale_date, n.product_id,
+                   1 AS sales_count, n.quantity::bigint AS quantity, n.quantity * n.price_at_sale AS revenue
+            FROM new_sales n
+            WHERE n.deleted_at IS NULL AND n.sale_date IS NOT NULL
+            UNION ALL
+            SELECT o.organization_id, o.sale_date, o.product_id,
+                   -1, -o.quantity::bigint, -(o.quantity * o.price_at_sale)
+            FROM old_sales o
+            WHERE o.deleted_at IS NULL AND o.sale_date IS NOT NULL
+        ) d
+        GROUP BY d.organization_id, d.sale_date, d.product_id
+        -- Untouched amounts (e.g. only notes changed) net to zero and are skipped
+        HAVING SUM(d.sales_count) <> 0 OR SUM(d.quantity) <> 0 OR SUM(d.revenue) <> 0
+        ON CONFLICT (organization_id, sale_date, product_id) DO UPDATE SET
+            sales_count = r.sales_count + EXCLUDED.sales_count,
+            quantity = r.quantity + EXCLUDED.quantity,
+            revenue = r.revenue + EXCLUDED.revenue;
+    END IF;
+
+    -- Days/products whose last sale went away
+    DELETE FROM public.sales_daily_rollup r
+    USING old_sales o
+    WHERE r.organization_id = o.organization_id
+      AND r.sale_date = o.sale_date
+      AND r.product_id = o.product_id
+      AND r.sales_count <= 0;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS sales_daily_rollup_insert ON public.sales;
+CREATE TRIGGER sales_daily_rollup_insert
+    AFTER INSERT ON public.sales
+    REFERENCING NEW TABLE AS new_sales
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sales_daily_rollup_sync();
+
+DROP TRIGGER IF EXISTS sales_daily_rollup_update ON public.sales;
+CREATE TRIGGER sales_daily_rollup_update
+    AFTER UPDATE ON public.sales
+    REFERENCING OLD TABLE AS old_sales NEW TABLE AS new_sales
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sales_daily_rollup_sync();
+
+DROP TRIGGER IF EXISTS sales_daily_rollup_delete ON public.sales;
+CREATE TRIGGER sales_daily_rollup_delete
+    AFTER DELETE ON public.sales
+    REFERENCING OLD TABLE AS old_sales
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sales_daily_rollup_sync();
+
+-- 3. Batch rebuild of a date range (optionally one organization)
+--    Takes a SHARE lock on sales so no trigger delta can interleave with the rebuild;
+--    SHARE does not conflict with itself, so several ranges can be rebuilt in parallel
+--    (sales_rollup.py does this month by month). Returns the rollup rows written.
+CREATE OR REPLACE FUNCTION refresh_sales_daily_rollup(p_from date, p_to date, p_org uuid DEFAULT NULL)
+RETURNS bigint AS $$
+DECLARE
+    v_rows bigint;
+BEGIN
+    LOCK TABLE public.sales IN SHARE MODE;
+
+    DELETE FROM public.sales_daily_rollup r
+    WHERE r.sale_date BETWEEN p_from AND p_to
+      AND (p_org IS NULL OR r.organization_id = p_org);
+
+    INSERT INTO public.sales_daily_rollup
+        (organization_id, sale_date, product_id, sales_count, quantity, revenue)
+    SELECT s.organization_id, s.sale_date, s.product_id,
+           COUNT(*), SUM(s.quantity), SUM(s.quantity * s.price_at_sale)
+    FROM public.sales s
+    WHERE s.deleted_at IS NULL
+      AND s.sale_date BETWEEN p_from AND p_to
+      AND (p_org IS NULL OR s.organization_id = p_org)
+    GROUP BY s.organization_id, s.sale_date, s.product_id;
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Maintenance only (the lock blocks every organization's checkouts): callable by the
+-- service/database role that runs sales_rollup.py, not by tenants over PostgREST
+REVOKE EXECUTE ON FUNCTION refresh_sales_daily_rollup(date, date, uuid) FROM PUBLIC, anon, authenticated;
+
+-- 4. Report functions on the rollup (same signatures and results as v12/v20/v21)
+DROP FUNCTION IF EXISTS get_dashboard_stats(integer);
+
+CREATE OR REPLACE FUNCTION get_dashboard_stats(expiry_days_threshold integer DEFAULT 15)
+RETURNS TABLE (
+    today_sales_count bigint,
+    today_revenue numeric,
+    today_cash_out numeric,
+    low_stock_count bigint,
+    total_products_count bigint,
+    total_stock_count bigint,
+    near_expiry_count bigint
+) AS $$
+DECLARE
+    v_today date := CURRENT_DATE;
+    v_org_id uuid := auth.uid();
+BEGIN
+    RETURN QUERY
+    WITH today AS (
+        SELECT COALESCE(SUM(r.sales_count), 0)::bigint AS sales_count,
+               COALESCE(SUM(r.revenue), 0) AS revenue
+        FROM public.sales_daily_rollup r
+        WHERE r.organization_id = v_org_id
+          AND r.sale_date = v_today
+    ),
+    cash AS (
+        SELECT COALESCE(SUM(po.final_amount), 0) AS cash_out
+        FROM public.purchase_orders po
+        WHERE po.organization_id = v_org_id
+          AND po.deleted_at IS NULL
+          AND po.status = 'received'
+          AND po.actual_delivery_date = v_today
+    ),
+    -- The four product figures in one pass over the organization's products
+    stock AS (
+        SELECT COUNT(*) FILTER (WHERE p.stock <= p.min_stock_level)::bigint AS low_stock,
+               COUNT(*)::bigint AS total_products,
+               COALESCE(SUM(p.stock), 0)::bigint AS total_stock,
+               COUNT(*) FILTER (WHERE p.expiry_date IS NOT NULL
+                                  AND p.expiry_date >= v_today
+                                  AND p.expiry_date <= (v_today + expiry_days_threshold))::bigint AS near_expiry
+        FROM public.products p
+        WHERE p.organization_id = v_org_id
+          AND p.deleted_at IS NULL
+    )
+    SELECT today.sales_count, today.revenue, cash.cash_out,
+           stock.low_stock, stock.total_products, stock.total_stock, stock.near_expiry
+    FROM today, cash, stock;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP FUNCTION IF EXISTS get_sales_chart_data(integer);
+
+CREATE OR REPLACE FUNCTION get_sales_chart_data(days_back integer DEFAULT 7)
+RETURNS TABLE (
+    sale_date date,
+    daily_revenue numeric
+) AS $$
+DECLARE
+    v_org_id uuid := auth.uid();
+BEGIN
+    RETURN QUERY
+    WITH date_series AS (
+        SELECT generate_series(
+            CURRENT_DATE - (days_back - 1),
+            CURRENT_DATE,
+            '1 day'::interval
+        )::date AS day
+    )
+    SELECT
+        ds.day as sale_date,
+        COALESCE(SUM(r.revenue), 0) as daily_revenue
+    FROM date_series ds
+    LEFT JOIN public.sales_daily_rollup r ON r.sale_date = ds.day
+        AND r.organization_id = v_org_id
+    GROUP BY ds.day
+    ORDER BY ds.day ASC;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP FUNCTION IF EXISTS get_top_products(integer, integer);
+
+CREATE OR REPLACE FUNCTION get_top_products(limit_count integer DEFAULT 10, days_back integer DEFAULT 30)
+RETURNS TABLE (
+    product_id uuid,
+    product_name text,
+    total_quantity bigint,
+    total_revenue numeric,
+    sales_count bigint
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        p.id as product_id,
+        p.name as product_name,
+        SUM(r.quantity)::bigint as total_quantity,
+        SUM(r.revenue) as total_revenue,
+        SUM(r.sales_count)::bigint as sales_count
+    FROM public.products p
+    INNER JOIN public.sales_daily_rollup r ON p.id = r.product_id
+    WHERE p.organization_id = auth.uid()
+        AND r.organization_id = auth.uid()
+        AND p.deleted_at IS NULL
+        AND r.sale_date >= (CURRENT_DATE - days_back)
+    GROUP BY p.id, p.name
+    ORDER BY total_quantity DESC
+    LIMIT limit_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP FUNCTION IF EXISTS get_sales_summary(date, date);
+
+CREATE OR REPLACE FUNCTION get_sales_summary(start_date date, end_date date)
+RETURNS TABLE (
+    total_sales bigint,
+    total_revenue numeric,
+    total_items_sold bigint
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        COALESCE(SUM(r.sales_count), 0)::bigint as total_sales,
+        SUM(r.revenue) as total_revenue,
+        SUM(r.quantity)::bigint as total_items_sold
+    FROM public.sales_daily_rollup r
+    WHERE r.organization_id = auth.uid()
+        AND r.sale_date >= start_date
+        AND r.sale_date <= end_date;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP FUNCTION IF EXISTS get_profit_summary(date, date);
+
+CREATE OR REPLACE FUNCTION get_profit_summary(start_date date, end_date date)
+RETURNS TABLE (
+    total_revenue numeric,
+    total_cost numeric,
+    total_profit numeric,
+    profit_margin numeric
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        SUM(r.revenue) as total_revenue,
+        SUM(r.quantity * COALESCE(p.cost_price, 0)) as total_cost,
+        SUM(r.revenue - r.quantity * COALESCE(p.cost_price, 0)) as total_profit,
+        CASE
+            WHEN SUM(r.revenue) > 0
+            THEN (SUM(r.revenue - r.quantity * COALESCE(p.cost_price, 0)) / SUM(r.revenue)) * 100
+            ELSE 0
+        END as profit_margin
+    FROM public.sales_daily_rollup r
+    INNER JOIN public.products p ON r.product_id = p.id
+    WHERE r.organization_id = auth.uid()
+        AND p.organization_id = auth.uid()
+        AND p.deleted_at IS NULL
+        AND r.sale_date >= start_date
+        AND r.sale_date <= end_date;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- 5. Initial fill (small databases). For years of history run
+--    `python sales_rollup.py --dsn ...` instead, which rebuilds month ranges in parallel.
+SELECT refresh_sales_daily_rollup(
+    COALESCE((SELECT MIN(sale_date) FROM public.sales), CURRENT_DATE),
+    COALESCE((SELECT MAX(sale_date) FROM public.sales), CURRENT_DATE)
+);
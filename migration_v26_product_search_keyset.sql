@@ -0,0 +1,122 @@
+-- Migration v26: Indexed product search with keyset pagination
+-- Date: 2026-10-17
+-- Description: search_products (v18) ILIKEs name/batch_number/form with a leading wildcard and
+--              pages with OFFSET, so every POS keystroke scans the organization's products and
+--              later pages cost more. search_products_keyset matches a normalized search key:
+--                rank 0 - key starts with the term: btree range scan in key order, stops at LIMIT
+--                rank 1 - term anywhere else in the key: pg_trgm GIN index (terms of 3+ characters)
+--              Pages continue from the last row returned (match_rank, sort_key, id) instead of OFFSET.
+--              search_products is left in place for existing callers.
+--              Benchmark: python bench_product_search.py --dsn ...
+
+-- 1. Extensions: trigram operators, and btree_gin so the GIN index can lead with organization_id
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS btree_gin;
+
+-- 2. Search key: normalized name, then batch number and form (medicine_search_normalize from v23).
+--    The name comes first, so "key starts with term" means "name starts with term".
+CREATE OR REPLACE FUNCTION product_search_key(p_name TEXT, p_batch_number TEXT, p_form TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  SELECT medicine_search_normalize(coalesce(p_name, '') || ' ' || coalesce(p_batch_number, '') || ' ' || coalesce(p_form, ''));
+$$;
+
+-- C collation: byte order, so a prefix is a plain range (key >= term AND key < term || '{')
+-- that a btree serves even from a generic plan, and ORDER BY key follows the index
+ALTER TABLE public.products
+    ADD COLUMN IF NOT EXISTS search_key TEXT COLLATE "C"
+    GENERATED ALWAYS AS (product_search_key(name, batch_number, form)) STORED;
+
+COMMENT ON COLUMN public.products.search_key IS 'Normalized name/batch_number/form for search_products_keyset (generated)';
+
+-- 3. Indexes (live products only, as every search filters deleted_at IS NULL)
+CREATE INDEX IF NOT EXISTS idx_products_org_search_key
+    ON public.products (organization_id, search_key, id)
+    WHERE deleted_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_products_org_search_key_trgm
+    ON public.products USING gin (organization_id, search_key gin_trgm_ops)
+    WHERE deleted_at IS NULL;
+
+-- 4. Search RPC used by SalesPage.js
+--    Pass the last row's match_rank, sort_key and id as p_after_* to fetch the next page.
+--    Rank 0 rows come first, each rank ordered by (sort_key, id).
+CREATE OR REPLACE FUNCTION search_products_keyset(
+  search_term TEXT,
+  p_limit INTEGER DEFAULT 20,
+  p_after_rank INTEGER DEFAULT NULL,
+  p_after_key TEXT DEFAULT NULL,
+  p_after_id UUID DEFAULT NULL
+)
+RETURNS TABLE (
+  id UUID,
+  name TEXT,
+  stock INTEGER,
+  price DECIMAL,
+  items_per_box INTEGER,
+  price_per_box DECIMAL,
+  selling_unit TEXT,
+  min_stock_level INTEGER,
+  expiry_date DATE,
+  batch_number TEXT,
+  form TEXT,
+  strength TEXT,
+  match_rank INTEGER,
+  sort_key TEXT
+)
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+AS $$
+DECLARE
+  v_org UUID := auth.uid();
+  v_term TEXT COLLATE "C" := medicine_search_normalize(search_term);
+  v_after_key TEXT COLLATE "C" := p_after_key;
+  v_found INTEGER := 0;
+BEGIN
+  IF p_limit IS NULL OR p_limit <= 0 THEN
+    RETURN;
+  END IF;
+
+  -- Rank 0: prefix matches (an empty term lists every product in key order)
+  IF p_after_rank IS NULL OR p_after_rank = 0 THEN
+    RETURN QUERY
+    SELECT
+      p.id, p.name, p.stock, p.price, p.items_per_box, p.price_per_box, p.selling_unit,
+      p.min_stock_level, p.expiry_date, p.batch_number, p.form, p.strength,
+      0, p.search_key::TEXT
+    FROM products p
+    WHERE
+      p.organization_id = v_org
+      AND p.deleted_at IS NULL
+      AND p.search_key >= v_term
+      AND p.search_key < v_term || '{'
+      AND (v_after_key IS NULL OR (p.search_key, p.id) > (v_after_key, p_after_id))
+    ORDER BY p.search_key, p.id
+    LIMIT p_limit;
+
+    GET DIAGNOSTICS v_found = ROW_COUNT;
+  END IF;
+
+  -- Rank 1: the term inside the key but not at its start. Trigrams need 3+ characters;
+  -- shorter terms stay prefix-only rather than scanning the organization.
+  IF v_found < p_limit AND length(v_term) >= 3 THEN
+    RETURN QUERY
+    SELECT
+      p.id, p.name, p.stock, p.price, p.items_per_box, p.price_per_box, p.selling_unit,
+      p.min_stock_level, p.expiry_date, p.batch_number, p.form, p.strength,
+      1, p.search_key::TEXT
+    FROM products p
+    WHERE
+      p.organization_id = v_org
+      AND p.deleted_at IS NULL
+      AND p.search_key LIKE '%' || v_term || '%'
+      AND NOT (p.search_key >= v_term AND p.search_key < v_term || '{')
+      AND (p_after_rank IS DISTINCT FROM 1 OR (p.search_key, p.id) > (v_after_key, p_after_id))
+    ORDER BY p.search_key, p.id
+    LIMIT p_limit - v_found;
+  END IF;
+END;
+$$;
@@ -0,0 +1,151 @@
+-- Migration v27: Batched customer_frequent_items maintenance
+-- Date: 2026-10-17
+-- Description: The v4 row trigger (track_frequent_items) upserted customer_frequent_items once
+--              per sale line, so a multi-line checkout did one read-modify-write per line, all on
+--              the same customer's rows. Sale lines now land in an append-only delta table
+--              (one INSERT per statement, no row contention) and merge_customer_frequent_items()
+--              folds the delta into customer_frequent_items with one grouped upsert.
+--              The merge runs every minute through pg_cron when it is installed; otherwise run
+--              python frequent_items.py merge --every 60. Until a line is merged, quick reorder
+--              does not see it.
+--              Full recompute from history: python frequent_items.py rebuild --dsn ...
+
+-- 1. Delta table: written only by the trigger and drained by the merge (SECURITY DEFINER).
+--    Same foreign keys as customer_frequent_items, so deleting a customer or product also drops
+--    its pending lines instead of leaving the merge to fail on them.
+CREATE TABLE IF NOT EXISTS public.customer_frequent_items_delta (
+    id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    organization_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    customer_id UUID NOT NULL REFERENCES public.customers(id) ON DELETE CASCADE,
+    product_id UUID NOT NULL REFERENCES public.products(id) ON DELETE CASCADE,
+    quantity INTEGER,
+    purchased_at TIMESTAMP WITH TIME ZONE
+);
+
+ALTER TABLE public.customer_frequent_items_delta ENABLE ROW LEVEL SECURITY;
+
+-- 2. Replace the per-row trigger with a statement-level one that only appends
+CREATE OR REPLACE FUNCTION queue_customer_frequent_items()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO public.customer_frequent_items_delta
+        (organization_id, customer_id, product_id, quantity, purchased_at)
+    SELECT n.organization_id, i.customer_id, n.product_id, n.quantity, n.created_at
+    FROM new_sales n
+    JOIN public.invoices i ON i.id = n.invoice_id
+    WHERE i.customer_id IS NOT NULL;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS track_frequent_items ON public.sales;
+
+DROP TRIGGER IF EXISTS queue_frequent_items ON public.sales;
+CREATE TRIGGER queue_frequent_items
+    AFTER INSERT ON public.sales
+    REFERENCING NEW TABLE AS new_sales
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION queue_customer_frequent_items();
+
+-- 3. Merge: claim up to p_batch_size delta lines (SKIP LOCKED, so concurrent merges split the
+--    work), group them per (customer, product) and upsert once. Same rules as the v4 trigger:
+--    count every line, keep the largest quantity and the latest purchase time.
+--    Returns the customer_frequent_items rows written; 0 once the delta is empty.
+CREATE OR REPLACE FUNCTION merge_customer_frequent_items(p_batch_size integer DEFAULT 100000)
+RETURNS bigint AS $$
+DECLARE
+    v_rows bigint;
+BEGIN
+    WITH batch AS (
+        DELETE FROM public.customer_frequent_items_delta d
+        WHERE d.id IN (
+            SELECT id FROM public.customer_frequent_items_delta
+            ORDER BY id
+            LIMIT p_batch_size
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING d.organization_id, d.customer_id, d.product_id, d.quantity, d.purchased_at
+    )
+    INSERT INTO public.customer_frequent_items AS f
+        (customer_id, product_id, typical_quantity, last_purchased_at, purchase_count, organization_id)
+    SELECT b.customer_id, b.product_id, MAX(b.quantity), MAX(b.purchased_at), COUNT(*), b.organization_id
+    FROM batch b
+    GROUP BY b.customer_id, b.product_id, b.organization_id
+    ON CONFLICT (customer_id, product_id) DO UPDATE SET
+        typical_quantity = GREATEST(f.typical_quantity, EXCLUDED.typical_quantity),
+        last_purchased_at = GREATEST(f.last_purchased_at, EXCLUDED.last_purchased_at),
+        purchase_count = f.purchase_count + EXCLUDED.purchase_count,
+        updated_at = timezone('utc'::text, now());
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- 4. Rebuild one customer shard from sales history (every line inserted with a customer's
+--    invoice, as the trigger counts them). Customers are sharded by hash of their id, so
+--    frequent_items.py can run shards on parallel connections. The SHARE lock on sales holds
+--    back new sale inserts (and so new delta lines) for the duration; the shard's pending delta
+--    lines are dropped because the recompute already includes them. Shards only write the delta
+--    and customer_frequent_items, never sales, so their SHARE locks do not conflict and they run
+--    side by side. A merge that already claimed some of the shard's lines commits before the
+--    DELETE below gets past them. Returns the rows written for the shard.
+CREATE OR REPLACE FUNCTION rebuild_customer_frequent_items(p_shard integer DEFAULT 0, p_shards integer DEFAULT 1)
+RETURNS bigint AS $$
+DECLARE
+    v_rows bigint;
+BEGIN
+    LOCK TABLE public.sales IN SHARE MODE;
+
+    DELETE FROM public.customer_frequent_items_delta d
+    WHERE (hashtext(d.customer_id::text) & 2147483647) % p_shards = p_shard;
+
+    -- Upsert the recomputed rows (keeping ids and created_at) and drop pairs no longer in history
+    WITH computed AS (
+        SELECT i.customer_id, s.product_id, MAX(s.quantity) AS typical_quantity,
+               MAX(s.created_at) AS last_purchased_at, COUNT(*) AS purchase_count,
+               MAX(s.organization_id::text)::uuid AS organization_id
+        FROM public.sales s
+        JOIN public.invoices i ON i.id = s.invoice_id
+        WHERE i.customer_id IS NOT NULL
+          AND (hashtext(i.customer_id::text) & 2147483647) % p_shards = p_shard
+        GROUP BY i.customer_id, s.product_id
+    ), written AS (
+        INSERT INTO public.customer_frequent_items AS f
+            (customer_id, product_id, typical_quantity, last_purchased_at, purchase_count, organization_id)
+        SELECT customer_id, product_id, typical_quantity, last_purchased_at, purchase_count, organization_id
+        FROM computed
+        ON CONFLICT (customer_id, product_id) DO UPDATE SET
+            typical_quantity = EXCLUDED.typical_quantity,
+            last_purchased_at = EXCLUDED.last_purchased_at,
+            purchase_count = EXCLUDED.purchase_count,
+            organization_id = EXCLUDED.organization_id,
+            updated_at = timezone('utc'::text, now())
+        RETURNING 1
+    )
+    DELETE FROM public.customer_frequent_items f
+    WHERE (hashtext(f.customer_id::text) & 2147483647) % p_shards = p_shard
+      AND NOT EXISTS (
+          SELECT 1 FROM computed c WHERE c.customer_id = f.customer_id AND c.product_id = f.product_id
+      );
+
+    SELECT COUNT(*) INTO v_rows
+    FROM public.customer_frequent_items f
+    WHERE (hashtext(f.customer_id::text) & 2147483647) % p_shards = p_shard;
+    RETURN v_rows;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Maintenance only: callable by pg_cron and the service/database role, not by tenants over PostgREST
+REVOKE EXECUTE ON FUNCTION merge_customer_frequent_items(integer) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION rebuild_customer_frequent_items(integer, integer) FROM PUBLIC, anon, authenticated;
+
+-- 5. Periodic merge (Supabase ships pg_cron; elsewhere use frequent_items.py merge --every 60)
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule('merge-customer-frequent-items', '* * * * *',
+                              'SELECT public.merge_customer_frequent_items()');
+    END IF;
+END
+$$;
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+# Content-addressed cache of raw medicine pages.
+# Bodies are zlib-compressed and stored once per SHA-256 under objects/;
+# index.json maps URL -> content hash in least-recently-used order.
+# Objects are written as pages arrive but the index only on save(), so opening the
+# cache reconciles the two: objects the saved index does not know about are deleted
+# (they would otherwise sit outside max_bytes), as are entries whose object is gone.
+
+DEFAULT_CACHE_DIR = 'page_cache'
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # 1 GB of compressed pages
+
+class PageCache:
+    """
+    Size-bounded LRU cache of raw page bodies keyed by URL and content hash
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self._lock = threading.Lock()
+        # url -> (content_hash, compressed_size), oldest first
+        self._entries = OrderedDict()
+        self._refcounts = {}
+        self._sizes = {}
+        self.total_bytes = 0
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for url, content_hash, size in json.load(f)['entries']:
+                    self._add_entry(url, content_hash, size)
+        self._reconcile()
+
+    def _reconcile(self):
+        objects_dir = os.path.join(self.cache_dir, 'objects')
+        stored = set()
+        if os.path.isdir(objects_dir):
+            for prefix in os.listdir(objects_dir):
+                prefix_dir = os.path.join(objects_dir, prefix)
+                for name in os.listdir(prefix_dir):
+                    if prefix + name in self._sizes:
+                        stored.add(prefix + name)
+                    else:
+                        # Unindexed object or a half-written .tmp file
+                        os.remove(os.path.join(prefix_dir, name))
+        for url in [url for url, (content_hash, _) in self._entries.items() if content_hash not in stored]:
+            self._drop_entry(url)
+
+    def _object_path(self, content_hash):
+        return os.path.join(self.cache_dir, 'objects', content_hash[:2], content_hash[2:])
+
+    def _add_entry(self, url, content_hash, size):
+        self._entries[url] = (content_hash, size)
+        if self._refcounts.get(content_hash, 0) == 0:
+            self._sizes[content_hash] = size
+            self.total_bytes += size
+        self._refcounts[content_hash] = self._refcounts.get(content_hash, 0) + 1
+
+    def _drop_entry(self, url):
+        content_hash, _ = self._entries.pop(url)
+        self._refcounts[content_hash] -= 1
+        if self._refcounts[content_hash] == 0:
+            del self._refcounts[content_hash]
+            self.total_bytes -= self._sizes.pop(content_hash)
+            try:
+                os.remove(self._object_path(content_hash))
+            except FileNotFoundError:
+                pass
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, url):
+        return url in self._entries
+
+    def urls(self):
+        with self._lock:
+            return list(self._entries)
+
+    def get(self, url):
+        """
+        Return the cached body for url, or None
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            self._entries.move_to_end(url)
+        try:
+            with open(self._object_path(entry[0]), 'rb') as f:
+                return zlib.decompress(f.read())
+        except FileNotFoundError:
+            return None
+
+    def put(self, url, content):
+        """
+        Store the body for url and evict least-recently-used pages beyond max_bytes.
+        Returns the content hash.
+        """
+        content_hash = hashlib.sha256(content).hexdigest()
+
+        with self._lock:
+            existing = self._entries.get(url)
+            if existing and existing[0] == content_hash:
+                self._entries.move_to_end(url)
+                return content_hash
+
+            stored_size = self._sizes.get(content_hash)
+            if stored_size is None:
+                compressed = zlib.compress(content, 6)
+                stored_size = len(compressed)
+                path = self._object_path(content_hash)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = path + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(compressed)
+                os.replace(tmp_path, path)
+
+            if existing:
+                self._drop_entry(url)
+            self._add_entry(url, content_hash, stored_size)
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                self._drop_entry(next(iter(self._entries)))
+        return content_hash
+
+    def save(self):
+        with self._lock:
+            data = json.dumps({'entries': [[url, h, size] for url, (h, size) in self._entries.items()]})
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.index_path)
+
+def iter_cached_pages(cache):
+    """
+    Yield (url, content) for every page in the cache
+    """
+    for url in cache.urls():
+        content = cache.get(url)
+        if content is not None:
+            yield url, content
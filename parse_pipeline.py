@@ -0,0 +1,193 @@
+import csv
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from fetch_engine import fetch_all, DEFAULT_CONCURRENCY, DEFAULT_RATE
+from medicine_extractors import extract_details, DEFAULT_BACKEND, FIELDNAMES
+from metrics import metrics, add_metrics_arguments, start_reporter
+from page_cache import PageCache, iter_cached_pages, DEFAULT_CACHE_DIR
+
+# Fetch -> parse -> write pipeline.
+# Fetchers put raw page bytes on a bounded queue, a process pool parses them in batches,
+# and a single writer streams rows to CSV. Each stage blocks when the next one falls
+# behind, so memory stays bounded by queue_size + max_in_flight batches.
+
+DEFAULT_QUEUE_SIZE = 256
+DEFAULT_BATCH_SIZE = 16
+
+_DONE = object()
+
+def fetch_pages(urls, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+                queue_size=DEFAULT_QUEUE_SIZE, failed=None, cache=None):
+    """
+    Yield (url, content) for each URL as it is downloaded.
+    Fetching runs on a background thread; failed URLs are appended to `failed`.
+    Downloaded bodies are also stored in `cache` (a PageCache) when given.
+    """
+    from http_client import fetch
+
+    pages = queue.Queue(maxsize=queue_size)
+
+    def fetch_raw(url):
+        response = fetch(url)
+        if response.status_code != 200:
+            return None
+        if cache is not None:
+            cache.put(url, response.content)
+        # Blocks while the parsers are behind - backpressure for the fetchers
+        pages.put((url, response.content))
+        metrics.set('page_queue_depth', pages.qsize())
+        return True
+
+    def on_result(url, ok):
+        if not ok and failed is not None:
+            failed.append(url)
+
+    def run():
+        try:
+            fetch_all(urls, fetch_raw, concurrency=concurrency, rate=rate, on_result=on_result)
+        finally:
+            pages.put(_DONE)
+
+    threading.Thread(target=run, daemon=True).start()
+
+    while True:
+        item = pages.get()
+        metrics.set('page_queue_depth', pages.qsize())
+        if item is _DONE:
+            return
+        yield item
+
+def iter_saved_pages(pages_dir):
+    """
+    Yield (url, content) from a directory of saved pages
+    """
+    for name in sorted(os.listdir(pages_dir)):
+        with open(os.path.join(pages_dir, name), 'rb') as f:
+            yield f"https://dawaai.pk/medicine/{name}", f.read()
+
+def _parse_batch(batch, backend):
+    # Runs in a worker process, so per-page timings go back with the results
+    # for the parent to record
+    results, timings = [], []
+    for url, content in batch:
+        start = time.perf_counter()
+        try:
+            results.append((url, extract_details(content, url, backend=backend)))
+        except Exception:
+            results.append((url, None))
+        timings.append(time.perf_counter() - start)
+    return results, timings
+
+def _batch_results(future, backend):
+    results, timings = future.result()
+    for seconds in timings:
+        metrics.observe('parse_seconds', seconds, backend=backend)
+    metrics.inc('pages_parsed_total', len(results))
+    return results
+
+def parse_pages(pages, workers=None, backend=DEFAULT_BACKEND,
+                batch_size=DEFAULT_BATCH_SIZE, max_in_flight=None):
+    """
+    Parse (url, content) pairs on a process pool, yielding (url, details) in input order.
+    Pages are shipped to workers in batches to amortise pickling overhead.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 2
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        batch = []
+        for page in pages:
+            batch.append(page)
+            if len(batch) < batch_size:
+                continue
+            in_flight.append(pool.submit(_parse_batch, batch, backend))
+            batch = []
+            # Stop pulling pages until the oldest batch is done
+            metrics.set('parse_batches_in_flight', len(in_flight))
+            while len(in_flight) >= max_in_flight:
+                yield from _batch_results(in_flight.popleft(), backend)
+        if batch:
+            in_flight.append(pool.submit(_parse_batch, batch, backend))
+        while in_flight:
+            yield from _batch_results(in_flight.popleft(), backend)
+        metrics.set('parse_batches_in_flight', 0)
+
+def write_results(results, output_file, failed=None):
+    """
+    Stream parsed rows to CSV. Returns the number of rows written.
+    """
+    written = 0
+    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        for url, details in results:
+            if details:
+                writer.writerow(details)
+                written += 1
+                metrics.inc('stage_rows_total', stage='write')
+                if written % 100 == 0:
+                    f.flush()
+            elif failed is not None:
+                failed.append(url)
+    return written
+
+def run_pipeline(pages, output_file='dawaai_medicines_detailed.csv', workers=None,
+                 backend=DEFAULT_BACKEND, failed=None):
+    start_time = time.time()
+    failed = failed if failed is not None else []
+    written = write_results(parse_pages(pages, workers=workers, backend=backend), output_file, failed)
+    elapsed = time.time() - start_time
+
+    print(f"\n✓ Pipeline complete!")
+    print(f"  Total time: {elapsed:.1f}s ({written / elapsed if elapsed > 0 else 0:.0f} pages/s)")
+    print(f"  Successful: {written}")
+    print(f"  Failed: {len(failed)}")
+    print(f"  Output: {output_file}")
+    return written, failed
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fetch/parse/write pipeline for medicine detail pages")
+    parser.add_argument('--from-pages', metavar='DIR',
+                        help="Re-parse a directory of saved pages instead of fetching")
+    parser.add_argument('--from-cache', action='store_true',
+                        help="Rebuild the detailed CSV offline from the raw page cache")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--input', default='dawaai_medicines_clean.csv',
+                        help="Medicine list to fetch (default: dawaai_medicines_clean.csv)")
+    parser.add_argument('--output', default='dawaai_medicines_detailed.csv')
+    parser.add_argument('--workers', type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument('--backend', default=DEFAULT_BACKEND, help="Extractor backend: fast, lxml or bs4")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    reporter = start_reporter(args)
+
+    failed = []
+    cache = PageCache(args.cache_dir)
+    if args.from_pages:
+        pages = iter_saved_pages(args.from_pages)
+    elif args.from_cache:
+        print(f"Re-parsing {len(cache)} cached pages from {args.cache_dir}/")
+        pages = iter_cached_pages(cache)
+    else:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            urls = [row['url'] for row in csv.DictReader(f)]
+        pages = fetch_pages(urls, concurrency=args.concurrency, rate=args.rate, failed=failed, cache=cache)
+
+    try:
+        run_pipeline(pages, args.output, workers=args.workers, backend=args.backend, failed=failed)
+    except KeyboardInterrupt:
+        print("\n\nPipeline interrupted by user. Rows written so far are in the output file.")
+    finally:
+        if not args.from_cache and not args.from_pages:
+            cache.save()
+        if reporter:
+            reporter.stop()
@@ -1,161 +1,126 @@
-import requests
-from bs4 import BeautifulSoup
 import csv
 import time
-import re
 import os
+from fetch_engine import fetch_all, DEFAULT_CONCURRENCY, DEFAULT_RATE
+from metrics import metrics, add_metrics_arguments, start_reporter
+from scrape_detailed import scrape_job, save_state
+from scrape_ledger import ScrapeLedger
 
-def scrape_medicine_details(url):
+DEFAULT_MAX_ATTEMPTS = 5
+
+def seed_ledger(ledger, partial_file):
     """
-    Scrape detailed information from a single medicine page on Dawaai.pk
-    Returns dict with: brand_name, generic_name, manufacturer, strength, dosage_form, pack_size
+    Load the target URLs into the ledger (new URLs only) and, on first use,
+    carry over results already saved in the partial CSV
     """
-    try:
-        response = requests.get(url, timeout=10)
-        if response.status_code != 200:
-            return None
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        details = {
-            'brand_name': '',
-            'generic_name': '',
-            'manufacturer': '',
-            'strength': '',
-            'dosage_form': '',
-            'pack_size': '',
-            'url': url
-        }
-        
-        # Extract brand name from h1
-        h1 = soup.find('h1')
-        if h1:
-            h1_text = h1.get_text(strip=True)
-            details['brand_name'] = h1_text
-            
-            # Try to extract dosage form from h1
-            dosage_forms = ['tablet', 'capsule', 'syrup', 'injection', 'cream', 'ointment', 'drops', 'suspension', 'powder', 'solution', 'gel', 'sachet']
-            for form in dosage_forms:
-                if form in h1_text.lower():
-                    details['dosage_form'] = form
-                    break
-        
-        # Extract manufacturer
-        brand_link = soup.find('a', href=re.compile(r'/brands/'))
-        if brand_link:
-            details['manufacturer'] = brand_link.get_text(strip=True)
-        
-        # Extract generic name and strength
-        generic_link = soup.find('a', href=re.compile(r'/generic/'))
-        if generic_link:
-            generic_text = generic_link.get_text(strip=True)
-            details['generic_name'] = generic_text
-            
-            strength_match = re.search(r'\(([^)]+)\)', generic_text)
-            if strength_match:
-                details['strength'] = strength_match.group(1)
-                details['generic_name'] = re.sub(r'\s*\([^)]+\)', '', generic_text).strip()
-        
-        # Extract pack size
-        page_text = soup.get_text()
-        pack_match = re.search(r'Pack Size[:\s]+([^\n]+)', page_text, re.I)
-        if pack_match:
-            details['pack_size'] = pack_match.group(1).strip()
-        
-        if not details['pack_size'] and h1:
-            pack_patterns = [
-                r'(\d+\s*x\s*\d+\'?s?)',
-                r'(\d+\s*ml)',
-                r'(\d+\s*mg)',
-                r'(\d+\s*tablets?)',
-                r'(\d+\s*capsules?)',
-                r'(\d+\s*gm)',
-            ]
-            for pattern in pack_patterns:
-                match = re.search(pattern, h1_text, re.I)
-                if match:
-                    details['pack_size'] = match.group(1)
-                    break
-        
-        return details
-        
-    except Exception as e:
-        # print(f"Error scraping {url}: {str(e)}")
-        return None
-
-def resume_scraping():
-    print("Resuming scraping process...")
+    first_run = len(ledger) == 0
     
-    # 1. Load all target URLs
-    all_medicines = {}
     with open('dawaai_medicines_clean.csv', 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            all_medicines[row['url']] = row
-            
-    print(f"Total target medicines: {len(all_medicines)}")
+        ledger.enqueue(csv.DictReader(f))
+    
+    if first_run and os.path.exists(partial_file):
+        with open(partial_file, 'r', encoding='utf-8') as f:
+            ledger.import_results(csv.DictReader(f))
+
+def resume_scraping(concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                    retry_failed=False, seed=False):
+    print("Resuming scraping process...")
     
-    # 2. Load already successful URLs
-    successful_urls = set()
     partial_file = 'dawaai_medicines_detailed_partial.csv'
+    ledger = ScrapeLedger()
     
-    if os.path.exists(partial_file):
-        with open(partial_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                successful_urls.add(row['url'])
+    # 1. Load target URLs into the ledger (only needed once, or to pick up new medicines)
+    if seed or len(ledger) == 0:
+        seed_ledger(ledger, partial_file)
+    if retry_failed:
+        ledger.retry_failed()
     
-    print(f"Already successfully scraped: {len(successful_urls)}")
+    counts = ledger.counts()
+    print(f"Total target medicines: {sum(counts.values())}")
+    print(f"Already successfully scraped: {counts['ok']}")
+    print(f"Failed so far: {counts['failed']}")
     
-    # 3. Identify pending URLs
-    pending_urls = [url for url in all_medicines.keys() if url not in successful_urls]
+    # 2. Identify pending URLs (indexed query on the ledger)
+    pending_urls = ledger.pending_urls(max_attempts=max_attempts)
     total_pending = len(pending_urls)
     
-    print(f"Remaining to scrape (including retries): {total_pending}")
-    print(f"Estimated time: {total_pending * 1.5 / 60:.1f} minutes")
+    print(f"Remaining to scrape (including retries under {max_attempts} attempts): {total_pending}")
+    print(f"Concurrency: {concurrency} | Rate limit: {rate} req/s")
+    print(f"Estimated time: {total_pending / rate / 60:.1f} minutes")
     print("\nStarting resume... (Press Ctrl+C to stop)\n")
     
-    # Prepare output file (append mode)
-    fieldnames = ['brand_name', 'generic_name', 'manufacturer', 'strength', 'dosage_form', 'pack_size', 'url']
+    start_time = time.time()
+    success_count = 0
+    fail_count = 0
+    processed = 0
     
-    # Open file in append mode
-    with open(partial_file, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+    def on_result(url, outcome):
+        nonlocal processed, success_count, fail_count
+        processed += 1
+        i = processed
+        
+        details, error = outcome or (None, 'unknown error')
+        if details:
+            ledger.record_ok(url, details)
+            success_count += 1
+            metrics.inc('stage_rows_total', stage='detail')
+        else:
+            ledger.record_failure(url, error)
+            fail_count += 1
+            metrics.inc('scrape_failures_total')
         
-        # If file is empty, write header (shouldn't happen if we loaded from it, but good safety)
-        if os.stat(partial_file).st_size == 0:
-            writer.writeheader()
-            
-        start_time = time.time()
-        success_count = 0
-        fail_count = 0
+        # Progress indicator
+        if i % 10 == 0 or i == 1:
+            elapsed = time.time() - start_time
+            rate_now = i / elapsed if elapsed > 0 else 0
+            metrics.set('stage_rows_per_second', round(rate_now, 2), stage='detail')
+            remaining_time = (total_pending - i) / rate_now if rate_now > 0 else 0
+            print(f"Progress: {i}/{total_pending} ({i/total_pending*100:.1f}%) | Success: {success_count} | Failed: {fail_count} | ETA: {remaining_time/60:.1f}min")
         
-        for i, url in enumerate(pending_urls, 1):
-            # Progress indicator
-            if i % 10 == 0 or i == 1:
-                elapsed = time.time() - start_time
-                rate = i / elapsed if elapsed > 0 else 0
-                remaining_time = (total_pending - i) / rate if rate > 0 else 0
-                print(f"Progress: {i}/{total_pending} ({i/total_pending*100:.1f}%) | Success: {success_count} | Failed: {fail_count} | ETA: {remaining_time/60:.1f}min")
-            
-            details = scrape_medicine_details(url)
-            
-            if details:
-                writer.writerow(details)
-                f.flush() # Ensure data is written
-                success_count += 1
-            else:
-                fail_count += 1
-            
-            time.sleep(1.0) # Slightly faster rate (1s)
-            
+        if i % 100 == 0:
+            save_state()
+    
+    # Rate limiting is handled by the fetch engine (per-host token bucket)
+    try:
+        fetch_all(pending_urls, scrape_job,
+                  concurrency=concurrency, rate=rate, on_result=on_result)
+    finally:
+        ledger.flush()
+        save_state()
+    
+    # 3. Write every successful result in one pass
+    written = ledger.export_csv(partial_file)
+    ledger.close()
+    
     print("\n✓ Resume complete!")
     print(f"Processed: {total_pending}")
     print(f"Successful: {success_count}")
     print(f"Failed: {fail_count}")
+    print(f"Saved {written} scraped medicines to {partial_file}")
 
 if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Resume scraping medicine details from Dawaai.pk")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Requests in flight at once (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help=f"Maximum requests per second (default: {DEFAULT_RATE})")
+    parser.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS,
+                        help=f"Skip URLs that have failed this many times (default: {DEFAULT_MAX_ATTEMPTS})")
+    parser.add_argument('--retry-failed', action='store_true',
+                        help="Reset attempt counts of failed URLs before resuming")
+    parser.add_argument('--seed', action='store_true',
+                        help="Re-read dawaai_medicines_clean.csv to add new medicines to the ledger")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    
+    reporter = start_reporter(args)
     try:
-        resume_scraping()
+        resume_scraping(concurrency=args.concurrency, rate=args.rate, max_attempts=args.max_attempts,
+                        retry_failed=args.retry_failed, seed=args.seed)
     except KeyboardInterrupt:
         print("\n\nScraping interrupted by user. Progress has been saved.")
+    finally:
+        if reporter:
+            reporter.stop()
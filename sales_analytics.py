@@ -0,0 +1,120 @@
+import os
+from datetime import date, timedelta
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from sales_export import DEFAULT_OUTPUT_DIR
+
+# Heavy report queries run locally over a sales_export.py export, as vectorized
+# Arrow group-bys instead of RPCs against the live database:
+#   top_products     - quantity, revenue and sale count per product
+#   margins          - revenue, cost and margin per product form (at current cost_price)
+#   expiry_exposure  - stock likely to expire unsold at the recent sales rate
+
+def load_sales(export_dir=DEFAULT_OUTPUT_DIR, start=None, end=None, org=None):
+    """
+    Sales between start and end (inclusive) as a Table with a computed revenue column
+    """
+    dataset = ds.dataset(os.path.join(export_dir, 'sales'), format='parquet', partitioning='hive')
+    conditions = []
+    if start:
+        conditions.append(ds.field('sale_date') >= pa.scalar(start, pa.date32()))
+    if end:
+        conditions.append(ds.field('sale_date') <= pa.scalar(end, pa.date32()))
+    if org:
+        conditions.append(ds.field('organization_id') == org)
+    condition = None
+    for c in conditions:
+        condition = c if condition is None else condition & c
+    sales = dataset.to_table(columns=['product_id', 'organization_id', 'sale_date', 'quantity', 'price_at_sale'],
+                             filter=condition)
+    return sales.append_column('revenue', pc.multiply(pc.cast(sales['quantity'], pa.float64()), sales['price_at_sale']))
+
+def load_products(export_dir=DEFAULT_OUTPUT_DIR, org=None):
+    """
+    Live (not soft-deleted) products
+    """
+    products = ds.dataset(os.path.join(export_dir, 'products'), format='parquet').to_table()
+    mask = pc.is_null(products['deleted_at'])
+    if org:
+        mask = pc.and_(mask, pc.equal(products['organization_id'], org))
+    return products.filter(mask)
+
+def top_products(sales, products, limit=10):
+    totals = sales.group_by('product_id').aggregate([('quantity', 'sum'), ('revenue', 'sum'), ('quantity', 'count')])
+    # Select by name: the position of the key column differs between pyarrow versions
+    totals = totals.select(['product_id', 'quantity_sum', 'revenue_sum', 'quantity_count']).rename_columns(
+        ['product_id', 'total_quantity', 'total_revenue', 'sales_count'])
+    named = totals.join(products.select(['id', 'name']), keys='product_id', right_keys='id', join_type='inner')
+    return named.sort_by([('total_quantity', 'descending')]).slice(0, limit)
+
+def margins(sales, products):
+    """
+    Revenue, cost and margin % per product form
+    """
+    priced = sales.join(products.select(['id', 'form', 'cost_price']), keys='product_id', right_keys='id',
+                        join_type='inner')
+    cost = pc.multiply(pc.cast(priced['quantity'], pa.float64()), pc.fill_null(priced['cost_price'], 0.0))
+    priced = priced.append_column('cost', cost).append_column('form_name', pc.fill_null(priced['form'], 'Unspecified'))
+    totals = priced.group_by('form_name').aggregate([('revenue', 'sum'), ('cost', 'sum')])
+    revenue, cost = totals['revenue_sum'], totals['cost_sum']
+    profit = pc.subtract(revenue, cost)
+    margin = pc.if_else(pc.greater(revenue, 0), pc.multiply(pc.divide(profit, revenue), 100.0), 0.0)
+    return (totals.append_column('profit', profit).append_column('margin_pct', margin)
+            .sort_by([('revenue_sum', 'descending')]))
+
+def expiry_exposure(sales, products, days=90, today=None, rate_days=30):
+    """
+    Products expiring within `days` whose stock exceeds what the last `rate_days` of sales
+    suggest will sell before expiry. at_risk_value is priced at cost.
+    """
+    today = today or date.today()
+    recent = sales.filter(pc.greater_equal(sales['sale_date'], pa.scalar(today - timedelta(days=rate_days), pa.date32())))
+    rates = recent.group_by('product_id').aggregate([('quantity', 'sum')])
+    rates = rates.append_column('daily_rate', pc.divide(pc.cast(rates['quantity_sum'], pa.float64()), float(rate_days)))
+
+    expiring = products.filter(pc.and_(
+        pc.and_(pc.is_valid(products['expiry_date']), pc.greater(products['stock'], 0)),
+        pc.and_(pc.greater_equal(products['expiry_date'], pa.scalar(today, pa.date32())),
+                pc.less_equal(products['expiry_date'], pa.scalar(today + timedelta(days=days), pa.date32())))))
+    joined = expiring.select(['id', 'name', 'stock', 'cost_price', 'expiry_date']).join(
+        rates.select(['product_id', 'daily_rate']), keys='id', right_keys='product_id', join_type='left outer')
+
+    days_left = pc.cast(pc.days_between(pa.scalar(today, pa.date32()), joined['expiry_date']), pa.float64())
+    expected = pc.multiply(pc.fill_null(joined['daily_rate'], 0.0), days_left)
+    at_risk = pc.max_element_wise(pc.subtract(pc.cast(joined['stock'], pa.float64()), expected), 0.0)
+    value = pc.multiply(at_risk, pc.fill_null(joined['cost_price'], 0.0))
+    result = (joined.append_column('days_left', days_left).append_column('at_risk_units', at_risk)
+              .append_column('at_risk_value', value))
+    return result.filter(pc.greater(result['at_risk_units'], 0)).sort_by([('at_risk_value', 'descending')])
+
+def print_table(title, table, columns, limit=20):
+    print(f"\n{title}")
+    rows = table.select(columns).slice(0, limit).to_pylist()
+    if not rows:
+        print("  (none)")
+    for row in rows:
+        print("  " + " | ".join(f"{row[c]:.2f}" if isinstance(row[c], float) else str(row[c]) for c in columns))
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run report analyses over a sales_export.py export")
+    parser.add_argument('--input', default=DEFAULT_OUTPUT_DIR, help=f"Export directory (default: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument('--from', dest='start', type=date.fromisoformat, default=None, help="First sale date")
+    parser.add_argument('--to', dest='end', type=date.fromisoformat, default=None, help="Last sale date")
+    parser.add_argument('--org', default=None, help="Only this organization_id")
+    parser.add_argument('--limit', type=int, default=10, help="Rows per report")
+    parser.add_argument('--expiry-days', type=int, default=90, help="Expiry window for the exposure report")
+    args = parser.parse_args()
+
+    sales = load_sales(args.input, args.start, args.end, args.org)
+    products = load_products(args.input, args.org)
+    print(f"{sales.num_rows} sales, {products.num_rows} products")
+
+    print_table("Top products", top_products(sales, products, args.limit),
+                ['name', 'total_quantity', 'total_revenue', 'sales_count'])
+    print_table("Margins by form", margins(sales, products),
+                ['form_name', 'revenue_sum', 'cost_sum', 'profit', 'margin_pct'], args.limit)
+    print_table(f"Expiry exposure (next {args.expiry_days} days)", expiry_exposure(sales, products, args.expiry_days),
+                ['name', 'expiry_date', 'stock', 'at_risk_units', 'at_risk_value'], args.limit)
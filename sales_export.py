@@ -0,0 +1,293 @@
+import json
+import os
+import shutil
+import time
+from datetime import date
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Offline analytics export: streams sales, products and purchase order items out of
+# Postgres with server-side cursors into Parquet, for local analysis (sales_analytics.py)
+# instead of pulling rows through the Supabase client or re-running RPCs on the live database.
+#
+#   sales_export/
+#     sales/sale_month=2025-01/part-0.parquet    live sales, one file per month (hive layout)
+#     products/part-0.parquet                    snapshot, rewritten every run
+#     purchase_order_items/part-0.parquet        snapshot joined to its purchase order
+#     _export_state.json                         sale_date watermark
+#
+# Runs are incremental: sales are re-read from the first day of the watermark's month,
+# so months still receiving sales are rewritten whole and older months are left alone.
+# Edits to older months (late soft deletes) need --full. Money columns are float64.
+
+DEFAULT_OUTPUT_DIR = 'sales_export'
+STATE_FILE = '_export_state.json'
+DEFAULT_BATCH_SIZE = 50000
+PART_FILE = 'part-0.parquet'
+
+# kind -> (SQL expression template, Arrow type)
+TYPES = {
+    'uuid': ('{}::text', pa.string()),
+    'text': ('{}', pa.string()),
+    'int': ('{}', pa.int64()),
+    'money': ('{}::float8', pa.float64()),
+    'date': ('{}', pa.date32()),
+    'timestamp': ('{}', pa.timestamp('us', tz='UTC')),
+}
+
+# (SQL column, output name, kind)
+SALES_COLUMNS = [
+    ('s.id', 'id', 'uuid'),
+    ('s.organization_id', 'organization_id', 'uuid'),
+    ('s.product_id', 'product_id', 'uuid'),
+    ('s.invoice_id', 'invoice_id', 'uuid'),
+    ('s.sale_date', 'sale_date', 'date'),
+    ('s.quantity', 'quantity', 'int'),
+    ('s.price_at_sale', 'price_at_sale', 'money'),
+    ('s.selling_unit', 'selling_unit', 'text'),
+    ('s.items_per_box', 'items_per_box', 'int'),
+    ('s.created_at', 'created_at', 'timestamp'),
+]
+
+PRODUCT_COLUMNS = [
+    ('p.id', 'id', 'uuid'),
+    ('p.organization_id', 'organization_id', 'uuid'),
+    ('p.name', 'name', 'text'),
+    ('p.form', 'form', 'text'),
+    ('p.strength', 'strength', 'text'),
+    ('p.batch_number', 'batch_number', 'text'),
+    ('p.price', 'price', 'money'),
+    ('p.cost_price', 'cost_price', 'money'),
+    ('p.stock', 'stock', 'int'),
+    ('p.min_stock_level', 'min_stock_level', 'int'),
+    ('p.items_per_box', 'items_per_box', 'int'),
+    ('p.expiry_date', 'expiry_date', 'date'),
+    ('p.supplier_id', 'supplier_id', 'uuid'),
+    ('p.deleted_at', 'deleted_at', 'timestamp'),
+]
+
+PO_ITEM_COLUMNS = [
+    ('poi.id', 'id', 'uuid'),
+    ('po.organization_id', 'organization_id', 'uuid'),
+    ('po.id', 'purchase_order_id', 'uuid'),
+    ('po.po_number', 'po_number', 'text'),
+    ('po.supplier_id', 'supplier_id', 'uuid'),
+    ('po.status', 'status', 'text'),
+    ('po.order_date', 'order_date', 'date'),
+    ('po.actual_delivery_date', 'actual_delivery_date', 'date'),
+    ('poi.product_id', 'product_id', 'uuid'),
+    ('poi.quantity_ordered', 'quantity_ordered', 'int'),
+    ('poi.quantity_received', 'quantity_received', 'int'),
+    ('poi.unit_price', 'unit_price', 'money'),
+    ('poi.line_total', 'line_total', 'money'),
+]
+
+SALES_SQL = """
+SELECT {columns}
+FROM public.sales s
+WHERE s.deleted_at IS NULL
+  AND s.sale_date IS NOT NULL
+  AND (%(since)s::date IS NULL OR s.sale_date >= %(since)s::date)
+  AND (%(org)s::uuid IS NULL OR s.organization_id = %(org)s::uuid)
+ORDER BY s.sale_date
+"""
+
+PRODUCTS_SQL = """
+SELECT {columns}
+FROM public.products p
+WHERE (%(org)s::uuid IS NULL OR p.organization_id = %(org)s::uuid)
+"""
+
+PO_ITEMS_SQL = """
+SELECT {columns}
+FROM public.purchase_order_items poi
+JOIN public.purchase_orders po ON po.id = poi.purchase_order_id
+WHERE po.deleted_at IS NULL
+  AND (%(org)s::uuid IS NULL OR po.organization_id = %(org)s::uuid)
+"""
+
+def select_list(columns):
+    return ', '.join(f"{TYPES[kind][0].format(column)} AS {name}" for column, name, kind in columns)
+
+def schema_for(columns):
+    return pa.schema([(name, TYPES[kind][1]) for _, name, kind in columns])
+
+def record_batch(rows, schema):
+    """
+    Row tuples -> RecordBatch (column-wise, one pa.array per field)
+    """
+    columns = list(zip(*rows)) if rows else [[] for _ in schema]
+    return pa.RecordBatch.from_arrays([pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                                      schema=schema)
+
+def stream_rows(conn, name, sql, params, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Yield lists of row tuples from a server-side (named) cursor
+    """
+    with conn.cursor(name=name) as cur:
+        cur.itersize = batch_size
+        cur.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                return
+            yield rows
+
+class PartitionWriter:
+    """
+    One Parquet file per partition directory. Each file is written under a temporary
+    name and moved into place when its partition is complete, so readers never see half a month.
+    """
+
+    def __init__(self, table_dir, schema, partition_column=None):
+        self.table_dir = table_dir
+        self.schema = schema
+        self.partition_column = partition_column
+        self.written = {}
+        self._partition = None
+        self._writer = None
+
+    def _directory(self, partition):
+        if self.partition_column is None:
+            return self.table_dir
+        return os.path.join(self.table_dir, f"{self.partition_column}={partition}")
+
+    def write(self, partition, rows):
+        if partition != self._partition or self._writer is None:
+            self.close()
+            directory = self._directory(partition)
+            os.makedirs(directory, exist_ok=True)
+            self._partition = partition
+            self._writer = pq.ParquetWriter(os.path.join(directory, PART_FILE + '.tmp'), self.schema,
+                                            compression='zstd')
+            self.written[partition] = 0
+        self._writer.write_batch(record_batch(rows, self.schema))
+        self.written[partition] += len(rows)
+
+    def close(self):
+        if self._writer is None:
+            return
+        self._writer.close()
+        directory = self._directory(self._partition)
+        os.replace(os.path.join(directory, PART_FILE + '.tmp'), os.path.join(directory, PART_FILE))
+        self._writer = None
+
+def month_of(day):
+    return f"{day.year:04d}-{day.month:02d}"
+
+def export_sales(conn, out_dir, since=None, org=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Rewrite the sales month partitions from `since` (a date, or None for all history).
+    Returns (rows, {month: rows}, latest sale_date).
+    """
+    table_dir = os.path.join(out_dir, 'sales')
+    sale_date_index = [name for _, name, _ in SALES_COLUMNS].index('sale_date')
+    writer = PartitionWriter(table_dir, schema_for(SALES_COLUMNS), partition_column='sale_month')
+    sql = SALES_SQL.format(columns=select_list(SALES_COLUMNS))
+
+    total, latest = 0, None
+    try:
+        for rows in stream_rows(conn, 'export_sales', sql, {'since': since, 'org': org}, batch_size):
+            # Rows arrive ordered by sale_date: split the batch where the month changes
+            start = 0
+            for i in range(1, len(rows) + 1):
+                if i == len(rows) or month_of(rows[i][sale_date_index]) != month_of(rows[start][sale_date_index]):
+                    writer.write(month_of(rows[start][sale_date_index]), rows[start:i])
+                    start = i
+            total += len(rows)
+            latest = rows[-1][sale_date_index]
+    finally:
+        writer.close()
+
+    # Months in the re-exported range that no longer have any live sales
+    first_month = month_of(since) if since else None
+    if os.path.isdir(table_dir):
+        for entry in os.listdir(table_dir):
+            month = entry.partition('=')[2]
+            if month and (first_month is None or month >= first_month) and month not in writer.written:
+                shutil.rmtree(os.path.join(table_dir, entry))
+    return total, writer.written, latest
+
+def export_snapshot(conn, out_dir, table, sql, columns, org=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Rewrite a whole (unpartitioned) table. Returns the number of rows written.
+    """
+    writer = PartitionWriter(os.path.join(out_dir, table), schema_for(columns))
+    sql = sql.format(columns=select_list(columns))
+    try:
+        for rows in stream_rows(conn, f"export_{table}", sql, {'org': org}, batch_size):
+            writer.write(None, rows)
+        if not writer.written:
+            writer.write(None, [])
+    finally:
+        writer.close()
+    return writer.written[None]
+
+def load_state(out_dir):
+    path = os.path.join(out_dir, STATE_FILE)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+def save_state(out_dir, state):
+    path = os.path.join(out_dir, STATE_FILE)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+def export(dsn, out_dir=DEFAULT_OUTPUT_DIR, full=False, org=None, batch_size=DEFAULT_BATCH_SIZE):
+    import psycopg
+
+    os.makedirs(out_dir, exist_ok=True)
+    state = load_state(out_dir)
+
+    since = None
+    watermark = state.get('watermark')
+    if watermark and not full and state.get('org') == org:
+        since = date.fromisoformat(watermark).replace(day=1)
+        print(f"Incremental export from {since} (watermark {watermark})")
+    else:
+        print("Full export")
+
+    start_time = time.time()
+    with psycopg.connect(dsn) as conn:
+        # One snapshot for all three tables, so sales never reference products missing from the export
+        conn.isolation_level = psycopg.IsolationLevel.REPEATABLE_READ
+        conn.read_only = True
+        sales, months, latest = export_sales(conn, out_dir, since, org, batch_size)
+        products = export_snapshot(conn, out_dir, 'products', PRODUCTS_SQL, PRODUCT_COLUMNS, org, batch_size)
+        po_items = export_snapshot(conn, out_dir, 'purchase_order_items', PO_ITEMS_SQL, PO_ITEM_COLUMNS,
+                                   org, batch_size)
+
+    if since is None:
+        watermark = latest.isoformat() if latest else None
+    elif latest:
+        watermark = max(watermark, latest.isoformat())
+    state.update({'watermark': watermark, 'org': org, 'exported_at': time.strftime('%Y-%m-%dT%H:%M:%S')})
+    save_state(out_dir, state)
+
+    elapsed = time.time() - start_time
+    print(f"\n✓ Export complete in {elapsed:.1f}s")
+    print(f"  Sales: {sales} rows in {len(months)} month partitions{' (' + ', '.join(sorted(months)) + ')' if months else ''}")
+    print(f"  Products: {products} rows")
+    print(f"  Purchase order items: {po_items} rows")
+    print(f"  Watermark: {watermark}")
+    print(f"  Output: {out_dir}/")
+    return sales, products, po_items
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export sales history to Parquet for offline analysis")
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'),
+                        help="PostgreSQL connection string (default: $DATABASE_URL)")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT_DIR, help=f"Export directory (default: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument('--org', default=None, help="Only this organization_id")
+    parser.add_argument('--full', action='store_true', help="Ignore the watermark and re-export all history")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Rows per cursor fetch")
+    args = parser.parse_args()
+
+    if not args.dsn:
+        parser.error("pass --dsn or set DATABASE_URL")
+    export(args.dsn, args.output, args.full, args.org, args.batch_size)
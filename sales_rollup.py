@@ -0,0 +1,187 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+
+# Backfill / rebuild tool for sales_daily_rollup (migration_v25_sales_daily_rollup.sql).
+# The triggers keep the rollup current; this recomputes it from `sales` for history,
+# after a bulk import done with triggers disabled, or to repair drift found by --verify.
+#
+# The date range is split into partitions (calendar months by default) and each one is
+# rebuilt by refresh_sales_daily_rollup() in its own transaction on its own connection,
+# so partitions run in parallel and a failed one can simply be re-run.
+#
+#   python sales_rollup.py --dsn postgresql://...                    # whole history
+#   python sales_rollup.py --from 2025-01-01 --to 2025-06-30 --jobs 8
+#   python sales_rollup.py --verify                                  # compare with raw sales
+
+DEFAULT_JOBS = 4
+
+# Totals per partition from the raw table and from the rollup; equal when in sync
+VERIFY_SQL = """
+SELECT
+    (SELECT (COUNT(*), COALESCE(SUM(quantity), 0), COALESCE(SUM(quantity * price_at_sale), 0))::text
+     FROM public.sales
+     WHERE deleted_at IS NULL AND sale_date BETWEEN %(from)s AND %(to)s
+       AND (%(org)s::uuid IS NULL OR organization_id = %(org)s::uuid)),
+    (SELECT (COALESCE(SUM(sales_count), 0), COALESCE(SUM(quantity), 0), COALESCE(SUM(revenue), 0))::text
+     FROM public.sales_daily_rollup
+     WHERE sale_date BETWEEN %(from)s AND %(to)s
+       AND (%(org)s::uuid IS NULL OR organization_id = %(org)s::uuid))
+"""
+
+def month_partitions(start, end):
+    """
+    [(first_day, last_day)] calendar months covering start..end, clipped to the range
+    """
+    partitions = []
+    current = start
+    while current <= end:
+        next_month = (current.replace(day=1) + timedelta(days=32)).replace(day=1)
+        partitions.append((current, min(end, next_month - timedelta(days=1))))
+        current = next_month
+    return partitions
+
+def day_partitions(start, end, days):
+    """
+    [(first_day, last_day)] windows of `days` days covering start..end
+    """
+    partitions = []
+    current = start
+    while current <= end:
+        last = min(end, current + timedelta(days=days - 1))
+        partitions.append((current, last))
+        current = last + timedelta(days=1)
+    return partitions
+
+def sales_date_range(conn, org=None):
+    row = conn.execute(
+        "SELECT MIN(sale_date), MAX(sale_date) FROM public.sales "
+        "WHERE deleted_at IS NULL AND (%(org)s::uuid IS NULL OR organization_id = %(org)s::uuid)",
+        {'org': org}
+    ).fetchone()
+    return row[0], row[1]
+
+def rebuild_partition(dsn, first, last, org=None):
+    """
+    Rebuild one partition in its own transaction. Returns the rollup rows written.
+    """
+    import psycopg
+
+    with psycopg.connect(dsn) as conn:
+        return conn.execute("SELECT refresh_sales_daily_rollup(%s, %s, %s)", (first, last, org)).fetchone()[0]
+
+def verify_partition(dsn, first, last, org=None):
+    """
+    (raw totals, rollup totals) for one partition as '(count,quantity,revenue)' strings
+    """
+    import psycopg
+
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        return conn.execute(VERIFY_SQL, {'from': first, 'to': last, 'org': org}).fetchone()
+
+def run_partitions(dsn, partitions, task, jobs=DEFAULT_JOBS):
+    """
+    Run task(dsn, first, last) for every partition on `jobs` threads.
+    Yields (partition, result, error) as partitions finish.
+    """
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(task, dsn, first, last): (first, last) for first, last in partitions}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+
+def rebuild(dsn, start=None, end=None, org=None, jobs=DEFAULT_JOBS, partition_days=None):
+    """
+    Rebuild the rollup for start..end (default: the whole sales history).
+    Returns the partitions that failed.
+    """
+    import psycopg
+
+    if start is None or end is None:
+        with psycopg.connect(dsn, autocommit=True) as conn:
+            first_sale, last_sale = sales_date_range(conn, org)
+        if first_sale is None:
+            print("No sales to roll up")
+            return []
+        start, end = start or first_sale, end or last_sale
+
+    partitions = day_partitions(start, end, partition_days) if partition_days else month_partitions(start, end)
+    print(f"Rebuilding sales_daily_rollup for {start} .. {end}: {len(partitions)} partitions, {jobs} jobs")
+
+    failed, total_rows = [], 0
+    start_time = time.time()
+    task = lambda dsn, first, last: rebuild_partition(dsn, first, last, org)
+    for (first, last), rows, error in run_partitions(dsn, partitions, task, jobs):
+        if error:
+            failed.append((first, last))
+            print(f"  ✗ {first} .. {last}: {error}")
+        else:
+            total_rows += rows
+            print(f"  ✓ {first} .. {last}: {rows} rollup rows")
+
+    elapsed = time.time() - start_time
+    print(f"\n✓ Rebuilt {len(partitions) - len(failed)}/{len(partitions)} partitions "
+          f"({total_rows} rollup rows) in {elapsed:.1f}s")
+    if failed:
+        print(f"  Failed: {len(failed)} (re-run with --from/--to to retry them)")
+    return failed
+
+def verify(dsn, start, end, org=None, jobs=DEFAULT_JOBS):
+    """
+    Compare rollup totals with raw sales month by month. Returns the months that differ.
+    """
+    partitions = month_partitions(start, end)
+    task = lambda dsn, first, last: verify_partition(dsn, first, last, org)
+    mismatched = []
+    for (first, last), totals, error in sorted(run_partitions(dsn, partitions, task, jobs), key=lambda r: r[0]):
+        if error:
+            print(f"  ✗ {first} .. {last}: {error}")
+            mismatched.append((first, last))
+        elif totals[0] != totals[1]:
+            print(f"  ✗ {first} .. {last}: sales {totals[0]} vs rollup {totals[1]}")
+            mismatched.append((first, last))
+    if mismatched:
+        print(f"✗ {len(mismatched)}/{len(partitions)} months out of sync")
+    else:
+        print(f"✓ All {len(partitions)} months match")
+    return mismatched
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Backfill, rebuild or verify sales_daily_rollup")
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'),
+                        help="PostgreSQL connection string (default: $DATABASE_URL)")
+    parser.add_argument('--from', dest='start', type=date.fromisoformat, default=None,
+                        help="First sale date to rebuild (default: earliest sale)")
+    parser.add_argument('--to', dest='end', type=date.fromisoformat, default=None,
+                        help="Last sale date to rebuild (default: latest sale)")
+    parser.add_argument('--org', default=None, help="Only this organization_id")
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS, help=f"Parallel connections (default: {DEFAULT_JOBS})")
+    parser.add_argument('--partition-days', type=int, default=None,
+                        help="Partition size in days (default: calendar months)")
+    parser.add_argument('--verify', action='store_true', help="Compare the rollup with raw sales instead of rebuilding")
+    args = parser.parse_args()
+
+    if not args.dsn:
+        parser.error("pass --dsn or set DATABASE_URL")
+
+    if args.verify:
+        import psycopg
+
+        start, end = args.start, args.end
+        if start is None or end is None:
+            with psycopg.connect(args.dsn, autocommit=True) as conn:
+                first_sale, last_sale = sales_date_range(conn, args.org)
+            start, end = start or first_sale, end or last_sale
+        if start is None:
+            print("No sales to verify")
+            sys.exit(0)
+        sys.exit(1 if verify(args.dsn, start, end, args.org, args.jobs) else 0)
+
+    failed = rebuild(args.dsn, args.start, args.end, args.org, args.jobs, args.partition_days)
+    sys.exit(1 if failed else 0)
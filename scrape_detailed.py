@@ -1,99 +1,113 @@
-import requests
-from bs4 import BeautifulSoup
 import csv
+import threading
 import time
-import re
+from fetch_engine import fetch_all, DEFAULT_CONCURRENCY, DEFAULT_RATE
+from http_client import fetch, ValidatorStore
+from medicine_extractors import extract_details, DEFAULT_BACKEND, FIELDNAMES
+from metrics import metrics, add_metrics_arguments, start_reporter
+from page_cache import PageCache
+from scrape_ledger import ScrapeLedger
 
-def scrape_medicine_details(url):
+# Both stores live in the working directory and are opened on first use, not on import:
+#   validators  ETag/Last-Modified of every page scraped so far, so refreshes can skip unchanged pages
+#   page cache  raw page bodies, so extraction rule changes can be re-applied without re-downloading
+_validators = None
+_page_cache = None
+_state_lock = threading.Lock()
+
+def get_validators():
+    """
+    Return the process-wide validator store (opened on first use)
+    """
+    global _validators
+    with _state_lock:
+        if _validators is None:
+            _validators = ValidatorStore()
+        return _validators
+
+def get_page_cache():
+    """
+    Return the process-wide page cache (opened on first use)
+    """
+    global _page_cache
+    with _state_lock:
+        if _page_cache is None:
+            _page_cache = PageCache()
+        return _page_cache
+
+def save_state():
+    """Persist the validator store and page cache index, if they were opened"""
+    with _state_lock:
+        stores = [store for store in (_validators, _page_cache) if store is not None]
+    for store in stores:
+        store.save()
+
+class ScrapeError(Exception):
+    pass
+
+def fetch_medicine_details(url, backend=DEFAULT_BACKEND):
+    """
+    Fetch and parse a single medicine page.
+    Raises ScrapeError (or a requests exception) describing why the page could not be scraped.
+    """
+    validators = get_validators()
+    page_cache = get_page_cache()
+    response = fetch(url, validators=validators)
+    if response.status_code == 304:
+        # Page unchanged since the last scrape - re-parse the cached copy with the
+        # current rules, or reuse the previous result if it has been evicted
+        cached = page_cache.get(url)
+        if cached is not None:
+            with metrics.time('parse_seconds', backend=backend):
+                return extract_details(cached, url, backend=backend)
+        record = validators.record(url)
+        if record is None:
+            raise ScrapeError("HTTP 304 but no cached copy")
+        return record
+    if response.status_code != 200:
+        raise ScrapeError(f"HTTP {response.status_code}")
+    
+    page_cache.put(url, response.content)
+    with metrics.time('parse_seconds', backend=backend):
+        details = extract_details(response.content, url, backend=backend)
+    
+    validators.remember(url, response, details)
+    return details
+
+def scrape_medicine_details(url, backend=DEFAULT_BACKEND):
     """
     Scrape detailed information from a single medicine page on Dawaai.pk
     Returns dict with: brand_name, generic_name, manufacturer, strength, dosage_form, pack_size
     """
     try:
-        response = requests.get(url, timeout=10)
-        if response.status_code != 200:
-            return None
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        details = {
-            'brand_name': '',
-            'generic_name': '',
-            'manufacturer': '',
-            'strength': '',
-            'dosage_form': '',
-            'pack_size': '',
-            'url': url
-        }
-        
-        # Extract brand name from h1
-        h1 = soup.find('h1')
-        if h1:
-            h1_text = h1.get_text(strip=True)
-            details['brand_name'] = h1_text
-            
-            # Try to extract dosage form from h1 (e.g., "tablet", "syrup", "injection")
-            dosage_forms = ['tablet', 'capsule', 'syrup', 'injection', 'cream', 'ointment', 'drops', 'suspension', 'powder', 'solution']
-            for form in dosage_forms:
-                if form in h1_text.lower():
-                    details['dosage_form'] = form
-                    break
-        
-        # Extract manufacturer from a[href*="/brands/"]
-        brand_link = soup.find('a', href=re.compile(r'/brands/'))
-        if brand_link:
-            details['manufacturer'] = brand_link.get_text(strip=True)
-        
-        # Extract generic name and strength from a[href*="/generic/"]
-        generic_link = soup.find('a', href=re.compile(r'/generic/'))
-        if generic_link:
-            generic_text = generic_link.get_text(strip=True)
-            details['generic_name'] = generic_text
-            
-            # Try to extract strength from generic text (e.g., "Paracetamol (500 mg)")
-            strength_match = re.search(r'\(([^)]+)\)', generic_text)
-            if strength_match:
-                details['strength'] = strength_match.group(1)
-                # Remove strength from generic name
-                details['generic_name'] = re.sub(r'\s*\([^)]+\)', '', generic_text).strip()
-        
-        # Extract pack size - look for text containing "Pack Size:" or similar
-        page_text = soup.get_text()
-        pack_match = re.search(r'Pack Size[:\s]+([^\n]+)', page_text, re.I)
-        if pack_match:
-            details['pack_size'] = pack_match.group(1).strip()
-        
-        # If pack size not found, try to extract from h1
-        if not details['pack_size'] and h1:
-            # Pattern: "20 x 10's" or "100ml" etc
-            pack_patterns = [
-                r'(\d+\s*x\s*\d+\'?s?)',  # 20 x 10's
-                r'(\d+\s*ml)',             # 100ml
-                r'(\d+\s*mg)',             # 500mg (if not already in strength)
-                r'(\d+\s*tablets?)',       # 10 tablets
-                r'(\d+\s*capsules?)',      # 20 capsules
-            ]
-            for pattern in pack_patterns:
-                match = re.search(pattern, h1_text, re.I)
-                if match:
-                    details['pack_size'] = match.group(1)
-                    break
-        
-        return details
-        
+        return fetch_medicine_details(url, backend=backend)
     except Exception as e:
         print(f"Error scraping {url}: {str(e)}")
         return None
 
-def scrape_all_medicines(limit=None):
+def scrape_job(url):
+    """
+    Fetch engine job that keeps the failure reason for the ledger: returns (details, error)
+    """
+    try:
+        return fetch_medicine_details(url), None
+    except Exception as e:
+        return None, str(e) or e.__class__.__name__
+
+def scrape_all_medicines(limit=None, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+                         input_file='dawaai_medicines_clean.csv', output_file='dawaai_medicines_detailed.csv'):
     """
     Scrape detailed information for all medicines
     limit: Optional limit for testing (e.g., 100 for first 100 medicines)
+    concurrency: Number of requests in flight at once
+    rate: Maximum requests per second to the site
+    input_file / output_file: CSV of medicines to scrape and where to write the details
+    Progress is recorded in the scrape ledger, so an interrupted run can be finished with resume_scrape.py
     """
     print("Loading medicine list...")
     medicines = []
     
-    with open('dawaai_medicines_clean.csv', 'r', encoding='utf-8') as f:
+    with open(input_file, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         medicines = list(reader)
     
@@ -103,40 +117,54 @@ def scrape_all_medicines(limit=None):
     
     total = len(medicines)
     print(f"Total medicines to scrape: {total}")
-    print(f"Estimated time: {total * 2 / 60:.1f} minutes")
+    print(f"Concurrency: {concurrency} | Rate limit: {rate} req/s")
+    print(f"Estimated time: {total / rate / 60:.1f} minutes")
     print("\nStarting scraping... (Press Ctrl+C to stop)\n")
     
+    ledger = ScrapeLedger()
+    ledger.enqueue(medicines, reset=True)
+    
     results = []
     failed = []
     start_time = time.time()
+    processed = 0
     
-    for i, medicine in enumerate(medicines, 1):
-        url = medicine['url']
-        
-        # Progress indicator
-        if i % 10 == 0 or i == 1:
-            elapsed = time.time() - start_time
-            rate = i / elapsed if elapsed > 0 else 0
-            remaining = (total - i) / rate if rate > 0 else 0
-            print(f"Progress: {i}/{total} ({i/total*100:.1f}%) | Success: {len(results)} | Failed: {len(failed)} | ETA: {remaining/60:.1f}min")
-        
-        details = scrape_medicine_details(url)
+    def on_result(url, outcome):
+        nonlocal processed
+        processed += 1
+        i = processed
         
+        details, error = outcome or (None, 'unknown error')
         if details:
             results.append(details)
+            ledger.record_ok(url, details)
+            metrics.inc('stage_rows_total', stage='detail')
         else:
             failed.append(url)
+            ledger.record_failure(url, error)
+            metrics.inc('scrape_failures_total')
         
-        # Rate limiting - be respectful to the server
-        time.sleep(1.5)  # 1.5 seconds between requests
+        # Progress indicator
+        if i % 10 == 0 or i == 1:
+            elapsed = time.time() - start_time
+            rate_now = i / elapsed if elapsed > 0 else 0
+            metrics.set('stage_rows_per_second', round(rate_now, 2), stage='detail')
+            remaining = (total - i) / rate_now if rate_now > 0 else 0
+            print(f"Progress: {i}/{total} ({i/total*100:.1f}%) | Success: {len(results)} | Failed: {len(failed)} | ETA: {remaining/60:.1f}min")
         
-        # Save progress every 100 medicines
+        # The ledger commits every 100 results; save the HTTP state alongside it
         if i % 100 == 0:
-            save_results(results, 'dawaai_medicines_detailed_partial.csv')
-            print(f"  → Checkpoint saved at {i} medicines")
+            save_state()
+    
+    # Rate limiting is handled by the fetch engine (per-host token bucket)
+    try:
+        fetch_all([m['url'] for m in medicines], scrape_job,
+                  concurrency=concurrency, rate=rate, on_result=on_result)
+    finally:
+        ledger.close()
+        save_state()
     
     # Final save
-    output_file = 'dawaai_medicines_detailed.csv'
     save_results(results, output_file)
     
     elapsed = time.time() - start_time
@@ -163,6 +191,8 @@ def scrape_all_medicines(limit=None):
             print(f"  Strength: {med['strength']}")
             print(f"  Form: {med['dosage_form']}")
             print(f"  Pack: {med['pack_size']}")
+    
+    return results, failed
 
 def save_results(results, filename):
     """Save results to CSV"""
@@ -170,25 +200,28 @@ def save_results(results, filename):
         return
     
     with open(filename, 'w', newline='', encoding='utf-8') as f:
-        fieldnames = ['brand_name', 'generic_name', 'manufacturer', 'strength', 'dosage_form', 'pack_size', 'url']
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
         writer.writeheader()
         writer.writerows(results)
 
 if __name__ == '__main__':
-    import sys
-    
-    # Check if user wants to test with a limit
-    limit = None
-    if len(sys.argv) > 1:
-        try:
-            limit = int(sys.argv[1])
-        except:
-            print("Usage: python scrape_detailed.py [limit]")
-            print("Example: python scrape_detailed.py 100  (scrape first 100)")
-            sys.exit(1)
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Scrape medicine details from Dawaai.pk")
+    parser.add_argument('limit', nargs='?', type=int, default=None,
+                        help="Only scrape the first N medicines (for testing)")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Requests in flight at once (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help=f"Maximum requests per second (default: {DEFAULT_RATE})")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
     
+    reporter = start_reporter(args)
     try:
-        scrape_all_medicines(limit=limit)
+        scrape_all_medicines(limit=args.limit, concurrency=args.concurrency, rate=args.rate)
     except KeyboardInterrupt:
         print("\n\nScraping interrupted by user. Progress has been saved.")
+    finally:
+        if reporter:
+            reporter.stop()
@@ -0,0 +1,154 @@
+import csv
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from medicine_extractors import FIELDNAMES
+
+# SQLite job ledger for the detail scraper: one row per URL with its state,
+# attempt count, last error and the scraped record. Replaces re-reading the
+# CSVs on every resume; results are committed in batches.
+
+DEFAULT_LEDGER_FILE = 'scrape_ledger.db'
+DEFAULT_BATCH_SIZE = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    url TEXT PRIMARY KEY,
+    name TEXT,
+    state TEXT NOT NULL DEFAULT 'pending' CHECK (state IN ('pending', 'ok', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    fetched_at TEXT,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_state_attempts ON jobs(state, attempts);
+"""
+
+class ScrapeLedger:
+    """
+    Per-URL scrape state (pending/ok/failed) stored in SQLite with WAL
+    """
+
+    def __init__(self, path=DEFAULT_LEDGER_FILE, batch_size=DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._uncommitted = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+
+    def enqueue(self, medicines, reset=False):
+        """
+        Add {'name', 'url'} rows as pending jobs.
+        With reset=True, URLs already in the ledger are set back to pending.
+        """
+        rows = [(m['url'], m.get('name', '')) for m in medicines]
+        with self._lock:
+            if reset:
+                self.conn.executemany(
+                    """INSERT INTO jobs (url, name) VALUES (?, ?)
+                       ON CONFLICT(url) DO UPDATE SET state = 'pending', attempts = 0, last_error = NULL""",
+                    rows
+                )
+            else:
+                self.conn.executemany('INSERT OR IGNORE INTO jobs (url, name) VALUES (?, ?)', rows)
+            self.conn.commit()
+
+    def import_results(self, rows):
+        """
+        Mark rows from an existing detailed CSV as already scraped
+        """
+        with self._lock:
+            self.conn.executemany(
+                """INSERT INTO jobs (url, state, result) VALUES (?, 'ok', ?)
+                   ON CONFLICT(url) DO UPDATE SET state = 'ok', result = excluded.result""",
+                [(row['url'], json.dumps({k: row.get(k, '') for k in FIELDNAMES})) for row in rows]
+            )
+            self.conn.commit()
+
+    def pending_urls(self, max_attempts=None):
+        """
+        URLs still to scrape: pending ones plus failures under max_attempts
+        """
+        if max_attempts is None:
+            query = "SELECT url FROM jobs WHERE state != 'ok' ORDER BY url"
+            params = ()
+        else:
+            query = "SELECT url FROM jobs WHERE state != 'ok' AND attempts < ? ORDER BY url"
+            params = (max_attempts,)
+        return [row[0] for row in self.conn.execute(query, params)]
+
+    def retry_failed(self):
+        with self._lock:
+            self.conn.execute("UPDATE jobs SET state = 'pending', attempts = 0 WHERE state = 'failed'")
+            self.conn.commit()
+
+    def _record(self, sql, params):
+        with self._lock:
+            self.conn.execute(sql, params)
+            self._uncommitted += 1
+            if self._uncommitted >= self.batch_size:
+                self.conn.commit()
+                self._uncommitted = 0
+
+    def record_ok(self, url, details):
+        self._record(
+            """UPDATE jobs SET state = 'ok', attempts = attempts + 1, last_error = NULL,
+                              fetched_at = ?, result = ? WHERE url = ?""",
+            (datetime.now(timezone.utc).isoformat(), json.dumps(details), url)
+        )
+
+    def record_failure(self, url, error):
+        self._record(
+            """UPDATE jobs SET state = 'failed', attempts = attempts + 1, last_error = ?,
+                              fetched_at = ? WHERE url = ?""",
+            (error, datetime.now(timezone.utc).isoformat(), url)
+        )
+
+    def flush(self):
+        with self._lock:
+            self.conn.commit()
+            self._uncommitted = 0
+
+    def counts(self):
+        counts = {'pending': 0, 'ok': 0, 'failed': 0}
+        for state, count in self.conn.execute('SELECT state, COUNT(*) FROM jobs GROUP BY state'):
+            counts[state] = count
+        return counts
+
+    def failures(self):
+        return self.conn.execute(
+            "SELECT url, attempts, last_error FROM jobs WHERE state = 'failed' ORDER BY url"
+        ).fetchall()
+
+    def iter_results(self, urls=None):
+        """
+        Yield scraped records, optionally limited to a set of URLs
+        """
+        for url, result in self.conn.execute("SELECT url, result FROM jobs WHERE state = 'ok' ORDER BY url"):
+            if urls is None or url in urls:
+                yield json.loads(result)
+
+    def export_csv(self, filename, urls=None):
+        """
+        Write scraped records to CSV in one pass. Returns the number of rows written.
+        """
+        count = 0
+        with open(filename, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            for details in self.iter_results(urls):
+                writer.writerow(details)
+                count += 1
+        return count
+
+    def close(self):
+        self.flush()
+        self.conn.close()
@@ -1,61 +1,130 @@
-import requests
 import xml.etree.ElementTree as ET
 import csv
 import re
+import zlib
 from urllib.parse import unquote
+import requests
+from http_client import fetch
 
-def scrape_medicine_names():
+SITEMAP_URL = 'https://dawaai.pk/sitemap.xml'
+
+# Define namespace
+SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+
+CHUNK_SIZE = 64 * 1024
+
+class SitemapDownloadError(Exception):
+    pass
+
+def iter_sitemap_entries(sitemap_url=SITEMAP_URL, medicine_only=True):
     """
-    Scrape medicine names from Dawaai.pk sitemap
+    Stream (url, lastmod) for every medicine page in the sitemap.
+    The body is parsed chunk by chunk with an incremental XML parser and elements are
+    cleared as soon as they are read, so memory stays flat however large the sitemap is.
+    <sitemapindex> children are only downloaded when the generator reaches them.
+    lastmod is '' when the sitemap does not provide one.
+    Raises SitemapDownloadError if a sitemap cannot be downloaded or parsed, including
+    connection failures after retries and bodies cut off mid-stream.
     """
-    print("Downloading sitemap...")
-    response = requests.get('https://dawaai.pk/sitemap.xml')
+    print(f"Streaming sitemap {sitemap_url}...")
+    try:
+        response = fetch(sitemap_url, timeout=60, stream=True)
+    except requests.RequestException as e:
+        raise SitemapDownloadError(f"Failed to download sitemap {sitemap_url}: {e}") from e
     
     if response.status_code != 200:
-        print(f"Failed to download sitemap. Status code: {response.status_code}")
-        return
+        response.close()
+        raise SitemapDownloadError(f"Failed to download sitemap. Status code: {response.status_code}")
     
-    print("Parsing sitemap XML...")
-    root = ET.fromstring(response.content)
+    # Sitemaps served as .xml.gz files are gzip on the wire without Content-Encoding
+    decompressor = None
+    if sitemap_url.endswith('.gz') and response.headers.get('Content-Encoding') != 'gzip':
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
     
-    # Define namespace
-    namespace = {'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    root = None
+    child_sitemaps = []
     
-    # Extract all medicine URLs
-    medicine_urls = []
-    for url in root.findall('ns:url', namespace):
-        loc = url.find('ns:loc', namespace)
-        if loc is not None and '/medicine/' in loc.text:
-            medicine_urls.append(loc.text)
-    
-    print(f"Found {len(medicine_urls)} medicine URLs")
+    try:
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            if decompressor:
+                chunk = decompressor.decompress(chunk)
+            parser.feed(chunk)
+            
+            for event, elem in parser.read_events():
+                if event == 'start':
+                    if root is None:
+                        root = elem
+                    continue
+                
+                if elem.tag == SITEMAP_NS + 'url':
+                    loc = elem.findtext(SITEMAP_NS + 'loc', '').strip()
+                    if loc and (not medicine_only or '/medicine/' in loc):
+                        lastmod = elem.findtext(SITEMAP_NS + 'lastmod', '').strip()
+                        yield loc, lastmod
+                    # Drop everything parsed so far
+                    root.clear()
+                elif elem.tag == SITEMAP_NS + 'sitemap':
+                    loc = elem.findtext(SITEMAP_NS + 'loc', '').strip()
+                    if loc:
+                        child_sitemaps.append(loc)
+                    root.clear()
+        parser.close()
+    except (requests.RequestException, ET.ParseError, zlib.error) as e:
+        raise SitemapDownloadError(f"Failed to read sitemap {sitemap_url}: {e}") from e
+    finally:
+        response.close()
     
-    # Extract medicine names from URLs
-    medicines = []
+    # <sitemapindex>: follow children lazily, one document at a time
+    for child_url in child_sitemaps:
+        yield from iter_sitemap_entries(child_url, medicine_only=medicine_only)
+
+def medicine_name_from_url(url):
+    """
+    Extract the part after /medicine/ and turn it into a readable name
+    Example: https://dawaai.pk/medicine/Panadol-Extra-500mg-191.html -> Panadol Extra 500mg
+    """
+    match = re.search(r'/medicine/([^/]+?)(?:-\d+)?\.html', url)
+    if not match:
+        return None
+    medicine_slug = match.group(1)
+    # Convert slug to readable name (replace hyphens with spaces)
+    medicine_name = medicine_slug.replace('-', ' ')
+    # URL decode in case of special characters
+    # Keep the full name for now as it includes strength
+    return unquote(medicine_name)
+
+def extract_medicines(entries):
+    """
+    Turn (url, lastmod) sitemap entries into unique {'name', 'url', 'lastmod'} rows.
+    Works as a generator so deduplication starts while the sitemap is still downloading.
+    """
     seen_names = set()
     
-    for url in medicine_urls:
-        # Extract the part after /medicine/
-        # Example: https://dawaai.pk/medicine/Panadol-Extra-500mg-191.html
-        # Extract: Panadol-Extra-500mg
-        match = re.search(r'/medicine/([^/]+?)(?:-\d+)?\.html', url)
-        if match:
-            medicine_slug = match.group(1)
-            # Convert slug to readable name (replace hyphens with spaces)
-            medicine_name = medicine_slug.replace('-', ' ')
-            # URL decode in case of special characters
-            medicine_name = unquote(medicine_name)
-            
-            # Remove trailing numbers/strength info if present
-            # Keep the full name for now as it includes strength
-            
-            # Avoid duplicates
-            if medicine_name.lower() not in seen_names:
-                seen_names.add(medicine_name.lower())
-                medicines.append({
-                    'name': medicine_name,
-                    'url': url
-                })
+    for url, lastmod in entries:
+        medicine_name = medicine_name_from_url(url)
+        if medicine_name is None:
+            continue
+        
+        # Avoid duplicates
+        if medicine_name.lower() not in seen_names:
+            seen_names.add(medicine_name.lower())
+            yield {
+                'name': medicine_name,
+                'url': url,
+                'lastmod': lastmod
+            }
+
+def scrape_medicine_names():
+    """
+    Scrape medicine names from Dawaai.pk sitemap
+    """
+    # Extract medicine names from URLs
+    try:
+        medicines = list(extract_medicines(iter_sitemap_entries()))
+    except SitemapDownloadError as e:
+        print(str(e))
+        return
     
     print(f"Extracted {len(medicines)} unique medicine names")
     
@@ -64,7 +133,7 @@ def scrape_medicine_names():
     print(f"Saving to {output_file}...")
     
     with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ['name', 'url']
+        fieldnames = ['name', 'url', 'lastmod']
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
         
         writer.writeheader()
@@ -0,0 +1,72 @@
+import re
+
+# Normalized search key for medicine_reference rows. The same rules are implemented
+# in SQL by medicine_search_key() (migration v23) so keys computed here during import
+# and keys computed by the trigger for rows edited in the app are identical.
+#
+#   normalize: lowercase, anything outside [a-z0-9] becomes a space
+#   strip:     drop tokens containing a digit and bare units (500mg, 5 ml, 10's ...)
+#   fold:      spelling variants common in the catalogue (sulphate/sulfate,
+#              amoxycillin/amoxicillin, cephalexin/cefalexin, ...) and doubled letters
+#
+# The key holds the normalized text, followed by its folded form when that differs,
+# so both what the user typed and its canonical spelling can be matched.
+
+UNIT_TOKENS = {'mg', 'mcg', 'g', 'gm', 'kg', 'ml', 'l', 'iu', 'mmol', 's'}
+
+FOLD_RULES = [
+    (re.compile(r'ph'), 'f'),
+    (re.compile(r'ae'), 'e'),
+    (re.compile(r'oe'), 'e'),
+    (re.compile(r'ck'), 'k'),
+    (re.compile(r'y'), 'i'),
+    (re.compile(r'([a-z])\1+'), r'\1'),
+]
+
+NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+DIGIT_RE = re.compile(r'[0-9]')
+
+def normalize_text(text):
+    """
+    Lowercase and reduce to space-separated [a-z0-9] words
+    """
+    return NON_ALNUM_RE.sub(' ', (text or '').lower()).strip()
+
+def strip_strength(text):
+    """
+    Drop strength and pack tokens from normalized text
+    """
+    return ' '.join(word for word in text.split() if not DIGIT_RE.search(word) and word not in UNIT_TOKENS)
+
+def fold_variants(text):
+    """
+    Canonical spelling of normalized text
+    """
+    for pattern, replacement in FOLD_RULES:
+        text = pattern.sub(replacement, text)
+    return text
+
+def search_key(brand_name, generic_name='', formula='', manufacturer=''):
+    """
+    Search key for one medicine: brand (without strength), generic, formula and manufacturer
+    """
+    parts = [strip_strength(normalize_text(brand_name)), normalize_text(generic_name),
+             normalize_text(formula), normalize_text(manufacturer)]
+    key = ' '.join(part for part in parts if part)
+    folded = fold_variants(key)
+    return key if folded == key else f"{key} {folded}"
+
+def search_terms(term):
+    """
+    (normalized, folded) forms of a user query, as the search RPC matches them.
+    Strength tokens are dropped unless nothing else is left.
+    """
+    normalized = strip_strength(normalize_text(term)) or normalize_text(term)
+    return normalized, fold_variants(normalized)
+
+def row_search_key(row):
+    """
+    Search key for a cleaned CSV row (dawaai_medicines_cleaned_final.csv)
+    """
+    return search_key(row['brand_name'], row.get('generic_name', ''), row.get('formula', ''),
+                      row.get('manufacturer', ''))
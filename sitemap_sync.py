@@ -0,0 +1,170 @@
+import csv
+import json
+import os
+from clean_medicines import is_valid_medicine_name
+from scrape_medicines import iter_sitemap_entries, extract_medicines, SitemapDownloadError
+
+# Incremental catalogue refresh: diff the live sitemap against the snapshot
+# from the previous run and only send added/modified medicine pages to the detail scraper.
+# Without --scrape the new snapshot is only staged (SNAPSHOT_FILE.pending); run --commit once
+# CHANGED_FILE has been handed off, so a sync that nobody consumes never loses changes.
+
+SNAPSHOT_FILE = 'sitemap_snapshot.json'
+CHANGED_FILE = 'dawaai_medicines_changed.csv'
+REMOVED_FILE = 'dawaai_medicines_removed.csv'
+DETAILED_FILE = 'dawaai_medicines_detailed.csv'
+DETAILED_CHANGED_FILE = 'dawaai_medicines_detailed_changed.csv'
+PENDING_SUFFIX = '.pending'
+
+def load_snapshot(path=SNAPSHOT_FILE):
+    """
+    Load the previous snapshot: {url: {'name': ..., 'lastmod': ...}}
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_snapshot(snapshot, path=SNAPSHOT_FILE):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, indent=0, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def commit_snapshot(snapshot_file=SNAPSHOT_FILE):
+    """
+    Promote the snapshot staged by a sync without --scrape. Returns False if none is staged.
+    """
+    pending = snapshot_file + PENDING_SUFFIX
+    if not os.path.exists(pending):
+        return False
+    os.replace(pending, snapshot_file)
+    return True
+
+def build_snapshot(medicines):
+    return {m['url']: {'name': m['name'], 'lastmod': m['lastmod']} for m in medicines}
+
+def diff_snapshots(old, new):
+    """
+    Compare two snapshots by URL and lastmod.
+    Returns (added, modified, removed) as lists of URLs.
+    A page counts as modified when the new sitemap gives a lastmod that differs from the old one.
+    """
+    added = [url for url in new if url not in old]
+    removed = [url for url in old if url not in new]
+    modified = [
+        url for url, entry in new.items()
+        if url in old and entry['lastmod'] and entry['lastmod'] != old[url]['lastmod']
+    ]
+    return added, modified, removed
+
+def write_medicine_list(path, snapshot, urls):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['name', 'url', 'lastmod'])
+        writer.writeheader()
+        for url in sorted(urls, key=lambda u: snapshot[u]['name'].lower()):
+            writer.writerow({'name': snapshot[url]['name'], 'url': url, 'lastmod': snapshot[url]['lastmod']})
+
+def merge_detailed(changed_file, removed_urls, detailed_file=DETAILED_FILE):
+    """
+    Fold freshly scraped rows into the detailed CSV (replacing rows by URL)
+    and drop tombstoned URLs
+    """
+    from scrape_detailed import save_results
+
+    rows = {}
+    if os.path.exists(detailed_file):
+        with open(detailed_file, 'r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                rows[row['url']] = row
+
+    updated = 0
+    if os.path.exists(changed_file):
+        with open(changed_file, 'r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                rows[row['url']] = row
+                updated += 1
+
+    removed = 0
+    for url in removed_urls:
+        if rows.pop(url, None) is not None:
+            removed += 1
+
+    save_results(list(rows.values()), detailed_file)
+    print(f"  Merged into {detailed_file}: {updated} upserted, {removed} removed, {len(rows)} total")
+
+def sync_sitemap(scrape=False, snapshot_file=SNAPSHOT_FILE):
+    """
+    Diff the current sitemap against the last snapshot.
+    Writes added+modified medicines to CHANGED_FILE and removed ones to REMOVED_FILE (tombstones).
+    With scrape=True the changed pages are scraped and merged into the detailed CSV and the
+    snapshot is advanced; otherwise the new snapshot is staged for commit_snapshot().
+    """
+    # A partial sitemap would look like mass removals, so any download failure aborts the sync
+    try:
+        medicines = [m for m in extract_medicines(iter_sitemap_entries()) if is_valid_medicine_name(m['name'])]
+    except SitemapDownloadError as e:
+        print(str(e))
+        return
+    old = load_snapshot(snapshot_file)
+    new = build_snapshot(medicines)
+
+    added, modified, removed = diff_snapshots(old, new)
+
+    if not old:
+        print("No previous snapshot found - every medicine counts as added")
+    print(f"Added: {len(added)} | Modified: {len(modified)} | Removed: {len(removed)} | Unchanged: {len(new) - len(added) - len(modified)}")
+
+    write_medicine_list(CHANGED_FILE, new, added + modified)
+    print(f"  Changed medicines saved to: {CHANGED_FILE}")
+    write_medicine_list(REMOVED_FILE, old, removed)
+    print(f"  Tombstones saved to: {REMOVED_FILE}")
+
+    if scrape and (added or modified or removed):
+        from scrape_detailed import scrape_all_medicines
+
+        if os.path.exists(DETAILED_CHANGED_FILE):
+            os.remove(DETAILED_CHANGED_FILE)
+        if added or modified:
+            _, failed = scrape_all_medicines(input_file=CHANGED_FILE, output_file=DETAILED_CHANGED_FILE)
+            # Keep failed pages out of the new snapshot so the next run picks them up again
+            for url in failed:
+                if url in old:
+                    new[url] = old[url]
+                else:
+                    new.pop(url, None)
+        merge_detailed(DETAILED_CHANGED_FILE, removed)
+
+    # Only advance the snapshot once the changes have been handed off
+    if not scrape:
+        save_snapshot(new, snapshot_file + PENDING_SUFFIX)
+        print(f"✓ Snapshot staged: {snapshot_file + PENDING_SUFFIX} ({len(new)} medicines)")
+        print(f"  Run with --commit once {CHANGED_FILE} has been processed")
+        return
+    save_snapshot(new, snapshot_file)
+    if os.path.exists(snapshot_file + PENDING_SUFFIX):
+        os.remove(snapshot_file + PENDING_SUFFIX)
+    print(f"✓ Snapshot updated: {snapshot_file} ({len(new)} medicines)")
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Incremental sitemap-driven catalogue refresh")
+    parser.add_argument('--scrape', action='store_true',
+                        help="Scrape added/modified pages and merge them into the detailed CSV")
+    parser.add_argument('--snapshot', default=SNAPSHOT_FILE,
+                        help=f"Snapshot file from the previous run (default: {SNAPSHOT_FILE})")
+    parser.add_argument('--commit', action='store_true',
+                        help="Advance the snapshot staged by an earlier sync without --scrape")
+    args = parser.parse_args()
+
+    if args.commit:
+        if commit_snapshot(args.snapshot):
+            print(f"✓ Snapshot updated: {args.snapshot}")
+        else:
+            print(f"No staged snapshot ({args.snapshot + PENDING_SUFFIX}) to commit")
+    else:
+        try:
+            sync_sitemap(scrape=args.scrape, snapshot_file=args.snapshot)
+        except KeyboardInterrupt:
+            print("\n\nSync interrupted by user. Snapshot was not updated.")
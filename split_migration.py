@@ -1,47 +1,36 @@
+import csv
+import hashlib
+import json
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from generate_sql_import import import_values, sql_value
 
-def split_migration():
-    print("Splitting migration file...")
-    
-    # Read the generated values from the generator script logic
-    # (Re-reading the CSV is safer/easier than parsing the SQL)
-    import csv
-    
-    values = []
-    with open('dawaai_medicines_cleaned_final.csv', 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            brand = row['brand_name'].replace("'", "''")
-            generic = row['generic_name'].replace("'", "''")
-            mfg = row['manufacturer'].replace("'", "''")
-            strength = row['strength'].replace("'", "''")
-            form = row['dosage_form'].lower().replace("'", "''")
-            pack = row['pack_size'].replace("'", "''")
-            
-            strength_val = f"'{strength}'" if strength else "NULL"
-            form_val = f"'{form}'" if form else "NULL"
-            pack_val = f"'{pack}'" if pack else "NULL"
-            
-            value = f"('{brand}', '{generic}', '{mfg}', {strength_val}, {form_val}, {pack_val})"
-            values.append(value)
-            
-    total_records = len(values)
-    chunk_size = 1000
-    
-    print(f"Total records: {total_records}")
-    print(f"Chunk size: {chunk_size}")
-    
-    # Base header
-    base_header = """-- Migration: Import Scraped Dawaai.pk Medicines (Part {part})
+# Splits the medicine import into parts that fit the Supabase SQL editor.
+# Parts are packed up to a byte budget (and optionally an estimated execution time)
+# instead of a fixed row count, and a manifest records each part's row range and
+# checksum so apply_parts() can run them concurrently and resume after a failure.
+# Repeated (brand_name, strength) pairs are dropped when splitting, keeping the first,
+# so concurrent parts never insert the same key and the result does not depend on
+# which part commits first.
+
+DEFAULT_INPUT = 'dawaai_medicines_cleaned_final.csv'
+MANIFEST_FILE = 'migration_v19_manifest.json'
+PROGRESS_FILE = 'migration_v19_progress.json'
+
+# The SQL editor rejects large payloads well before 1 MB; stay comfortably under
+DEFAULT_MAX_BYTES = 500_000
+# Rough cost of inserting one row (unique index + two GIN tsvector indexes); tune with --row-cost
+DEFAULT_ROW_COST = 0.002
+
+# Base header
+BASE_HEADER = """-- Migration: Import Scraped Dawaai.pk Medicines (Part {part})
 INSERT INTO medicine_reference (brand_name, generic_name, manufacturer, strength, dosage_form, standard_packaging)
 VALUES
 """
-    
-    # Footer
-    footer = "\nON CONFLICT (brand_name, strength) DO NOTHING;"
-    
-    # Part 1 Header (includes schema change)
-    part1_header = """-- Migration: Import Scraped Dawaai.pk Medicines (Part 1)
+
+# Part 1 Header (includes schema change)
+PART1_HEADER = """-- Migration: Import Scraped Dawaai.pk Medicines (Part 1)
 -- Description: Drop constraint and start import
 
 -- Drop the restrictive check constraint
@@ -51,20 +40,199 @@ INSERT INTO medicine_reference (brand_name, generic_name, manufacturer, strength
 VALUES
 """
 
-    for i in range(0, total_records, chunk_size):
-        chunk = values[i:i + chunk_size]
-        part_num = (i // chunk_size) + 1
-        
-        filename = f"migration_v19_part{part_num}.sql"
-        
-        header = part1_header if part_num == 1 else base_header.format(part=part_num)
-        
-        content = header + ",\n".join(chunk) + footer
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(content)
-            
-        print(f"Created {filename} ({len(chunk)} records)")
+# Footer
+FOOTER = "\nON CONFLICT (brand_name, strength) DO NOTHING;"
+
+def unique_rows(rows):
+    """
+    Rows whose (brand_name, strength) pair appeared earlier are dropped, as applying one
+    INSERT in file order would. Rows without a strength never conflict and are all kept.
+    Returns (rows kept, rows dropped).
+    """
+    seen = set()
+    kept = []
+    for row in rows:
+        values = import_values(row)
+        key = (values[0], values[3])
+        if values[3] is not None:
+            if key in seen:
+                continue
+            seen.add(key)
+        kept.append(row)
+    return kept, len(rows) - len(kept)
+
+def pack_chunks(values, max_bytes=DEFAULT_MAX_BYTES, max_seconds=None, row_cost=DEFAULT_ROW_COST):
+    """
+    Group VALUES tuples into (start, end) row ranges so each rendered part stays
+    under max_bytes and, if given, under max_seconds of estimated insert time
+    """
+    overhead = len(PART1_HEADER.encode('utf-8')) + len(FOOTER)
+    max_rows = max(1, int(max_seconds / row_cost)) if max_seconds else None
+
+    chunks = []
+    start, size = 0, overhead
+    for i, value in enumerate(values):
+        row_bytes = len(value.encode('utf-8')) + 2  # ",\n"
+        full = i > start and (size + row_bytes > max_bytes or (max_rows and i - start >= max_rows))
+        if full:
+            chunks.append((start, i))
+            start, size = i, overhead
+        size += row_bytes
+    if start < len(values):
+        chunks.append((start, len(values)))
+    return chunks
+
+def part_filename(part_num):
+    return f"migration_v19_part{part_num}.sql"
+
+def render_part(part_num, chunk):
+    header = PART1_HEADER if part_num == 1 else BASE_HEADER.format(part=part_num)
+    return header + ",\n".join(chunk) + FOOTER
+
+def write_part(part_num, chunk, first_row):
+    """
+    Write one part file and return its manifest entry
+    """
+    content = render_part(part_num, chunk).encode('utf-8')
+    filename = part_filename(part_num)
+    with open(filename, 'wb') as f:
+        f.write(content)
+    return {
+        'part': part_num,
+        'file': filename,
+        'first_row': first_row,
+        'last_row': first_row + len(chunk) - 1,
+        'rows': len(chunk),
+        'bytes': len(content),
+        'sha256': hashlib.sha256(content).hexdigest(),
+    }
+
+def split_migration(input_file=DEFAULT_INPUT, max_bytes=DEFAULT_MAX_BYTES, max_seconds=None,
+                    row_cost=DEFAULT_ROW_COST, jobs=1):
+    print("Splitting migration file...")
+
+    # Read the generated values from the generator script logic
+    # (Re-reading the CSV is safer/easier than parsing the SQL)
+    with open(input_file, 'r', encoding='utf-8') as f:
+        rows, repeated = unique_rows(list(csv.DictReader(f)))
+    values = [sql_value(row) for row in rows]
+
+    chunks = pack_chunks(values, max_bytes, max_seconds, row_cost)
+
+    print(f"Total records: {len(values)}" + (f" ({repeated} repeated brand/strength rows dropped)" if repeated else ""))
+    print(f"Budget: {max_bytes} bytes" + (f", ~{max_seconds}s" if max_seconds else "") + " per part")
+
+    # Row ranges are fixed up front, so parts can be rendered and hashed independently
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(write_part, n, values[start:end], start + 1)
+                       for n, (start, end) in enumerate(chunks, 1)]
+            parts = [future.result() for future in futures]
+    else:
+        parts = [write_part(n, values[start:end], start + 1) for n, (start, end) in enumerate(chunks, 1)]
+
+    for part in parts:
+        print(f"Created {part['file']} ({part['rows']} records, {part['bytes'] / 1024:.0f} KB)")
+
+    # Drop leftovers from an earlier split that produced more parts
+    stale = len(parts) + 1
+    while os.path.exists(part_filename(stale)):
+        os.remove(part_filename(stale))
+        stale += 1
+
+    manifest = {'source': input_file, 'total_rows': len(values), 'repeated_rows': repeated, 'parts': parts}
+    with open(MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"✓ Wrote {len(parts)} parts and {MANIFEST_FILE}")
+    return manifest
+
+def load_progress(path=PROGRESS_FILE):
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+def apply_parts(dsn, concurrency=4, resume=True, manifest_file=MANIFEST_FILE, progress_file=PROGRESS_FILE):
+    """
+    Apply the parts listed in the manifest, each in its own transaction.
+    Part 1 (which alters the table) runs first, the rest run concurrently (their
+    brand/strength keys are disjoint, see unique_rows).
+    With resume=True, parts already recorded in the progress file with the same
+    checksum are skipped. Returns the list of parts that failed.
+    """
+    import psycopg
+
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        parts = json.load(f)['parts']
+
+    progress = load_progress(progress_file) if resume else {}
+    lock = threading.Lock()
+
+    def record(part):
+        with lock:
+            progress[part['file']] = part['sha256']
+            with open(progress_file, 'w', encoding='utf-8') as f:
+                json.dump(progress, f, indent=2)
+
+    def apply(part):
+        with open(part['file'], 'rb') as f:
+            content = f.read()
+        if hashlib.sha256(content).hexdigest() != part['sha256']:
+            raise ValueError(f"{part['file']} does not match the manifest checksum")
+        with psycopg.connect(dsn) as conn:
+            conn.execute(content.decode('utf-8'))
+        record(part)
+        return part
+
+    todo = [part for part in parts if progress.get(part['file']) != part['sha256']]
+    print(f"Applying {len(todo)} of {len(parts)} parts ({len(parts) - len(todo)} already applied)")
+
+    failed = []
+    first, rest = [p for p in todo if p['part'] == 1], [p for p in todo if p['part'] != 1]
+    for part in first:
+        try:
+            apply(part)
+            print(f"  ✓ {part['file']}")
+        except Exception as e:
+            print(f"  ✗ {part['file']}: {e}")
+            return [part] + rest
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(apply, part): part for part in rest}
+        for future in as_completed(futures):
+            part = futures[future]
+            try:
+                future.result()
+                print(f"  ✓ {part['file']} (rows {part['first_row']}-{part['last_row']})")
+            except Exception as e:
+                print(f"  ✗ {part['file']}: {e}")
+                failed.append(part)
+
+    if failed:
+        print(f"\n{len(failed)} part(s) failed - rerun with --apply to retry them")
+    else:
+        print(f"\n✓ All {len(parts)} parts applied")
+    return failed
 
 if __name__ == '__main__':
-    split_migration()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Split the medicine import into SQL-editor sized parts")
+    parser.add_argument('--input', default=DEFAULT_INPUT, help=f"Cleaned CSV (default: {DEFAULT_INPUT})")
+    parser.add_argument('--max-bytes', type=int, default=DEFAULT_MAX_BYTES, help="Byte budget per part")
+    parser.add_argument('--max-seconds', type=float, default=None, help="Estimated execution time budget per part")
+    parser.add_argument('--row-cost', type=float, default=DEFAULT_ROW_COST, help="Estimated seconds per inserted row")
+    parser.add_argument('--jobs', type=int, default=1, help="Processes used to render the parts")
+    parser.add_argument('--apply', action='store_true', help="Apply the parts in the manifest instead of generating them")
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'),
+                        help="PostgreSQL connection string for --apply (default: $DATABASE_URL)")
+    parser.add_argument('--concurrency', type=int, default=4, help="Parts applied at once with --apply")
+    parser.add_argument('--restart', action='store_true', help="With --apply, ignore recorded progress")
+    args = parser.parse_args()
+
+    if args.apply:
+        if not args.dsn:
+            parser.error("--apply needs --dsn or DATABASE_URL")
+        failed = apply_parts(args.dsn, args.concurrency, resume=not args.restart)
+        raise SystemExit(1 if failed else 0)
+    split_migration(args.input, args.max_bytes, args.max_seconds, args.row_cost, args.jobs)
@@ -0,0 +1,119 @@
+import re
+
+# Structured parsing of the free-text strength and pack_size fields into numeric
+# columns for import: strength_value / strength_unit and units_per_pack.
+#
+# One compiled grammar recognises every token type, so a field is scanned once:
+#   pack:     "2 x 10's", "20 x 10 tablets", "10's", "30 capsules"
+#   strength: "500mg", "0.5 g", "250mg/5ml", "2%", "10+5mg", "1000 IU"
+#
+# Units are normalized to mg for mass and ml for volume (the units dosing is
+# written in); "per volume" strengths become a concentration, e.g. 250mg/5ml -> 50 mg/ml.
+
+# Scale to the normalized unit
+UNIT_SCALE = {
+    'mg': ('mg', 1), 'g': ('mg', 1000), 'gm': ('mg', 1000), 'kg': ('mg', 1000000),
+    'mcg': ('mg', 0.001), 'ug': ('mg', 0.001), 'µg': ('mg', 0.001),
+    'ml': ('ml', 1), 'l': ('ml', 1000),
+    'iu': ('iu', 1), '%': ('%', 1), 'mmol': ('mmol', 1),
+}
+
+UNIT_PATTERN = r'mcg|µg|ug|mg|gm|g|kg|ml|l|iu|%|mmol'
+# Units that alone describe the fill volume rather than a strength (see parse_row)
+VOLUME_UNITS = {'ml'}
+COUNT_WORDS = r"tablets?|tabs?|capsules?|caps?|sachets?|ampoules?|amps?|vials?|suppositor(?:y|ies)|items?|pcs|'s|s"
+
+TOKEN_RE = re.compile(rf"""
+    (?P<boxes>\d+)\s*[x×]\s*(?P<each>\d+)(?![\d.]|\s*(?:{UNIT_PATTERN})(?![a-z])) # 2 x 10's, not 10 x 10 ml
+      \s*(?:{COUNT_WORDS})?(?![a-z%])
+  | (?P<count>\d+)\s*(?:{COUNT_WORDS})(?![a-z])                                 # 10's, 30 capsules
+  | (?P<combo>\d+(?:\.\d+)?\s*(?:{UNIT_PATTERN})?                                 # 10+5mg
+      (?:\s*\+\s*\d+(?:\.\d+)?\s*(?:{UNIT_PATTERN})?)+)(?![a-z])
+  | (?P<value>\d+(?:\.\d+)?|\.\d+)\s*(?P<unit>{UNIT_PATTERN})(?![a-z])           # 500mg, 2%
+      (?:\s*/\s*(?P<per_value>\d+(?:\.\d+)?)?\s*(?P<per_unit>{UNIT_PATTERN})(?![a-z]))?   # /5ml
+""", re.I | re.X)
+
+def _normalize(value, unit):
+    unit, scale = UNIT_SCALE[unit.lower()]
+    return value * scale, unit
+
+def _number(value):
+    # 500.0 -> 500, keeps 0.5
+    return int(value) if value == int(value) else round(value, 6)
+
+def parse_tokens(text):
+    """
+    Scan text once. Returns (strength, units): strength is (value, unit) or None,
+    units is the pack count or None. Combination strengths (10+5mg) have no single value.
+    """
+    strength, units = None, None
+    for match in TOKEN_RE.finditer(text or ''):
+        if match.group('boxes'):
+            # "0's" is a scraping artifact, not an empty pack
+            if units is None and int(match.group('boxes')) * int(match.group('each')) > 0:
+                units = int(match.group('boxes')) * int(match.group('each'))
+        elif match.group('count'):
+            if units is None and int(match.group('count')) > 0:
+                units = int(match.group('count'))
+        elif match.group('combo'):
+            if strength is None:
+                strength = (None, 'combination')
+        elif strength is None:
+            value, unit = _normalize(float(match.group('value')), match.group('unit'))
+            if match.group('per_unit'):
+                per_value, per_unit = _normalize(float(match.group('per_value') or 1), match.group('per_unit'))
+                if per_value == 0:
+                    continue
+                value, unit = value / per_value, f"{unit}/{per_unit}"
+            strength = (_number(value), unit)
+    return strength, units
+
+def parse_strength(text):
+    """
+    (strength_value, strength_unit) for a strength string, or (None, None)
+    """
+    strength, _ = parse_tokens(text)
+    return strength or (None, None)
+
+def parse_pack(text):
+    """
+    units_per_pack for a pack size string ("2 x 10's" -> 20), or None
+    """
+    _, units = parse_tokens(text)
+    return units
+
+def strength_key(text):
+    """
+    Comparable strength text: '0.5 g' and '500mg' -> '500mg', '250mg/5ml' -> '50mg/ml'.
+    Text the grammar does not understand is returned lowercased without spaces.
+    """
+    value, unit = parse_strength(text)
+    if value is None:
+        return (text or '').lower().replace(' ', '')
+    return f"{value:g}{unit}"
+
+def _parse_field(text):
+    strength, units = parse_tokens(text)
+    # A bare volume is the fill ("120ml" syrup, "10 x 10 ml" ampoules), not a strength
+    if strength and strength[1] in VOLUME_UNITS:
+        strength = None
+    return strength, units
+
+def parse_row(row):
+    """
+    Numeric columns for a cleaned row. Strength comes from the strength field; only when
+    that field is empty does it fall back to pack_size and then the brand name (where
+    scraping sometimes leaves it). A bare volume is never taken as the strength.
+    units_per_pack comes from the strength field, then pack_size, then the brand name.
+    """
+    strength_text = (row.get('strength') or '').strip()
+    strength, units = _parse_field(strength_text)
+    for field in ('pack_size', 'brand_name'):
+        if (strength is not None or strength_text) and units is not None:
+            break
+        found_strength, found_units = _parse_field(row.get(field, ''))
+        if not strength_text:
+            strength = strength or found_strength
+        units = units if units is not None else found_units
+    value, unit = strength or (None, None)
+    return {'strength_value': value, 'strength_unit': unit, 'units_per_pack': units}
@@ -0,0 +1,32 @@
+import pytest
+import catalogue_pipeline
+from catalogue_pipeline import run_pipeline
+from scrape_medicines import SitemapDownloadError
+
+PREVIOUS = "name,url,lastmod\nPanadol,https://dawaai.pk/medicine/panadol.html,2025-01-01\n"
+
+def failing_sitemap(_rows):
+    yield {'name': 'Brufen', 'url': 'https://dawaai.pk/medicine/brufen.html', 'lastmod': ''}
+    raise SitemapDownloadError("Failed to read sitemap: connection reset")
+
+def test_failed_run_keeps_previous_output(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(catalogue_pipeline.STAGE_FUNCS, 'sitemap', failing_sitemap)
+    (tmp_path / 'dawaai_medicines_clean.csv').write_text(PREVIOUS, encoding='utf-8')
+
+    with pytest.raises(SitemapDownloadError):
+        run_pipeline('sitemap', 'names')
+
+    assert (tmp_path / 'dawaai_medicines_clean.csv').read_text(encoding='utf-8') == PREVIOUS
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['dawaai_medicines_clean.csv']
+
+def test_names_stage_from_csv(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'dawaai_medicines.csv').write_text(
+        "name,url,lastmod\nPanadol,https://dawaai.pk/medicine/panadol.html,\n123,https://dawaai.pk/medicine/123.html,\n",
+        encoding='utf-8')
+
+    run_pipeline('names', 'names')
+
+    assert (tmp_path / 'dawaai_medicines_clean.csv').read_text(encoding='utf-8').splitlines() == [
+        'name,url,lastmod', 'Panadol,https://dawaai.pk/medicine/panadol.html,']
@@ -0,0 +1,32 @@
+import pytest
+from bench_clean_brand import fuzz_rows, legacy_clean_brand_name, synthetic_rows
+from clean_data import clean_brand_name, clean_brand_names
+
+# clean_brand_name must match the original pattern-by-pattern cleaner exactly
+
+CASES = [
+    ("Panadol 500mg Tablet 2 x 10's", '500mg', 'Tablet'),
+    ("Brufen 400 mg 30's", '400mg', ''),
+    ('Calpol Syrup 120ml', '', 'Syrup'),
+    ("5 10's mg", '', ''),
+    # A removal ending in ' takes away the \b the form pattern needs
+    ("a2x3'Gel", '', ''),
+    ("X1x2'Drops", '', ''),
+    ("Arinac 2x3' Gel", '', 'Gel'),
+    ('', '', ''),
+]
+
+@pytest.mark.parametrize('brand, strength, form', CASES)
+def test_matches_legacy(brand, strength, form):
+    assert clean_brand_name(brand, strength, form) == legacy_clean_brand_name(brand, strength, form)
+
+@pytest.mark.parametrize('rows', [synthetic_rows(5000), fuzz_rows(20000)], ids=['synthetic', 'fuzz'])
+def test_matches_legacy_corpus(rows):
+    mismatches = [(row, legacy_clean_brand_name(*row), clean_brand_name(*row))
+                  for row in rows if legacy_clean_brand_name(*row) != clean_brand_name(*row)]
+    assert mismatches == []
+
+def test_batch_matches_single():
+    rows = fuzz_rows(2000, seed=3)
+    brands, strengths, forms = zip(*rows)
+    assert clean_brand_names(brands, strengths, forms) == [clean_brand_name(*row) for row in rows]
@@ -0,0 +1,28 @@
+import pytest
+from bench_clean_brand import fuzz_rows, legacy_clean_brand_name, synthetic_rows
+from test_clean_brand import CASES
+
+pd = pytest.importorskip('pandas')
+from columnar_clean import clean_brand_column
+
+# clean_brand_column must match the original row-by-row cleaner exactly
+
+def legacy_column(rows):
+    return [legacy_clean_brand_name(*row) for row in rows]
+
+def columnar(rows):
+    brands, strengths, forms = (pd.Series(column, dtype=object) for column in zip(*rows))
+    return clean_brand_column(brands, strengths, forms).tolist()
+
+@pytest.mark.parametrize('rows', [CASES, synthetic_rows(5000), fuzz_rows(20000)], ids=['cases', 'synthetic', 'fuzz'])
+def test_matches_legacy(rows):
+    expected = legacy_column(rows)
+    mismatches = [(row, want, got) for row, want, got in zip(rows, expected, columnar(rows)) if want != got]
+    assert mismatches == []
+
+def test_keeps_index():
+    brands = pd.Series(["Panadol 500mg Tablet", "Brufen 10's"], index=[7, 3], dtype=object)
+    strengths = pd.Series(['500mg', ''], index=[7, 3], dtype=object)
+    forms = pd.Series(['Tablet', ''], index=[7, 3], dtype=object)
+    cleaned = clean_brand_column(brands, strengths, forms)
+    assert cleaned.to_dict() == {7: 'Panadol', 3: 'Brufen'}
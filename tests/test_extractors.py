@@ -0,0 +1,71 @@
+import pytest
+from bench_extractors import available_backends
+from fixture_server import render_medicine_page
+from medicine_extractors import BACKENDS, extract_details
+
+# Every backend must give the same fields as the BeautifulSoup reference (bs4)
+
+pytest.importorskip('bs4')
+
+URL = 'https://dawaai.pk/medicine/test.html'
+
+def page(body, head=''):
+    return f"<!DOCTYPE html><html><head>{head}</head><body>{body}</body></html>".encode('utf-8')
+
+STANDARD = page("""
+<h1>Panadol Extra 500mg Tablet</h1>
+<a href="/brands/gsk">GSK</a>
+<a href="/generic/paracetamol">Paracetamol (500 mg)</a>
+<ul><li>Pack Size: 2 x 10's</li></ul>
+""")
+
+# Pages aimed at the places the fast scanner could drift from the parsed tree
+EDGE_PAGES = {
+    'standard': STANDARD,
+    'missing everything': page("<p>Nothing here</p>"),
+    'nested h1 markup': page("<h1> <span>Brufen</span> <b>400mg</b>\n Suspension </h1>"),
+    'entities': page("<h1>Calpol &amp; Co 120ml Syrup</h1><a href='/generic/p'>Para&#99;etamol (120&nbsp;mg)</a>"),
+    'uppercase tags': page("<H1>Risek 20mg Capsule</H1><A HREF=\"/brands/getz\">Getz</A>"),
+    'attribute with >': page("<h1 title=\"a > b\">Flagyl 400mg Tablet</h1><a data-x='>' href=\"/brands/sanofi\">Sanofi</a>"),
+    'decoys in script, style and comments': page(
+        "<script>var s = '<h1>Fake</h1><a href=\"/brands/fake\">Fake</a> Pack Size: 99';</script>"
+        "<style>h1:after { content: 'Pack Size: 1'; }</style>"
+        "<!-- <h1>Old</h1> Pack Size: 5 -->"
+        "<h1>Zyrtec 10mg Tablet</h1><a href=\"/brands/gsk\">GSK</a><p>Pack Size: 10's</p>",
+        head="<script>document.title = '<h1>head</h1>';</script>"),
+    'pack size across tags': page("<h1>Ponstan</h1><dt>Pack Size</dt><dd>20 tablets</dd>"),
+    'pack size from h1': page("<h1>Augmentin 625mg 2 x 6's Tablet</h1>"),
+    'pack size gm from h1': page("<h1>Arinac 1gm Sachet</h1>"),
+    'generic without strength': page("<a href=\"/generic/ibuprofen\">Ibuprofen</a>"),
+    'several links': page("<a href='/brands/first'>First</a><a href='/brands/second'>Second</a>"
+                          "<a href='/generic/one'>One (1 mg)</a><a href='/generic/two'>Two (2 mg)</a>"),
+    'empty h1': page("<h1></h1><p>Pack Size: 30's</p>"),
+    'unicode': page("<h1>Brufen® 400mg Tablet</h1><a href='/brands/abbott'>Abbott – Pakistan</a>"),
+}
+
+FIXTURE_PAGES = {f"fixture {i}": render_medicine_page(i) for i in range(1, 51)}
+
+BACKEND_NAMES = [name for name in BACKENDS if name != 'bs4']
+
+@pytest.fixture(scope='module')
+def backends():
+    return available_backends()
+
+@pytest.mark.parametrize('backend', BACKEND_NAMES)
+@pytest.mark.parametrize('content', list(EDGE_PAGES.values()) + list(FIXTURE_PAGES.values()),
+                         ids=list(EDGE_PAGES) + list(FIXTURE_PAGES))
+def test_matches_reference(backend, content, backends):
+    if backend not in backends:
+        pytest.skip(f"{backend} not installed")
+    assert extract_details(content, URL, backend=backend) == extract_details(content, URL, backend='bs4')
+
+def test_reference_fields():
+    assert extract_details(STANDARD, URL, backend='bs4') == {
+        'brand_name': 'Panadol Extra 500mg Tablet',
+        'generic_name': 'Paracetamol',
+        'manufacturer': 'GSK',
+        'strength': '500 mg',
+        'dosage_form': 'tablet',
+        'pack_size': "2 x 10's",
+        'url': URL,
+    }
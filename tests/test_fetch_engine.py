@@ -0,0 +1,39 @@
+import time
+import pytest
+import http_client
+from fetch_engine import fetch_all
+from fixture_server import start_fixture_server
+
+@pytest.fixture
+def flaky_server():
+    server, base_url = start_fixture_server(error_rate=0.4, seed=1)
+    yield server, base_url
+    server.shutdown()
+
+def test_retries_share_the_rate_limit(flaky_server, monkeypatch):
+    server, base_url = flaky_server
+    # No backoff, so only the rate limiter spaces out the retried requests
+    monkeypatch.setattr(http_client, 'backoff_delay', lambda attempt: 0)
+    urls = [f"{base_url}/medicine/Medicine{i}-{i}.html" for i in range(1, 31)]
+    rate = 40.0
+
+    def fetch_status(url):
+        return http_client.fetch(url).status_code
+
+    results = []
+    start = time.perf_counter()
+    fetch_all(urls, fetch_status, concurrency=8, rate=rate, burst=1,
+              on_result=lambda url, status: results.append(status))
+    elapsed = time.perf_counter() - start
+
+    requests_sent = server.stats.total
+    assert len(results) == len(urls)
+    assert requests_sent > len(urls)
+    # One token per request, retries included (less a little for timer slack)
+    assert elapsed >= (requests_sent - 1) / rate * 0.9
+
+def test_fetch_outside_the_engine_is_not_gated(flaky_server, monkeypatch):
+    _, base_url = flaky_server
+    monkeypatch.setattr(http_client, 'backoff_delay', lambda attempt: 0)
+    assert http_client.retry_gate.get() is None
+    assert http_client.fetch(f"{base_url}/medicine/Medicine1-1.html", retries=20).status_code == 200
@@ -0,0 +1,54 @@
+import csv
+import json
+import os
+import subprocess
+import sys
+import pytest
+from medicine_extractors import FIELDNAMES
+from metrics import MetricsRegistry
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DETAILED = [
+    {'brand_name': 'Panadol 500mg Tablet', 'generic_name': 'Paracetamol', 'manufacturer': 'GSK',
+     'strength': '500 mg', 'dosage_form': 'tablet', 'pack_size': "2 x 10's", 'url': 'https://dawaai.pk/medicine/panadol.html'},
+    {'brand_name': 'Brufen 400mg Tablet', 'generic_name': 'Ibuprofen', 'manufacturer': 'Abbott',
+     'strength': '400 mg', 'dosage_form': 'tablet', 'pack_size': "30's", 'url': 'https://dawaai.pk/medicine/brufen.html'},
+]
+
+def run_cli(script, *args):
+    subprocess.run([sys.executable, os.path.join(ROOT, script), *args, '--metrics', 'metrics.jsonl'],
+                   check=True, capture_output=True)
+    with open('metrics.jsonl', 'r', encoding='utf-8') as f:
+        return json.loads(f.readlines()[-1])
+
+@pytest.fixture
+def detailed_csv(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open('dawaai_medicines_final.csv', 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(DETAILED)
+
+def test_stage_metrics():
+    registry = MetricsRegistry()
+    registry.stage('clean', 10, 2.0)
+    registry.stage('clean', 5, 0)
+    snapshot = registry.snapshot()
+    assert snapshot['counters'] == {'stage_rows_total{stage="clean"}': 15}
+    assert snapshot['gauges'] == {'stage_seconds{stage="clean"}': 0, 'stage_rows_per_second{stage="clean"}': 0}
+
+def test_clean_and_sql_clis_report_stages(detailed_csv):
+    snapshot = run_cli('clean_data.py')
+    assert snapshot['counters']['stage_rows_total{stage="clean"}'] == 2
+    assert 'stage_seconds{stage="clean"}' in snapshot['gauges']
+
+    snapshot = run_cli('generate_sql_import.py')
+    assert snapshot['counters']['stage_rows_total{stage="sql"}'] == 2
+    assert 'stage_rows_per_second{stage="sql"}' in snapshot['gauges']
+
+def test_columnar_cli_reports_stages(detailed_csv):
+    pytest.importorskip('pandas')
+    snapshot = run_cli('columnar_clean.py', 'analyze', 'clean')
+    assert snapshot['counters']['stage_rows_total{stage="analyze"}'] == 2
+    assert snapshot['counters']['stage_rows_total{stage="clean"}'] == 2
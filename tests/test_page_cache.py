@@ -0,0 +1,60 @@
+import os
+from page_cache import PageCache
+
+def object_files(cache_dir):
+    objects_dir = os.path.join(cache_dir, 'objects')
+    return sorted(prefix + name for prefix in os.listdir(objects_dir)
+                  for name in os.listdir(os.path.join(objects_dir, prefix)))
+
+def test_round_trip(tmp_path):
+    cache = PageCache(str(tmp_path))
+    cache.put('https://example.com/a', b'<html>a</html>')
+    cache.save()
+    reopened = PageCache(str(tmp_path))
+    assert reopened.get('https://example.com/a') == b'<html>a</html>'
+    assert reopened.total_bytes == cache.total_bytes
+
+def test_shared_content_stored_once(tmp_path):
+    cache = PageCache(str(tmp_path))
+    first = cache.put('https://example.com/a', b'same')
+    second = cache.put('https://example.com/b', b'same')
+    assert first == second
+    assert object_files(str(tmp_path)) == [first]
+
+def test_unsaved_objects_are_swept_on_open(tmp_path):
+    cache = PageCache(str(tmp_path))
+    kept = cache.put('https://example.com/a', b'kept')
+    cache.save()
+    # Stored but never indexed, as when the process stops before save()
+    cache.put('https://example.com/b', b'lost')
+    with open(os.path.join(str(tmp_path), 'objects', kept[:2], 'leftover.tmp'), 'wb') as f:
+        f.write(b'partial')
+
+    reopened = PageCache(str(tmp_path))
+    assert object_files(str(tmp_path)) == [kept]
+    assert reopened.urls() == ['https://example.com/a']
+    assert reopened.total_bytes == os.path.getsize(os.path.join(str(tmp_path), 'objects', kept[:2], kept[2:]))
+
+def test_entries_without_objects_are_dropped_on_open(tmp_path):
+    cache = PageCache(str(tmp_path))
+    gone = cache.put('https://example.com/a', b'gone')
+    cache.put('https://example.com/b', b'kept')
+    cache.save()
+    os.remove(os.path.join(str(tmp_path), 'objects', gone[:2], gone[2:]))
+
+    reopened = PageCache(str(tmp_path))
+    assert reopened.urls() == ['https://example.com/b']
+    assert reopened.get('https://example.com/a') is None
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = PageCache(str(tmp_path), max_bytes=1)
+    cache.put('https://example.com/a', b'a' * 100)
+    cache.put('https://example.com/b', b'b' * 100)
+    assert cache.urls() == ['https://example.com/b']
+    assert len(object_files(str(tmp_path))) == 1
+
+def test_import_opens_no_stores(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    import scrape_detailed
+    scrape_detailed.save_state()
+    assert os.listdir(str(tmp_path)) == []
@@ -0,0 +1,62 @@
+import csv
+import pytest
+import scrape_detailed
+from fixture_server import FORMS, PACK_SIZES, start_fixture_server
+from scrape_detailed import scrape_all_medicines, scrape_medicine_details
+
+# The scraper run against the local dawaai.pk stand-in (fixture_server.py) instead of the live site
+
+@pytest.fixture(scope='module')
+def server_url():
+    server, base_url = start_fixture_server()
+    yield base_url
+    server.shutdown()
+
+@pytest.fixture
+def base_url(server_url, tmp_path, monkeypatch):
+    # Validator store, page cache and ledger are written to the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scrape_detailed, '_validators', None)
+    monkeypatch.setattr(scrape_detailed, '_page_cache', None)
+    return server_url
+
+def page_url(base_url, medicine_id):
+    return f"{base_url}/medicine/Medicine{medicine_id}-{medicine_id}.html"
+
+def expected_details(base_url, medicine_id):
+    """The fields render_medicine_page() puts on the page for this id"""
+    strength = f"{(medicine_id % 20 + 1) * 25}mg"
+    form = FORMS[medicine_id % len(FORMS)]
+    return {
+        'brand_name': f"Medicine{medicine_id} {strength} {form}",
+        'generic_name': f"Generic{medicine_id % 500}",
+        'manufacturer': f"Pharma {medicine_id % 50}",
+        'strength': strength,
+        'dosage_form': form.lower(),
+        'pack_size': PACK_SIZES[medicine_id % len(PACK_SIZES)],
+        'url': page_url(base_url, medicine_id),
+    }
+
+@pytest.mark.parametrize('medicine_id', [1, 2, 3, 4, 5, 24, 499])
+def test_scrape_medicine_details(base_url, medicine_id):
+    url = page_url(base_url, medicine_id)
+    assert scrape_medicine_details(url) == expected_details(base_url, medicine_id)
+
+def test_missing_page(base_url):
+    assert scrape_medicine_details(f"{base_url}/not-a-medicine.html") is None
+
+def test_scrape_all_medicines(base_url):
+    ids = range(1, 21)
+    with open('medicines.csv', 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['name', 'url', 'lastmod'])
+        writer.writeheader()
+        writer.writerows({'name': f"Medicine{i}", 'url': page_url(base_url, i), 'lastmod': ''} for i in ids)
+
+    results, failed = scrape_all_medicines(concurrency=4, rate=200, input_file='medicines.csv',
+                                           output_file='details.csv')
+
+    assert failed == []
+    expected = sorted((expected_details(base_url, i) for i in ids), key=lambda row: row['url'])
+    assert sorted(results, key=lambda row: row['url']) == expected
+    with open('details.csv', 'r', encoding='utf-8') as f:
+        assert sorted(csv.DictReader(f), key=lambda row: row['url']) == expected
@@ -0,0 +1,45 @@
+import csv
+import json
+import re
+from split_migration import MANIFEST_FILE, split_migration, unique_rows
+
+FIELDS = ['brand_name', 'generic_name', 'manufacturer', 'strength', 'dosage_form', 'pack_size']
+
+def make_row(brand, strength, generic):
+    return {'brand_name': brand, 'generic_name': generic, 'manufacturer': 'M',
+            'strength': strength, 'dosage_form': 'Tablet', 'pack_size': ''}
+
+def test_unique_rows_keeps_first():
+    rows = [make_row('A', '5mg', 'first'), make_row('A', '5mg', 'second'), make_row('A', '10mg', 'other'),
+            make_row('a', '5mg', 'case differs')]
+    kept, dropped = unique_rows(rows)
+    assert [row['generic_name'] for row in kept] == ['first', 'other', 'case differs']
+    assert dropped == 1
+
+def test_unique_rows_keeps_rows_without_strength():
+    rows = [make_row('B', '', 'one'), make_row('B', '', 'two')]
+    assert unique_rows(rows) == (rows, 0)
+
+def test_parts_have_disjoint_keys(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    rows = [make_row(f"Brand {i % 40}", f"{i % 3}mg", f"generic {i}") for i in range(200)]
+    with open('input.csv', 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    manifest = split_migration('input.csv', max_bytes=2000)
+    with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+        assert json.load(f) == manifest
+    assert len(manifest['parts']) > 1
+    assert manifest['total_rows'] == 120
+    assert manifest['repeated_rows'] == 80
+
+    keys = []
+    for part in manifest['parts']:
+        with open(part['file'], 'r', encoding='utf-8') as f:
+            keys.extend(re.findall(r"^\('(Brand \d+)', 'generic (\d+)', 'M', '(\d)mg'", f.read(), re.M))
+    assert len(keys) == 120
+    assert len({(brand, strength) for brand, _, strength in keys}) == 120
+    # The first CSV row for each key is the one kept
+    assert all(int(generic) < 120 for _, generic, _ in keys)
@@ -0,0 +1,71 @@
+import pytest
+from strength_parser import parse_pack, parse_row, parse_strength, strength_key
+
+@pytest.mark.parametrize('text, expected', [
+    ('500mg', (500, 'mg')),
+    ('0.5 g', (500, 'mg')),
+    ('2%', (2, '%')),
+    ('1000 IU', (1000, 'iu')),
+    ('250mg/5ml', (50, 'mg/ml')),
+    ('10+5mg', (None, 'combination')),
+    ('250 mcg', (0.25, 'mg')),
+    # A zero divisor is unparseable, not a ZeroDivisionError
+    ('5mg/0ml', (None, None)),
+    ('', (None, None)),
+    ('Forte', (None, None)),
+])
+def test_parse_strength(text, expected):
+    assert parse_strength(text) == expected
+
+@pytest.mark.parametrize('text, expected', [
+    ("2 x 10's", 20),
+    ('20 x 10 tablets', 200),
+    ("10's", 10),
+    ('30 capsules', 30),
+    # Zero counts are scraping artifacts (and would break the v24 CHECK)
+    ("0's", None),
+    ("2 x 0's", None),
+    # N x M <unit> is N fills of M units, not N*M items; no backtracking to '10 x 1'
+    ('10 x 10 ml', None),
+    ('120ml', None),
+    ('', None),
+])
+def test_parse_pack(text, expected):
+    assert parse_pack(text) == expected
+
+def row(strength='', pack_size='', brand_name='X'):
+    return {'strength': strength, 'pack_size': pack_size, 'brand_name': brand_name}
+
+def numeric(value, unit, units):
+    return {'strength_value': value, 'strength_unit': unit, 'units_per_pack': units}
+
+@pytest.mark.parametrize('fields, expected', [
+    (row('500mg', "2 x 10's"), numeric(500, 'mg', 20)),
+    (row('250mg/5ml', '60ml'), numeric(50, 'mg/ml', None)),
+    # Empty strength field: pack_size, then the brand name
+    (row('', '500mg'), numeric(500, 'mg', None)),
+    (row('', "10's", 'Panadol 500mg'), numeric(500, 'mg', 10)),
+    (row('', '', "Brufen 400mg 30's"), numeric(400, 'mg', 30)),
+    # A bare volume is the fill, wherever it appears
+    (row('', '120ml', 'Calpol Syrup'), numeric(None, None, None)),
+    (row('10 x 10 ml'), numeric(None, None, None)),
+    (row('5ml', '', 'Brufen 100mg'), numeric(None, None, None)),
+    # A strength field that is present but rejected does not fall back
+    (row('5mg/0ml', '', 'X 20mg'), numeric(None, None, None)),
+    (row('Forte', '250mg'), numeric(None, None, None)),
+    # units_per_pack still falls back when the strength field has none
+    (row('5mg/0ml', "30's"), numeric(None, None, 30)),
+    (row("0's", "2 x 0's", "Y 14's"), numeric(None, None, 14)),
+    ({}, numeric(None, None, None)),
+])
+def test_parse_row(fields, expected):
+    assert parse_row(fields) == expected
+
+@pytest.mark.parametrize('text, expected', [
+    ('0.5 g', '500mg'),
+    ('500mg', '500mg'),
+    ('250mg/5ml', '50mg/ml'),
+    ('Extra Strength', 'extrastrength'),
+])
+def test_strength_key(text, expected):
+    assert strength_key(text) == expected